@@ -1,7 +1,25 @@
 import os
+import time
 from flask import Flask
+from jinja2 import FileSystemBytecodeCache
 from config import DevelopmentConfig
-from database.connection import init_db
+from pymongo.errors import PyMongoError
+from database.connection import init_db, mongo
+from database.indexes import ensure_indexes, print_index_report
+from database.monitoring import pool_monitor
+from utils.cart_store import cart_store
+from utils.catalog_cache import catalog_cache
+from utils.compression import CompressionMiddleware
+from utils.db_tracker import db_tracker
+from utils.email_dispatcher import email_dispatcher
+from utils.otp_generator import otp_service
+from utils.image_cache import resize_cache
+from utils.metrics import metrics
+from utils.page_cache import page_cache
+from utils.rate_limit import rate_limiter
+from utils.request_metrics import request_metrics
+from utils.image_pipeline import image_url, responsive_image
+from utils.static_assets import static_assets
 
 
 class AppFactory:
@@ -11,8 +29,12 @@ class AppFactory:
     Responsibilities:
     ▸ Load environment + instance configuration
     ▸ Initialize extensions (MongoDB, etc.)
-    ▸ Configure Jinja templating environment
+    ▸ Create missing MongoDB indexes and report drift
+    ▸ Instrument requests and MongoDB for /metrics
+    ▸ Configure caches (product catalog, pages, resized images)
+    ▸ Configure Jinja templating environment (bytecode cache)
     ▸ Register blueprints only AFTER DB setup
+    ▸ Wrap the WSGI app in middleware (response compression)
     """
 
     def __init__(self, config_class=DevelopmentConfig):
@@ -59,17 +81,92 @@ class AppFactory:
         will require an active connection.
         """
         init_db(self.app)
+        cart_store.init_app(self.app, mongo)
+        otp_service.init_app(self.app, mongo)
+        rate_limiter.init_app(self.app, mongo)
+        email_dispatcher.init_app(self.app)
+
+    # ------------------------------------------------------
+    # TELEMETRY
+    # ------------------------------------------------------
+    def init_telemetry(self):
+        """
+        Time every request per route and publish gauges (Mongo pool,
+        email queue) for /metrics. Mongo commands are recorded by the
+        listeners registered in init_db(); db_tracker also counts them
+        per request (Server-Timing header, N+1 warnings).
+        """
+        metrics.init_app(self.app)
+        request_metrics.init_app(self.app)
+        db_tracker.init_app(self.app)
+        metrics.gauges(pool_monitor.gauges)
+        metrics.gauges(email_dispatcher.gauges)
+
+    # ------------------------------------------------------
+    # MONGODB INDEXES
+    # ------------------------------------------------------
+    def init_indexes(self):
+        """
+        Create the indexes declared by the models (idempotent) and
+        print any drift between declared and existing indexes.
+
+        A database that is unreachable at boot must not stop the app
+        from starting, so errors are only reported.
+        """
+        if not self.app.config.get("MONGO_AUTO_INDEX", True):
+            return
+
+        try:
+            print_index_report(ensure_indexes(mongo.db))
+        except PyMongoError as e:
+            print(f"⚠ WARNING: Index bootstrap skipped: {e}")
+
+    # ------------------------------------------------------
+    # IN-PROCESS CACHES
+    # ------------------------------------------------------
+    def init_caches(self):
+        """
+        Apply cache settings from config to the shared catalog cache,
+        the anonymous page cache and the on-demand image resize cache.
+        """
+        catalog_cache.configure(
+            max_entries=self.app.config["CATALOG_CACHE_SIZE"],
+            ttl_seconds=self.app.config["CATALOG_CACHE_TTL"],
+            version_check_seconds=self.app.config["CATALOG_VERSION_CHECK"]
+        )
+        page_cache.configure(
+            max_entries=self.app.config["PAGE_CACHE_SIZE"],
+            ttl_seconds=self.app.config["PAGE_CACHE_TTL"]
+        )
+        resize_cache.init_app(self.app)
 
     # ------------------------------------------------------
     # JINJA TEMPLATE SETTINGS
     # ------------------------------------------------------
     def init_jinja(self):
         """
-        Make Jinja templates cleaner by trimming whitespace.
+        Make Jinja templates cleaner by trimming whitespace, expose the
+        responsive image helpers (see utils/image_pipeline.py) and
+        serve fingerprinted static files (see utils/static_assets.py).
+
+        Compiled templates are stored in a filesystem bytecode cache,
+        so workers started after the first one (and after a restart)
+        skip parsing and compiling templates.
         """
         self.app.jinja_env.trim_blocks = True
         self.app.jinja_env.lstrip_blocks = True
 
+        cache_dir = self.app.config.get("JINJA_BYTECODE_CACHE") or \
+            os.path.join(self.app.instance_path, "jinja_cache")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+        self.app.jinja_env.globals.update(
+            image_url=image_url,
+            responsive_image=responsive_image
+        )
+        static_assets.init_app(self.app)
+
     # ------------------------------------------------------
     # REGISTER BLUEPRINTS
     # ------------------------------------------------------
@@ -81,6 +178,55 @@ class AppFactory:
         from routes import register_blueprints
         register_blueprints(self.app)
 
+    # ------------------------------------------------------
+    # TEMPLATE WARM-UP
+    # ------------------------------------------------------
+    def warm_templates(self):
+        """
+        Load every template once at startup, so no request pays for
+        compiling one, and report how long each took.
+
+        Loads that come from the bytecode cache are much faster than
+        full compiles; a slow line after a deploy is a real compile.
+        """
+        if not self.app.config.get("JINJA_PRECOMPILE", True):
+            return
+
+        env = self.app.jinja_env
+        timings = []
+        started = time.perf_counter()
+
+        for name in env.list_templates(extensions=["html"]):
+            t0 = time.perf_counter()
+            try:
+                env.get_template(name)
+            except Exception as e:
+                print(f"❌ Template {name} failed to compile: {e}")
+                continue
+            timings.append((time.perf_counter() - t0, name))
+
+        total = (time.perf_counter() - started) * 1000
+        print(f"✔ Jinja: {len(timings)} templates loaded in {total:.1f} ms")
+        for seconds, name in sorted(timings, reverse=True):
+            print(f"    {seconds * 1000:7.2f} ms  {name}")
+
+    # ------------------------------------------------------
+    # WSGI MIDDLEWARE
+    # ------------------------------------------------------
+    def init_middleware(self):
+        """
+        Compress dynamic responses (HTML, JSON, …) with brotli or gzip.
+        """
+        if not self.app.config.get("COMPRESS_RESPONSES", True):
+            return
+
+        self.app.wsgi_app = CompressionMiddleware(
+            self.app.wsgi_app,
+            min_size=self.app.config["COMPRESS_MIN_SIZE"],
+            gzip_level=self.app.config["COMPRESS_LEVEL"],
+            brotli_quality=self.app.config["COMPRESS_BR_QUALITY"]
+        )
+
     # ------------------------------------------------------
     # CREATE APP INSTANCE
     # ------------------------------------------------------
@@ -92,7 +238,12 @@ class AppFactory:
 
         self.load_config()       # Load base + instance config
         self.init_extensions()   # Initialize MongoDB & other extensions
+        self.init_telemetry()    # Request timing + metrics snapshots
+        self.init_indexes()      # Create missing indexes, report drift
+        self.init_caches()       # Configure the product catalog cache
         self.init_jinja()        # Improve Jinja environment
         self.init_blueprints()   # Import and attach all route blueprints
+        self.warm_templates()    # Compile every template before serving
+        self.init_middleware()   # Compress responses
 
         return self.app          # Return the fully prepared Flask app
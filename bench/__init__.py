@@ -0,0 +1,15 @@
+"""
+HTTP benchmark suite for Timeless Threads
+-----------------------------------------
+Builds the app through AppFactory against a MongoDB of your choice,
+seeds a catalog with seed.py's generator, drives every blueprint
+with concurrent clients and writes per-route latency / throughput /
+DB round trips to JSON.
+
+Run:
+    python -m bench                              → mongod on PATH, else mongomock
+    python -m bench --mongo-uri mongodb://…/db   → an existing server (data is replaced!)
+    python -m bench --mongod /path/to/mongod     → a throwaway mongod
+    python -m bench --mongomock                  → in-process stand-in (pip install mongomock)
+    python -m bench --compare bench/results/old.json
+"""
@@ -0,0 +1,139 @@
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from pymongo import MongoClient
+from pymongo.errors import ConfigurationError, PyMongoError
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ---------------------------------------------------------
+# THROWAWAY MONGOD
+# A fresh mongod on a free port with a temporary data directory,
+# removed again by stop().
+# ---------------------------------------------------------
+class Mongod:
+    def __init__(self, binary="mongod"):
+        self.binary = shutil.which(binary) or binary
+        self.port = free_port()
+        self.dbpath = tempfile.mkdtemp(prefix="tt-bench-mongod-")
+        self.process = None
+
+    @property
+    def uri(self):
+        return f"mongodb://127.0.0.1:{self.port}/timeless_bench"
+
+    def start(self, timeout=30):
+        self.process = subprocess.Popen(
+            [self.binary, "--dbpath", self.dbpath, "--port", str(self.port),
+             "--bind_ip", "127.0.0.1", "--quiet"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        client = MongoClient(self.uri, serverSelectionTimeoutMS=500)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                client.admin.command("ping")
+                break
+            except PyMongoError:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError(f"mongod did not start ({self.binary})")
+                time.sleep(0.2)
+        client.close()
+        return self
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        shutil.rmtree(self.dbpath, ignore_errors=True)
+
+
+def mongomock_available():
+    try:
+        import mongomock  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def use_mongomock():
+    """
+    Route Flask-PyMongo to mongomock (in-process, no server).
+
+    mongomock runs no real queries and sends no command events, so
+    its latencies are not comparable with a real server and DB round
+    trips are reported as 0. Use it to exercise the routes and the
+    Python side of the app.
+    """
+    import mongomock
+    import flask_pymongo
+
+    flask_pymongo.MongoClient = mongomock.MongoClient
+
+
+def check_replaceable(uri, replace=False):
+    """
+    Refuse to seed a database that already holds data (the run
+    deletes it), unless `replace` (--replace-data) says so.
+    """
+    from seed import GENERATED_COLLECTIONS
+
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    try:
+        db = client.get_default_database()
+        existing = [name for name in GENERATED_COLLECTIONS if db[name].find_one({}, {"_id": 1})]
+    except ConfigurationError:
+        raise SystemExit("❌ --mongo-uri needs a database name, e.g. mongodb://host:27017/timeless_bench")
+    except PyMongoError as e:
+        raise SystemExit(f"❌ Cannot reach {uri}: {e}")
+    finally:
+        client.close()
+
+    if existing and not replace:
+        raise SystemExit(
+            f"❌ '{db.name}' already has {', '.join(existing)}; the benchmark deletes them. "
+            "Pass --replace-data to replace them."
+        )
+
+
+def resolve_backend(args):
+    """
+    Pick the database for a run:
+        --mongo-uri → that server
+        --mongod    → a throwaway mongod from that binary
+        --mongomock → in-process stand-in
+        (none)      → mongod on PATH, else mongomock
+    Returns (name, uri, cleanup).
+    """
+    if args.mongo_uri:
+        check_replaceable(args.mongo_uri, args.replace_data)
+        return "mongodb", args.mongo_uri, lambda: None
+
+    if args.mongomock:
+        if not mongomock_available():
+            raise SystemExit("❌ --mongomock needs `pip install mongomock`")
+        return "mongomock", "mongodb://localhost:27017/timeless_bench", lambda: None
+
+    binary = args.mongod or shutil.which("mongod")
+    if binary:
+        mongod = Mongod(binary).start()
+        print(f"✔ Started mongod on port {mongod.port}")
+        return "mongod", mongod.uri, mongod.stop
+
+    if mongomock_available():
+        print("⚠ WARNING: No mongod found, using mongomock (latencies are not representative)")
+        return "mongomock", "mongodb://localhost:27017/timeless_bench", lambda: None
+
+    raise SystemExit("❌ No database: pass --mongo-uri, install mongod, or `pip install mongomock`")
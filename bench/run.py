@@ -0,0 +1,350 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+import requests
+from bench.backends import free_port, resolve_backend
+from bench.scenarios import SERVER_TIMING, Context, default_scenarios
+from bench.server import serve
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(values, q):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+# ---------------------------------------------------------
+# RECORDING
+# One Recorder per run; every worker thread appends to it.
+# ---------------------------------------------------------
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.messages = {}
+        self._lock = threading.Lock()
+
+    def add(self, label, ms, db_queries, db_ms, ok, message=None):
+        with self._lock:
+            self.samples.setdefault(label, []).append((ms, db_queries, db_ms))
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+                if message:
+                    self.messages.setdefault(label, message)
+
+    def error(self, label, message):
+        with self._lock:
+            self.samples.setdefault(label, [])
+            self.errors[label] = self.errors.get(label, 0) + 1
+            self.messages.setdefault(label, message)
+
+    def summary(self, label, seconds):
+        samples = self.samples.get(label, [])
+        latencies = sorted(ms for ms, _, _ in samples)
+        queries = sorted(q for _, q, _ in samples if q is not None)
+        db_ms = [d for _, _, d in samples if d is not None]
+
+        return {
+            "requests": len(samples),
+            "errors": self.errors.get(label, 0),
+            "error_sample": self.messages.get(label),
+            "rps": round(len(samples) / seconds, 1) if seconds else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+            "db_round_trips": round(statistics.fmean(queries), 2) if queries else None,
+            "db_round_trips_p95": percentile(queries, 95) if queries else None,
+            "db_ms": round(statistics.fmean(db_ms), 2) if db_ms else None,
+        }
+
+
+class Caller:
+    """
+    The `call` scenarios use: one per worker, with its own session
+    (cookies, keep-alive connection).
+    """
+
+    def __init__(self, base_url, recorder, worker):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.worker = worker
+        self.session = requests.Session()
+
+    def __call__(self, label, method, path, data=None, expect=200, location=None):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, data=data, allow_redirects=False, timeout=30)
+        except requests.RequestException as e:
+            if label:
+                self.recorder.error(label, f"{type(e).__name__}: {e}")
+            return None
+        ms = (time.perf_counter() - start) * 1000
+
+        message = None
+        if response.status_code != expect:
+            message = f"{method} {path} → {response.status_code}, expected {expect}"
+        elif location and response.headers.get("Location", "").rstrip("/") != location.rstrip("/"):
+            message = f"{method} {path} → redirected to {response.headers.get('Location')}, expected {location}"
+
+        if label:
+            timing = SERVER_TIMING.search(response.headers.get("Server-Timing", ""))
+            db_ms, db_queries = (float(timing.group(1)), int(timing.group(2))) if timing else (None, None)
+            self.recorder.add(label, ms, db_queries, db_ms, message is None, message)
+        return response
+
+    def error(self, label, message):
+        self.recorder.error(label, message)
+
+    def close(self):
+        self.session.close()
+
+
+def run_scenario(scenario, ctx, concurrency, duration, warmup):
+    """
+    Run one scenario on `concurrency` threads: setup, `warmup`
+    untimed seconds, then `duration` timed seconds.
+
+    :return: (recorder, timed seconds)
+    """
+    recorder = Recorder()
+    discard = Recorder()
+    ready = threading.Barrier(concurrency + 1)
+    phase = {"recorder": discard, "stop": False}
+
+    def worker(index):
+        rng = ctx.rng(f"{scenario.name}:{index}")
+        call = Caller(ctx.base_url, discard, index)
+        try:
+            scenario.setup(call, ctx, rng)
+        finally:
+            ready.wait()
+        try:
+            while not phase["stop"]:
+                call.recorder = phase["recorder"]
+                scenario.run(call, ctx, rng)
+        finally:
+            call.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+
+    time.sleep(warmup)
+    phase["recorder"] = recorder
+    start = time.perf_counter()
+    time.sleep(duration)
+    phase["stop"] = True
+    for thread in threads:
+        thread.join()
+
+    return recorder, time.perf_counter() - start
+
+
+# ---------------------------------------------------------
+# SERVER
+# ---------------------------------------------------------
+def start_server(options, timeout=600):
+    """
+    Start bench.server.serve() in a fresh process and wait until it
+    has seeded the data and is listening.
+    """
+    context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = context.Pipe()
+    # Not a daemon: the server seeds through a pool of worker processes
+    process = context.Process(target=serve, args=(options, child_conn))
+    process.start()
+
+    if not parent_conn.poll(timeout):
+        process.terminate()
+        raise SystemExit(f"❌ Server did not start, see {options['log']}")
+    info = parent_conn.recv()
+    if "error" in info:
+        process.join(5)
+        raise SystemExit(f"❌ Server failed: {info['error']} (log: {options['log']})")
+    return process, info
+
+
+# ---------------------------------------------------------
+# REPORTING
+# ---------------------------------------------------------
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(routes):
+    header = f"{'route':<24}{'req':>7}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'db rt':>7}{'db ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for label, r in routes.items():
+        db_rt = "-" if r["db_round_trips"] is None else f"{r['db_round_trips']:.1f}"
+        db_ms = "-" if r["db_ms"] is None else f"{r['db_ms']:.1f}"
+        print(
+            f"{label:<24}{r['requests']:>7}{r['errors']:>6}{r['rps']:>9.1f}"
+            f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{db_rt:>7}{db_ms:>8}"
+        )
+    for label, r in routes.items():
+        if r["error_sample"]:
+            print(f"⚠ {label}: {r['error_sample']}")
+
+
+def print_comparison(routes, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('commit')}, {baseline['meta'].get('backend')})")
+    print(f"{'route':<24}{'p50':>20}{'p95':>20}{'rps':>20}")
+    for label, r in routes.items():
+        old = baseline["routes"].get(label)
+        if not old:
+            print(f"{label:<24}{'(new)':>20}")
+            continue
+
+        def delta(key, fmt):
+            before, after = old[key], r[key]
+            change = f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+            return f"{fmt.format(before)}→{fmt.format(after)} {change}"
+
+        print(f"{label:<24}{delta('p50_ms', '{:.1f}'):>20}{delta('p95_ms', '{:.1f}'):>20}{delta('rps', '{:.0f}'):>20}")
+
+
+# ---------------------------------------------------------
+# ENTRY POINT
+# ---------------------------------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="HTTP benchmark for Timeless Threads")
+
+    backend = parser.add_argument_group("database")
+    backend.add_argument("--mongo-uri", help="benchmark against this server's database")
+    backend.add_argument("--replace-data", action="store_true", help="allow deleting the data already in --mongo-uri")
+    backend.add_argument("--mongod", metavar="PATH", help="start a throwaway mongod from this binary")
+    backend.add_argument("--mongomock", action="store_true", help="use the in-process mongomock stand-in")
+
+    data = parser.add_argument_group("data")
+    data.add_argument("--products", type=int, default=2000)
+    data.add_argument("--reviews", type=int, default=20000)
+    data.add_argument("--users", type=int, default=200)
+    data.add_argument("--carts", type=int, default=1000, help="stored carts besides the workers' own")
+    data.add_argument("--seed", type=int, default=42)
+    data.add_argument("--seed-workers", type=int, default=os.cpu_count() or 1, help="processes writing the seed data")
+
+    load = parser.add_argument_group("load")
+    load.add_argument("--concurrency", type=int, default=8, help="worker threads per scenario")
+    load.add_argument("--duration", type=float, default=10, help="timed seconds per scenario")
+    load.add_argument("--warmup", type=float, default=2, help="untimed seconds per scenario")
+    load.add_argument("--scenarios", help="comma separated subset, e.g. home,search,cart")
+    load.add_argument("--rate-limits", action="store_true", help="keep the app's rate limits on")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", help="results file (default bench/results/<time>.json)")
+    output.add_argument("--compare", metavar="JSON", help="earlier results file to compare with")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    scenarios = default_scenarios()
+    if args.scenarios:
+        wanted = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+        unknown = set(wanted) - {s.name for s in scenarios}
+        if unknown:
+            raise SystemExit(f"❌ Unknown scenarios: {', '.join(sorted(unknown))}")
+        scenarios = [s for s in scenarios if s.name in wanted]
+
+    backend, uri, cleanup = resolve_backend(args)
+    workdir = tempfile.mkdtemp(prefix="tt-bench-")
+    options = {
+        "backend": backend,
+        "uri": uri,
+        "port": free_port(),
+        "seed": args.seed,
+        "products": args.products,
+        "reviews": args.reviews,
+        "users": args.users,
+        "carts": args.carts,
+        "seed_workers": args.seed_workers,
+        "outbox": os.path.join(workdir, "outbox.jsonl"),
+        "log": os.path.join(workdir, "server.log"),
+        "rate_limits": args.rate_limits,
+    }
+
+    process = None
+    try:
+        print(f"⏳ Seeding {args.products} products / {args.reviews} reviews ({backend})…")
+        process, info = start_server(options)
+        print(f"✔ Server on port {options['port']}, {info['counts']} (log: {options['log']})")
+
+        ctx = Context(f"http://127.0.0.1:{options['port']}", info, options["outbox"], args.seed)
+        routes = {}
+        for scenario in scenarios:
+            print(f"▶ {scenario.name}")
+            recorder, seconds = run_scenario(scenario, ctx, args.concurrency, args.duration, args.warmup)
+            for label in recorder.samples:
+                routes[label] = recorder.summary(label, seconds)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.join(10)
+        cleanup()
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "backend": backend,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "data": info["counts"],
+            "most_reviewed": info["most_reviewed"],
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "rate_limits": args.rate_limits,
+        },
+        "routes": routes,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print()
+    print_table(routes)
+    if backend == "mongomock":
+        print("\n⚠ mongomock: latencies are not representative and DB round trips are not reported")
+    print(f"\n✔ Results written to {output}")
+
+    if args.compare:
+        print_comparison(routes, args.compare)
+    return 0 if not any(r["errors"] for r in routes.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
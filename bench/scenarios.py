@@ -0,0 +1,173 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from itertools import accumulate
+
+
+# Server-Timing written by utils/db_tracker.py
+SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) quer')
+OTP_PATTERN = re.compile(r"\b(\d{6})\b")
+
+
+class OutboxReader:
+    """
+    Follows the EMAIL_OUTBOX file the app's LocalTransport appends to,
+    and remembers the latest OTP sent to each address.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.latest = {}
+        self._buffer = ""
+        self._lock = threading.Lock()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            f.seek(self.offset)
+            data = f.read()
+            self.offset = f.tell()
+
+        lines = (self._buffer + data).split("\n")
+        # The last piece may be a line still being written
+        self._buffer = lines.pop()
+        for line in lines:
+            if line:
+                message = json.loads(line)
+                match = OTP_PATTERN.search(message.get("html", ""))
+                if match:
+                    self.latest[message["to"]] = (message["sent_at"], match.group(1))
+
+    def wait_for(self, email, previous=None, timeout=10):
+        """
+        (sent_at, otp) of an email to `email` newer than `previous`,
+        or None.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                self._read()
+                sent = self.latest.get(email)
+            if sent and sent != previous:
+                return sent
+            time.sleep(0.01)
+        return None
+
+
+class Context:
+    """
+    What the scenarios need to know about the seeded data.
+    """
+
+    def __init__(self, base_url, info, outbox, seed):
+        self.base_url = base_url
+        self.info = info
+        self.outbox = OutboxReader(outbox)
+        self.seed = seed
+        self.weights = list(accumulate(1 / rank ** 1.1 for rank in range(1, len(info["products"]) + 1)))
+
+    def rng(self, worker):
+        return random.Random(f"{self.seed}:{worker}")
+
+    def popular_product(self, rng):
+        # Same skew as the reviews: popular products are viewed more
+        return rng.choices(self.info["products"], cum_weights=self.weights)[0]
+
+
+# ---------------------------------------------------------
+# SCENARIOS
+# A scenario makes one or more requests per iteration through
+# `call(label, method, path, **kwargs)`, which times them.
+# setup() runs once per worker before the timed phase.
+# ---------------------------------------------------------
+class Scenario:
+    name = None
+
+    def setup(self, call, ctx, rng):
+        pass
+
+    def run(self, call, ctx, rng):
+        raise NotImplementedError
+
+
+class Get(Scenario):
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+
+    def run(self, call, ctx, rng):
+        call(self.name, "GET", self.path(ctx, rng) if callable(self.path) else self.path)
+
+
+class AddToCart(Scenario):
+    name = "add_to_cart"
+
+    @staticmethod
+    def form(product, rng):
+        return {
+            "product_id": product["id"],
+            "quantity": 1,
+            "selected_size": rng.choice(product["sizes"]) if product.get("sizes") else "",
+            "selected_color": rng.choice(product["colors"]) if product.get("colors") else "",
+        }
+
+    def run(self, call, ctx, rng):
+        product = ctx.popular_product(rng)
+        call(self.name, "POST", "/product/add-to-cart", data=self.form(product, rng), expect=302)
+
+
+class CartPage(Scenario):
+    name = "cart"
+    LINES = 5
+
+    def setup(self, call, ctx, rng):
+        for _ in range(self.LINES):
+            product = ctx.popular_product(rng)
+            call(None, "POST", "/product/add-to-cart", data=AddToCart.form(product, rng), expect=302)
+
+    def run(self, call, ctx, rng):
+        call(self.name, "GET", "/product/cart")
+
+
+class LoginOTP(Scenario):
+    """
+    Full email OTP login: request a code, read it from the outbox,
+    submit it. Timed as otp_send and otp_verify.
+
+    Each worker logs in as its own user, so a code is never replaced
+    by another worker's request before it is used.
+    """
+
+    name = "login_otp"
+
+    def run(self, call, ctx, rng):
+        email = ctx.info["users"][call.worker % len(ctx.info["users"])]
+        previous = ctx.outbox.latest.get(email)
+
+        call("otp_send", "POST", "/auth/send-login-email", data={"email": email})
+        sent = ctx.outbox.wait_for(email, previous)
+        if sent is None:
+            call.error("otp_verify", "no OTP email")
+            return
+        call("otp_verify", "POST", "/auth/verify-login-otp", data={"email": email, "otp": sent[1]},
+             expect=302, location="/")
+
+
+def default_scenarios():
+    return [
+        Get("home", "/"),
+        Get("category", lambda ctx, rng: f"/product/category/{rng.choice(ctx.info['categories'])}"),
+        Get("search", lambda ctx, rng: f"/search?q={rng.choice(ctx.info['search_terms'])}"),
+        Get("suggest", lambda ctx, rng: f"/search/suggest?q={rng.choice(ctx.info['search_terms'])[:3]}"),
+        Get("product", lambda ctx, rng: f"/product/{ctx.popular_product(rng)['id']}"),
+        Get("product_most_reviewed", lambda ctx, rng: f"/product/{ctx.info['most_reviewed']['id']}"),
+        AddToCart(),
+        CartPage(),
+        LoginOTP(),
+        Get("faq", "/faq"),
+    ]
@@ -0,0 +1,34 @@
+import seed
+
+
+def seed_catalog(db, products=2000, reviews=20000, users=200, carts=0, seed_value=42, workers=1, uri=None):
+    """
+    Replace the data in `db` with seed.py's generated catalog
+    (same seed → same data).
+
+    :return: dict describing the data, used by the bench scenarios
+    """
+    spec = seed.GeneratorSpec(
+        products=products, reviews=reviews, users=users, carts=carts, seed=seed_value
+    )
+    counts = seed.generate(db, spec, workers=workers, uri=uri)
+
+    # Scenarios pick products by popularity: most popular first
+    ids = [spec.product_id(spec.index_at_rank(rank)) for rank in range(1, min(products, 5000) + 1)]
+    variants = {
+        doc["_id"]: doc
+        for doc in db.products.find({"_id": {"$in": ids}}, {"sizes": 1, "colors": 1, "rating_count": 1})
+    }
+    most_reviewed = variants[ids[0]]
+
+    return {
+        "products": [
+            {"id": str(pid), "sizes": variants[pid].get("sizes"), "colors": variants[pid].get("colors")}
+            for pid in ids
+        ],
+        "most_reviewed": {"id": str(ids[0]), "reviews": most_reviewed.get("rating_count", 0)},
+        "categories": [c["name"] for c in seed.categories],
+        "search_terms": sorted({p["name"].split()[-1].lower() for p in seed.products}),
+        "users": [seed.user_email(i) for i in range(min(users, 1000))],
+        "counts": counts,
+    }
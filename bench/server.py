@@ -0,0 +1,70 @@
+import logging
+import os
+import sys
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+
+class KeepAliveHandler(WSGIRequestHandler):
+    # Keep client connections open, so runs measure the app and
+    # not a TCP handshake per request
+    protocol_version = "HTTP/1.1"
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def serve(options, conn):
+    """
+    Child process: build the app, seed it, serve it, report back.
+
+    `options` (plain dict, picklable):
+        backend, uri, port, seed, products, reviews, users, carts,
+        seed_workers, outbox, log, rate_limits
+    Sends the seed description (or {"error": …}) through `conn` once
+    the server accepts connections, then serves until terminated.
+    """
+    sys.stdout = sys.stderr = open(options["log"], "a", buffering=1)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    os.environ["MONGO_URI"] = options["uri"]
+    os.environ["EMAIL_TRANSPORT"] = "local"
+    os.environ["EMAIL_OUTBOX"] = options["outbox"]
+    if not options["rate_limits"]:
+        os.environ["RATE_LIMIT_STORE"] = "off"
+
+    try:
+        if options["backend"] == "mongomock":
+            from bench.backends import use_mongomock
+            use_mongomock()
+
+        from app_factory import AppFactory
+        from database.connection import mongo
+        from models.product_model import ProductModel
+        from bench.seeding import seed_catalog
+
+        app = AppFactory().create_app()
+        app.config["DEBUG"] = False
+        app.config["SECRET_KEY"] = app.config.get("SECRET_KEY") or "bench-secret"
+
+        # mongomock lives in this process, so only a real server can
+        # be seeded by worker processes
+        info = seed_catalog(
+            mongo.db,
+            products=options["products"],
+            reviews=options["reviews"],
+            users=options["users"],
+            carts=options["carts"],
+            seed_value=options["seed"],
+            workers=1 if options["backend"] == "mongomock" else options["seed_workers"],
+            uri=options["uri"]
+        )
+        # Caches in this process start from the new catalog
+        ProductModel(mongo).bump_version()
+
+        server = make_server("127.0.0.1", options["port"], app, threaded=True, request_handler=KeepAliveHandler)
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+        raise
+
+    conn.send(info)
+    server.serve_forever()
@@ -30,3 +30,179 @@ class DevelopmentConfig:
     # MongoDB connection URI
     # Stored in .env as MONGO_URI
     MONGO_URI = os.getenv("MONGO_URI")
+
+    # Create missing MongoDB indexes when the app starts
+    # (set MONGO_AUTO_INDEX=0 to manage indexes manually)
+    MONGO_AUTO_INDEX = os.getenv("MONGO_AUTO_INDEX", "1") == "1"
+
+    # ---------------------------------------------------------
+    # MongoDB client (see database/settings.py, MongoSettings)
+    #   MONGO_MAX_POOL_SIZE / MONGO_MIN_POOL_SIZE → connections per
+    #                                  worker process
+    #   MONGO_WAIT_QUEUE_TIMEOUT_MS → fail a request instead of waiting
+    #                                  longer for a free connection
+    #   MONGO_COMPRESSORS           → preferred first; zstd needs
+    #                                  `zstandard`, snappy `python-snappy`
+    #   MONGO_CATALOG_READ_PREFERENCE / MONGO_CATALOG_MAX_STALENESS_SECONDS
+    #                               → product and review listing reads
+    #                                  (auth, OTP and cart stay on the primary)
+    #   MONGO_WRITE_CONCERN_W       → "majority", 1, … (empty = server default)
+    #   MONGO_POOL_WAIT_WARN_MS     → log a saturated pool when a checkout
+    #                                  waits this long
+    # ---------------------------------------------------------
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 0)) or None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0)) or None
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 0)) or None
+    MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+    MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+    MONGO_CATALOG_READ_PREFERENCE = os.getenv("MONGO_CATALOG_READ_PREFERENCE", "secondaryPreferred")
+    MONGO_CATALOG_MAX_STALENESS_SECONDS = int(os.getenv("MONGO_CATALOG_MAX_STALENESS_SECONDS", 90)) or None
+    MONGO_WRITE_CONCERN_W = os.getenv("MONGO_WRITE_CONCERN_W") or None
+    MONGO_POOL_WAIT_WARN_MS = int(os.getenv("MONGO_POOL_WAIT_WARN_MS", 50))
+
+    # Count bytes sent / received per Mongo command (re-encodes every
+    # command and reply as BSON, so only turn it on while investigating)
+    MONGO_COMMAND_BYTES = os.getenv("MONGO_COMMAND_BYTES", "0") == "1"
+
+    # ---------------------------------------------------------
+    # Telemetry (GET /metrics, Prometheus text format)
+    #   METRICS_TOKEN         → bearer token for scrapers; without
+    #                           it /metrics is not served at all
+    #   METRICS_DIR           → per-worker snapshot files, added up
+    #                           by /metrics (default instance/metrics)
+    #   METRICS_FLUSH_SECONDS → how often each worker writes its file
+    # ---------------------------------------------------------
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    METRICS_DIR = os.getenv("METRICS_DIR")
+    METRICS_FLUSH_SECONDS = int(os.getenv("METRICS_FLUSH_SECONDS", 5))
+
+    # ---------------------------------------------------------
+    # Per-request MongoDB accounting (see utils/db_tracker.py)
+    # A warning is logged when a request goes over:
+    #   DB_TRACKER_MAX_QUERIES      → round trips
+    #   DB_TRACKER_MAX_MS           → milliseconds spent in MongoDB
+    #   DB_TRACKER_REPEAT_THRESHOLD → runs of the same query shape (N+1)
+    # DB_SERVER_TIMING adds `Server-Timing: db;dur=…` to responses.
+    # ---------------------------------------------------------
+    DB_TRACKER_MAX_QUERIES = int(os.getenv("DB_TRACKER_MAX_QUERIES", 10))
+    DB_TRACKER_MAX_MS = int(os.getenv("DB_TRACKER_MAX_MS", 100))
+    DB_TRACKER_REPEAT_THRESHOLD = int(os.getenv("DB_TRACKER_REPEAT_THRESHOLD", 3))
+    DB_SERVER_TIMING = os.getenv("DB_SERVER_TIMING", "1") == "1"
+
+    # Shopping cart storage: "mongo" (shared by all workers)
+    # or "memory" (single-process development only)
+    CART_STORE = os.getenv("CART_STORE", "mongo")
+
+    # OTP storage: "mongo" (shared by all workers, TTL index)
+    # or "memory" (single-process development only)
+    OTP_STORE = os.getenv("OTP_STORE", "mongo")
+    OTP_MEMORY_MAX_ENTRIES = int(os.getenv("OTP_MEMORY_MAX_ENTRIES", 10000))
+
+    # ---------------------------------------------------------
+    # Rate limiting (token buckets, see utils/rate_limit.py)
+    #   RATE_LIMIT_STORE      → "local" (shared memory file, workers
+    #                           of one machine), "mongo" (every
+    #                           machine) or "off"
+    #   RATE_LIMIT_PROXY_HOPS → trusted proxies in front of the app
+    #                           (1 on Render / behind nginx), so the
+    #                           client IP is read from X-Forwarded-For
+    #   RATE_LIMITS           → "count/period" per named limit
+    # ---------------------------------------------------------
+    RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "local")
+    RATE_LIMIT_PROXY_HOPS = int(os.getenv("RATE_LIMIT_PROXY_HOPS", 0))
+    RATE_LIMITS = {
+        # Every POST under /auth, per IP
+        "auth_ip": os.getenv("RATE_LIMIT_AUTH_IP", "30/minute"),
+        # OTP emails sent, per IP and per recipient
+        "otp_send_ip": os.getenv("RATE_LIMIT_OTP_SEND_IP", "20/hour"),
+        "otp_send_email": os.getenv("RATE_LIMIT_OTP_SEND_EMAIL", "5/hour"),
+        # OTP guesses, per email
+        "otp_verify_email": os.getenv("RATE_LIMIT_OTP_VERIFY_EMAIL", "10/15minutes"),
+        # Full-text search, per IP
+        "search_ip": os.getenv("RATE_LIMIT_SEARCH_IP", "60/minute"),
+    }
+
+    # ---------------------------------------------------------
+    # Product catalog cache (per worker process)
+    #   CATALOG_CACHE_SIZE   → max cached entries (LRU eviction)
+    #   CATALOG_CACHE_TTL    → seconds an entry stays valid
+    #   CATALOG_VERSION_CHECK → seconds between catalog version checks
+    # ---------------------------------------------------------
+    CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", 512))
+    CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", 300))
+    CATALOG_VERSION_CHECK = float(os.getenv("CATALOG_VERSION_CHECK", 2))
+
+    # ---------------------------------------------------------
+    # Outgoing email (background dispatcher)
+    #   EMAIL_TRANSPORT   → "resend" (RESEND_API_KEY + EMAIL_FROM)
+    #                       or "local" (no network, for dev/tests)
+    #   EMAIL_OUTBOX      → local transport: also append JSON lines here
+    #   EMAIL_QUEUE_SIZE  → max queued emails, extra ones are dropped
+    #   EMAIL_WORKERS     → delivery threads per process
+    #   EMAIL_MAX_RETRIES → retries for timeouts / 5xx / 429
+    #   EMAIL_*_TIMEOUT   → seconds to connect / to read the reply
+    # ---------------------------------------------------------
+    EMAIL_TRANSPORT = os.getenv("EMAIL_TRANSPORT", "resend")
+    EMAIL_OUTBOX = os.getenv("EMAIL_OUTBOX")
+    EMAIL_QUEUE_SIZE = int(os.getenv("EMAIL_QUEUE_SIZE", 1000))
+    EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", 2))
+    EMAIL_MAX_RETRIES = int(os.getenv("EMAIL_MAX_RETRIES", 3))
+    EMAIL_BACKOFF_SECONDS = float(os.getenv("EMAIL_BACKOFF_SECONDS", 0.5))
+    EMAIL_CONNECT_TIMEOUT = float(os.getenv("EMAIL_CONNECT_TIMEOUT", 3.05))
+    EMAIL_READ_TIMEOUT = float(os.getenv("EMAIL_READ_TIMEOUT", 10))
+    EMAIL_BREAKER_THRESHOLD = int(os.getenv("EMAIL_BREAKER_THRESHOLD", 5))
+    EMAIL_BREAKER_RESET = float(os.getenv("EMAIL_BREAKER_RESET", 30))
+
+    # ---------------------------------------------------------
+    # Jinja templates
+    #   JINJA_BYTECODE_CACHE → directory for compiled templates, shared
+    #                          by all workers (default instance/jinja_cache)
+    #   JINJA_PRECOMPILE     → compile every template at startup
+    # ---------------------------------------------------------
+    JINJA_BYTECODE_CACHE = os.getenv("JINJA_BYTECODE_CACHE")
+    JINJA_PRECOMPILE = os.getenv("JINJA_PRECOMPILE", "1") == "1"
+
+    # ---------------------------------------------------------
+    # Rendered page cache for anonymous visitors (per worker)
+    #   PAGE_CACHE_SIZE → max cached pages (0 disables it)
+    #   PAGE_CACHE_TTL  → seconds a page stays valid; catalog pages
+    #                     also expire when the catalog version changes
+    # ---------------------------------------------------------
+    PAGE_CACHE_SIZE = int(os.getenv("PAGE_CACHE_SIZE", 256))
+    PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", 60))
+
+    # ---------------------------------------------------------
+    # On-demand image resizing (/img/<width>/<name>)
+    #   IMAGE_RESIZE_WIDTHS → the only widths that are served
+    #   IMAGE_CACHE_MAX_MB  → disk cache limit (LRU eviction)
+    #   IMAGE_CACHE_DIR     → defaults to instance/image_cache
+    # ---------------------------------------------------------
+    IMAGE_RESIZE_WIDTHS = tuple(
+        int(w) for w in os.getenv("IMAGE_RESIZE_WIDTHS", "160,320,640,1024").split(",")
+    )
+    IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", 256))
+    IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR")
+
+    # ---------------------------------------------------------
+    # Fingerprinted static files (python manage.py build-static)
+    #   STATIC_FINGERPRINT_DEV → serve a source file edited after the
+    #                            build unversioned (local stylesheet
+    #                            work); costs a stat() per asset URL
+    # ---------------------------------------------------------
+    STATIC_FINGERPRINT_DEV = os.getenv("STATIC_FINGERPRINT_DEV", "0") == "1"
+
+    # ---------------------------------------------------------
+    # Response compression (WSGI middleware)
+    #   COMPRESS_RESPONSES  → set to 0 when a proxy already compresses
+    #   COMPRESS_MIN_SIZE   → smaller bodies are sent as they are
+    #   COMPRESS_LEVEL      → gzip level (1-9)
+    #   COMPRESS_BR_QUALITY → brotli quality (0-11), if brotli is installed
+    # ---------------------------------------------------------
+    COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+    COMPRESS_BR_QUALITY = int(os.getenv("COMPRESS_BR_QUALITY", 5))
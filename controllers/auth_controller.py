@@ -2,9 +2,8 @@ from flask import session, flash, redirect, url_for, render_template
 from models.user_model import UserModel
 from models.otp_model import OTP
 from utils.otp_generator import otp_service
+from utils.email_dispatcher import email_dispatcher
 import datetime
-import requests
-import os
 
 
 class AuthController:
@@ -14,20 +13,13 @@ class AuthController:
         self.mongo = mongo
 
     # =====================================================================
-    # SEND EMAIL USING RESEND API (SMTP BLOCKED ON RENDER)
+    # SEND OTP EMAIL
+    #
+    # The email is only queued here; background workers deliver it
+    # through RESEND (SMTP is blocked on Render), see
+    # utils/email_dispatcher.py. Returns False if it could not be queued.
     # =====================================================================
     def send_email(self, to_email, otp):
-        api_key = os.getenv("RESEND_API_KEY")
-        sender = os.getenv("EMAIL_FROM")
-
-        if not api_key:
-            print("❌ ERROR: RESEND_API_KEY missing in environment!")
-            return False
-
-        if not sender:
-            print("❌ ERROR: EMAIL_FROM missing!")
-            return False
-
         html_content = f"""
         <div style="font-family:Arial; max-width:420px; margin:auto; background:#fff;
                     padding:20px; border:1px solid #ddd; border-radius:10px;">
@@ -57,33 +49,7 @@ class AuthController:
         </div>
         """
 
-        url = "https://api.resend.com/emails"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "from": sender,
-            "to": to_email,
-            "subject": "Your Timeless Threads OTP Code",
-            "html": html_content
-        }
-
-        try:
-            print("📨 Sending OTP via RESEND...")
-            response = requests.post(url, headers=headers, json=payload)
-
-            if response.status_code in (200, 201):
-                print("✔ OTP Email sent successfully through RESEND")
-                return True
-            else:
-                print("❌ RESEND ERROR:", response.text)
-                return False
-
-        except Exception as e:
-            print("❌ Email sending failed:", e)
-            return False
+        return email_dispatcher.send(to_email, "Your Timeless Threads OTP Code", html_content)
 
     # =====================================================================
     # LOGIN PAGE
@@ -104,7 +70,9 @@ class AuthController:
         session["otp_email"] = email
         session["otp_mode"] = "login"
 
-        self.send_email(email, otp)
+        if not self.send_email(email, otp):
+            flash("Could not send the OTP email. Please try again later.", "danger")
+            return redirect(url_for("auth.login"))
 
         flash("OTP sent to your email!", "success")
         return render_template("verify_otp.html", email=email)
@@ -175,7 +143,9 @@ class AuthController:
         otp = otp_service.generate_otp(email)
         session["otp_mode"] = "signup"
 
-        self.send_email(email, otp)
+        if not self.send_email(email, otp):
+            flash("Could not send the OTP email. Please try again later.", "danger")
+            return redirect(url_for("auth.signup_name"))
 
         flash("OTP sent to your email!", "success")
         return render_template("verify_otp.html", email=email)
@@ -1,6 +1,8 @@
 from flask import render_template, session, flash, redirect, url_for
 from bson import ObjectId
-from datetime import datetime
+from models.product_model import ProductModel
+from utils.cart_store import cart_store
+from utils.metrics import metrics
 
 
 class CartController:
@@ -8,21 +10,47 @@ class CartController:
         # Store Mongo reference for DB operations
         self.mongo = mongo
 
+        # Product lookups go through ProductModel (served from the catalog cache)
+        self.products = ProductModel(mongo)
+
+        # Cart lines live server-side; the session only holds a cart token
+        self.cart = cart_store
+
     # ---------------------------------------------------------
     # NORMALIZE CART
-    # Ensures the cart always follows a consistent structure:
-    # Each item becomes a dict with:
-    #   - product_id (str)
-    #   - quantity (int)
-    #   - size (str | None)
-    #   - color (str | None)
+    # Runs before every cart-aware route. Current carts (schema
+    # version in the session matches CART_SCHEMA_VERSION) and
+    # sessions without a cart return after a single version check.
     #
-    # Also converts old formats where item was simply a string.
+    # Older carts are upgraded once:
+    #   v0 → legacy list in the session cookie (session["cart"]):
+    #        each item is normalized to
+    #          - product_id (str)
+    #          - quantity (int)
+    #          - size (str | None)
+    #          - color (str | None)
+    #        (old formats where the item was simply a string are
+    #        converted too) and moved into the cart store.
+    #   v1 → server-side cart from before schema stamping:
+    #        lines are already normalized, only the stamp is added.
+    #
+    # Every upgrade is counted in metrics ("cart_schema_upgrades").
     # ---------------------------------------------------------
     def normalize_cart(self):
-        cart = session.get("cart", [])
+        if self.cart.is_current():
+            return
+
+        version = self.cart.schema_version()
+        metrics.inc("cart_schema_upgrades", from_version=str(version))
+
+        if version == 0:
+            self._upgrade_session_cart()
+
+        self.cart.mark_current()
+
+    def _upgrade_session_cart(self):
+        cart = session.pop("cart") or []
         normalized = []
-        changed = False
 
         for item in cart:
 
@@ -34,7 +62,6 @@ class CartController:
                     "size": None,
                     "color": None
                 })
-                changed = True
 
             # PROPER dict format
             elif isinstance(item, dict) and "product_id" in item:
@@ -45,14 +72,11 @@ class CartController:
                     "color": item.get("color")
                 })
 
-            # Invalid item → skip but mark cart as changed
-            else:
-                changed = True
+            # Invalid item → skip
 
-        # Save updated cart into session only if changes happened
-        if changed:
-            session["cart"] = normalized
-            session.modified = True
+        # Move the normalized items into the cart store
+        for item in normalized:
+            self.cart.add(item["product_id"], item["size"], item["color"], item["quantity"])
 
     # ---------------------------------------------------------
     # ADD ITEM TO CART
@@ -65,12 +89,12 @@ class CartController:
     def add_to_cart(self, product_id, quantity, size, color):
 
         # Validate product ID and fetch product
-        try:
-            product = self.mongo.db.products.find_one({"_id": ObjectId(product_id)})
-        except:
+        if not ObjectId.is_valid(product_id):
             flash("Invalid product.", "danger")
             return redirect(url_for("main.home"))
 
+        product = self.products.get_by_id(product_id)
+
         if not product:
             flash("Product not found.", "danger")
             return redirect(url_for("main.home"))
@@ -88,83 +112,80 @@ class CartController:
                 flash("Please select a color.", "warning")
                 return redirect(url_for("product.product_detail", product_id=product_id))
 
-        cart = session.get("cart", [])
-
-        # -----------------------------------------------------
-        # MATCH EXISTING ITEM (same product + same variant)
-        # If found → increase quantity instead of adding new row
-        # -----------------------------------------------------
-        for item in cart:
-            if (
-                item["product_id"] == product_id
-                and (item.get("size") or None) == (size if not is_cosmetics else None)
-                and (item.get("color") or None) == (color if not is_cosmetics else None)
-            ):
-                item["quantity"] += quantity
-                session["cart"] = cart
-                session.modified = True
-                flash("Quantity updated!", "success")
-                return redirect(url_for("product.product_detail", product_id=product_id))
-
         # -----------------------------------------------------
-        # ADD AS NEW CART ITEM
+        # ADD TO CART STORE
+        # Lines are keyed by (product, size, color): adding an
+        # existing variant increases its quantity instead of
+        # adding a new row, in one atomic update.
         # -----------------------------------------------------
-        cart.append({
-            "product_id": product_id,
-            "quantity": quantity,
-            "size": size if not is_cosmetics else None,
-            "color": color if not is_cosmetics else None,
-            "added_at": datetime.utcnow()
-        })
-
-        session["cart"] = cart
-        session.modified = True
-        flash("Added to cart!", "success")
+        existed = self.cart.add(
+            product_id,
+            size if not is_cosmetics else None,
+            color if not is_cosmetics else None,
+            quantity
+        )
+
+        flash("Quantity updated!" if existed else "Added to cart!", "success")
         return redirect(url_for("product.product_detail", product_id=product_id))
 
     # ---------------------------------------------------------
-    # VIEW CART
-    # Builds a structured list of cart items with:
-    #   - product details
-    #   - computed MRP (original price before discount)
+    # BUILD CART LINES
+    # Hydrates every cart entry in a single pass:
+    #   - all products resolved at once (one $in query at most,
+    #     usually served from the catalog cache)
+    #   - computed MRP (original price before discount), once
+    #     per product even if it appears in several lines
     #   - total price for each line item
-    # Then renders the cart page.
+    #   - cart subtotal
+    #
+    # Entries whose product no longer exists are skipped.
     # ---------------------------------------------------------
-    def cart_page(self):
-        cart_items = []
-        cart = session.get("cart", [])
+    def build_cart_lines(self, cart):
+        products = self.products.get_many(entry["product_id"] for entry in cart)
 
-        for entry in cart:
+        lines = []
+        subtotal = 0
+        mrps = {}
 
-            # Fetch product details safely
-            try:
-                product = self.mongo.db.products.find_one({"_id": ObjectId(entry["product_id"])})
-            except:
-                continue
+        for entry in cart:
+            pid = str(entry["product_id"])
+            product = products.get(pid)
 
             if not product:
                 continue
 
             # Calculate original price (MRP) from discounted price
-            if product.get("discount"):
-                mrp = int(product["price"] / (1 - product["discount"] / 100))
-            else:
-                mrp = product["price"]
+            if pid not in mrps:
+                if product.get("discount"):
+                    mrps[pid] = int(product["price"] / (1 - product["discount"] / 100))
+                else:
+                    mrps[pid] = product["price"]
+
+            total = product["price"] * entry["quantity"]   # final price * quantity
+            subtotal += total
 
-            cart_items.append({
+            lines.append({
                 "product": product,                         # entire product document
                 "quantity": entry["quantity"],
                 "size": entry.get("size"),
                 "color": entry.get("color"),
-                "total": product["price"] * entry["quantity"],  # final price * quantity
-                "mrp": mrp                                  # original price
+                "total": total,
+                "mrp": mrps[pid]                            # original price
             })
 
-        return render_template("cart.html", cart_items=cart_items)
+        return lines, subtotal
+
+    # ---------------------------------------------------------
+    # VIEW CART
+    # Renders the cart page from build_cart_lines().
+    # ---------------------------------------------------------
+    def cart_page(self):
+        cart_items, subtotal = self.build_cart_lines(self.cart.lines())
+        return render_template("cart.html", cart_items=cart_items, subtotal=subtotal)
 
     # ---------------------------------------------------------
     # REMOVE AN ITEM FROM CART
-    # Matches the exact variant (size + color) and removes only one.
+    # Removes the line matching the exact variant (size + color).
     # ---------------------------------------------------------
     def remove_from_cart(self, product_id, size, color):
 
@@ -174,25 +195,7 @@ class CartController:
         if color == "none":
             color = None
 
-        cart = session.get("cart", [])
-        new_cart = []
-        removed = False
-
-        for item in cart:
-            is_match = (
-                item["product_id"] == product_id and
-                (item.get("size") or None) == size and
-                (item.get("color") or None) == color
-            )
-
-            # Skip only the first matching item
-            if is_match and not removed:
-                removed = True
-            else:
-                new_cart.append(item)
-
-        session["cart"] = new_cart
-        session.modified = True
+        removed = self.cart.remove(product_id, size, color)
 
         flash("Item removed." if removed else "Item not found.",
               "info" if removed else "warning")
@@ -1,5 +1,6 @@
-from flask import render_template, abort
+from flask import render_template, abort, url_for
 from models.product_model import ProductModel
+from utils.http_cache import page_etag, is_fresh, not_modified, with_etag
 
 
 class CategoryController:
@@ -14,22 +15,36 @@ class CategoryController:
     #
     # This function:
     #   1. Ensures MongoDB connection exists.
-    #   2. Fetches all products from a given category.
+    #   2. Fetches one page of products from a given category.
     #   3. Renders the category page with product listing.
     #
     # Route will look like:
-    #   /category/<name>
+    #   /category/<name>?after=<page token>
     #
-    # Example: /category/shoes → loads all "shoes" products
+    # Example: /category/shoes → loads the first page of "shoes" products
     # ---------------------------------------------------------
-    def show_category(self, name):
+    def show_category(self, name, after=None):
         # Safety check for database connection
         if self.mongo is None:
             # abort() sends an HTTP error response (here: 500)
             abort(500, "Database not initialized")
 
-        # Fetch all products belonging to this category
-        products = self.products.get_by_category(name)
+        # Browser copy still current (same catalog version) → 304
+        etag = page_etag("c", self.products.catalog_version())
+        if is_fresh(etag):
+            return not_modified(etag)
+
+        # Fetch one page of products belonging to this category
+        page = self.products.get_category_page(name, after)
+
+        next_url = None
+        if page.next_token:
+            next_url = url_for("category.show_category", name=name, after=page.next_token)
 
         # Render category page with the product listing
-        return render_template("category.html", category=name, products=products)
+        return with_etag(render_template(
+            "category.html",
+            category=name,
+            products=page.items,
+            next_url=next_url
+        ), etag)
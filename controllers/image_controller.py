@@ -0,0 +1,67 @@
+import os
+from flask import request, abort, send_file, make_response
+from utils.image_cache import resize_cache
+from utils.image_pipeline import source_version
+
+
+class ImageController:
+    # Template URLs carry ?v=<source version> (see image_pipeline.
+    # _resized_image), so a replaced image gets a new URL and the
+    # old one may be kept for a year
+    MAX_AGE = 31536000
+
+    # URLs without the current version can show a different picture
+    # tomorrow: cache briefly, then revalidate with the ETag
+    REVALIDATE_MAX_AGE = 300
+
+    # ---------------------------------------------------------
+    # RESIZED PRODUCT IMAGE
+    #
+    # Steps:
+    #   1. Only whitelisted widths and existing product images
+    #   2. WebP for browsers that accept it, JPEG otherwise
+    #   3. 304 straight from the ETag (no resize needed)
+    #   4. Resize on first request, then serve from the disk cache
+    #   5. Immutable only when ?v= matches the current source file
+    # ---------------------------------------------------------
+    def resize(self, width, name):
+        if width not in resize_cache.widths:
+            abort(404)
+
+        source = resize_cache.source_path(name)
+        if not source:
+            abort(404)
+
+        fmt = "webp" if "image/webp" in request.headers.get("Accept", "") else "jpeg"
+        key, path = resize_cache.variant(source, width, fmt)
+
+        if request.if_none_match.contains(key):
+            response = make_response("", 304)
+            response.set_etag(key)
+        else:
+            try:
+                response = self._send(source, width, fmt)
+            except FileNotFoundError:
+                # Evicted by another worker between resize and send
+                response = self._send(source, width, fmt)
+
+        response.cache_control.public = True
+        if request.args.get("v") == source_version(source):
+            response.cache_control.max_age = self.MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.max_age = self.REVALIDATE_MAX_AGE
+            response.cache_control.immutable = False
+        response.vary.add("Accept")
+        return response
+
+    def _send(self, source, width, fmt):
+        key, path = resize_cache.get(source, width, fmt)
+        return send_file(
+            path,
+            mimetype=f"image/{fmt}",
+            etag=key,
+            last_modified=os.path.getmtime(source),
+            max_age=self.MAX_AGE,
+            conditional=True
+        )
@@ -1,4 +1,4 @@
-from flask import render_template
+from flask import render_template, jsonify, url_for
 from models.product_model import ProductModel
 
 
@@ -7,15 +7,22 @@ class MainController:
         self.products = ProductModel(mongo)
         self.mongo = mongo
 
-    def home(self):
-        """Load featured products for homepage."""
+    # Featured products shown per page on the homepage
+    HOME_PAGE_SIZE = 8
+
+    def home(self, after=None):
+        """Load featured products for homepage (one page at a time)."""
         product_list = []
+        next_url = None
         if self.mongo:
-            product_list = self.products.list_all(limit=8)
-        return render_template("index.html", title="Home", products=product_list)
+            page = self.products.list_page(after, limit=self.HOME_PAGE_SIZE)
+            product_list = page.items
+            if page.next_token:
+                next_url = url_for("main.home", after=page.next_token)
+        return render_template("index.html", title="Home", products=product_list, next_url=next_url)
 
-    def search(self, query):
-        """Perform search using product model."""
+    def search(self, query, after=None):
+        """Perform search using product model (one page at a time)."""
         if not query or not self.mongo:
             return render_template(
                 "search_results.html",
@@ -24,14 +31,39 @@ class MainController:
                 results=[]
             )
 
-        results = self.products.search(query)
+        page = self.products.search_page(query, after)
+        if page.items and not after:
+            self.products.record_search(query)
+
+        next_url = None
+        if page.next_token:
+            next_url = url_for("main.search", q=query, after=page.next_token)
+
         return render_template(
             "search_results.html",
             title=f"Search: {query}",
             query=query,
-            results=results
+            results=page.items,
+            next_url=next_url
         )
 
+    def suggest(self, query, limit=8):
+        """Return search-as-you-type completions as JSON."""
+        suggestions = []
+
+        if query and self.mongo:
+            for s in self.products.suggest(query, limit):
+                if s["kind"] == "product":
+                    url = url_for("product.product_detail", product_id=str(s["target"]))
+                elif s["kind"] == "category":
+                    url = url_for("product.category_view", category_name=s["target"])
+                else:
+                    url = url_for("main.search", q=s["target"])
+
+                suggestions.append({"text": s["text"], "kind": s["kind"], "url": url})
+
+        return jsonify(query=query, suggestions=suggestions)
+
     def faq(self):
         return render_template("faq.html", title="FAQ")
 
@@ -0,0 +1,37 @@
+import hmac
+from flask import current_app, request, abort, make_response
+from utils.metrics import metrics, render_prometheus
+
+
+class MetricsController:
+    # Prometheus text exposition format
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    # ---------------------------------------------------------
+    # ACCESS
+    #
+    # Scrapers send:
+    #     Authorization: Bearer <METRICS_TOKEN>
+    # Without a token the endpoint does not exist. Neither DEBUG nor
+    # a loopback address opens it: config.py turns DEBUG on
+    # everywhere, and behind a proxy on the same host every request
+    # comes from 127.0.0.1.
+    # ---------------------------------------------------------
+    def _allowed(self):
+        token = current_app.config.get("METRICS_TOKEN")
+        if not token:
+            return False
+        sent = request.headers.get("Authorization", "")
+        return hmac.compare_digest(sent, f"Bearer {token}")
+
+    # ---------------------------------------------------------
+    # METRICS (all workers of this machine)
+    # ---------------------------------------------------------
+    def metrics(self):
+        if not self._allowed():
+            abort(404)
+
+        response = make_response(render_prometheus(metrics.collect()))
+        response.headers["Content-Type"] = self.CONTENT_TYPE
+        response.cache_control.no_store = True
+        return response
@@ -1,6 +1,9 @@
 from flask import render_template, flash, redirect, url_for
 from bson import ObjectId
+from database.connection import reads_own_writes
 from models.product_model import ProductModel
+from models.review_model import ReviewModel
+from utils.http_cache import page_etag, is_fresh, not_modified, with_etag
 
 
 class ProductController:
@@ -8,17 +11,22 @@ class ProductController:
         # Store MongoDB connection and initialize ProductModel
         self.mongo = mongo
         self.products = ProductModel(mongo)
+        self.reviews = ReviewModel(mongo)
 
     # ---------------------------------------------------------
     # PRODUCT DETAIL PAGE
     #
     # Steps:
     #   1. Normalize cart to avoid old/broken formats.
-    #   2. Validate the product_id and fetch the product.
-    #   3. Compute MRP (original price before discount).
-    #   4. Fetch reviews (supporting both ObjectId & string IDs).
-    #   5. Compute average rating & review count.
-    #   6. Render the product page.
+    #   2. Validate the product_id and fetch the product
+    #      (from the primary right after the visitor's own write).
+    #   3. Answer 304 if the browser's copy is still current
+    #      (ETag from the product's own version / reviews_version,
+    #      checked against MongoDB, not the catalog version).
+    #   4. Compute MRP (original price before discount).
+    #   5. Fetch reviews (supporting both ObjectId & string IDs).
+    #   6. Read the rating summary kept on the product document.
+    #   7. Render the product page.
     #
     # normalize_cart_func → passed from CartController to ensure
     # cart cleanup happens before rendering product page.
@@ -26,17 +34,23 @@ class ProductController:
     def product_detail(self, product_id, normalize_cart_func):
         normalize_cart_func()  # Ensure cart stays in valid format
 
-        # Validate and fetch product from DB
-        try:
-            product = self.mongo.db.products.find_one({"_id": ObjectId(product_id)})
-        except:
+        # Validate and fetch product (served from the catalog cache)
+        if not ObjectId.is_valid(product_id):
             flash("Invalid product ID.", "danger")
             return redirect(url_for("main.home"))
 
+        fresh = reads_own_writes()
+        product = self.products.get_for_page(product_id, fresh=fresh)
+
         if not product:
             flash("Product not found.", "warning")
             return redirect(url_for("main.home"))
 
+        # Nothing changed since the browser's copy → skip reviews + render
+        etag = page_etag("p", product["_id"], self.products.page_version(product))
+        if is_fresh(etag):
+            return not_modified(etag)
+
         # -----------------------------------------------------
         # Calculate MRP (Original Price)
         # If discount exists:
@@ -60,45 +74,71 @@ class ProductController:
         product_oid = ObjectId(product_id)
         product_str = str(product["_id"])
 
-        reviews = list(self.mongo.db.reviews.find({
-            "$or": [
-                {"product_id": product_oid},
-                {"product_id": product_str}
-            ]
-        }))
+        reviews = self.reviews.get_product_reviews(product_oid, product_str, fresh=fresh)
 
         # -----------------------------------------------------
         # Rating Summary
-        # Compute:
         #   - average rating
         #   - total number of reviews
+        #   - reviews per star (1–5)
+        #
+        # Maintained on the product by ReviewModel, so this is
+        # O(1). Products not yet covered by
+        # `python manage.py rebuild-ratings` are counted here.
         # -----------------------------------------------------
-        if reviews:
-            total_rating = sum(int(r["rating"]) for r in reviews)
-            avg_rating = round(total_rating / len(reviews), 1)
-            review_count = len(reviews)
-        else:
-            avg_rating = None
-            review_count = 0
+        summary = self.products.rating_summary(product)
+
+        if summary is None:
+            counts = [0, 0, 0, 0, 0]
+            for r in reviews:
+                rating = int(r["rating"])
+                if 1 <= rating <= 5:
+                    counts[rating - 1] += 1
+            total = sum(counts)
+            summary = {
+                "avg": round(sum((i + 1) * c for i, c in enumerate(counts)) / total, 1) if total else None,
+                "count": total,
+                "counts": counts,
+            }
 
         # Render template with all processed data
-        return render_template(
+        return with_etag(render_template(
             "product_detail.html",
             product=product,
             mrp=mrp,
             reviews=reviews,
-            avg_rating=avg_rating,
-            review_count=review_count
-        )
+            avg_rating=summary["avg"],
+            review_count=summary["count"],
+            rating_counts=summary["counts"]
+        ), etag)
 
     # ---------------------------------------------------------
     # CATEGORY VIEW
     #
-    # Loads all products under the given category.
+    # Loads one page of products under the given category
+    # (keyset pagination, `after` is the page token).
     # normalize_cart_func ensures the cart stays clean before
     # showing product listings.
+    #
+    # The ETag is the catalog version, so a repeat visit costs a
+    # 304 until a product changes.
     # ---------------------------------------------------------
-    def category_view(self, category_name, normalize_cart_func):
+    def category_view(self, category_name, normalize_cart_func, after=None):
         normalize_cart_func()
-        products = self.products.get_by_category(category_name)
-        return render_template("category.html", category=category_name, products=products)
+
+        etag = page_etag("c", self.products.catalog_version())
+        if is_fresh(etag):
+            return not_modified(etag)
+
+        page = self.products.get_category_page(category_name, after)
+
+        next_url = None
+        if page.next_token:
+            next_url = url_for("product.category_view", category_name=category_name, after=page.next_token)
+
+        return with_etag(render_template(
+            "category.html",
+            category=category_name,
+            products=page.items,
+            next_url=next_url
+        ), etag)
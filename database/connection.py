@@ -1,24 +1,109 @@
 import os
+import time
+from flask import has_request_context, session
 from flask_pymongo import PyMongo
+from database.monitoring import command_monitor, pool_monitor
+from database.settings import MongoSettings
+from utils.db_tracker import db_tracker
 
 mongo = PyMongo()
 
-def init_db(app):
+# Settings the client was created with (set by init_db)
+mongo_settings = None
+
+# Session key: when this visitor last wrote catalog data (unix time)
+OWN_WRITE_KEY = "own_write_at"
+
+DEFAULT_MONGO_URI = "mongodb://localhost:27017/timeless_threads"
+
+
+def get_mongo_uri():
     """
-    Initialize MongoDB using environment variable MONGO_URI.
-    If not provided, fallback to local MongoDB.
+    Return MONGO_URI from the environment, or the local fallback.
+    Shared by init_db() and the command line tools in manage.py.
     """
-
-    # Use environment variable if available
     mongo_uri = os.getenv("MONGO_URI")
 
     if not mongo_uri:
         print("⚠ WARNING: MONGO_URI missing! Using localhost.")
-        mongo_uri = "mongodb://localhost:27017/timeless_threads"
+        mongo_uri = DEFAULT_MONGO_URI
+
+    return mongo_uri
+
+
+def init_db(app, settings=None):
+    """
+    Initialize MongoDB using environment variable MONGO_URI.
+    If not provided, fallback to local MongoDB.
+
+    Pool size, timeouts, compression, read preference and write
+    concern come from `settings`, by default built from the MONGO_*
+    values in the Flask config (see database/settings.py).
+    """
+    global mongo_settings
+
+    # Use environment variable if available
+    mongo_uri = get_mongo_uri()
 
     app.config["MONGO_URI"] = mongo_uri
 
+    if settings is None:
+        settings = MongoSettings.from_config(app.config, mongo_uri)
+    mongo_settings = settings
+
+    pool_monitor.wait_warn_ms = app.config.get("MONGO_POOL_WAIT_WARN_MS", 50)
+    command_monitor.count_bytes = app.config.get("MONGO_COMMAND_BYTES", False)
+
     # Initialize Mongo
-    mongo.init_app(app)
+    listeners = [pool_monitor, command_monitor, db_tracker]
+    mongo.init_app(app, settings.uri, event_listeners=listeners, **settings.client_kwargs())
 
     print(f"✔ MongoDB connected to: {mongo_uri}")
+    print(f"✔ MongoDB client: {settings.describe()}")
+
+
+def catalog_collection(mongo, name):
+    """
+    Collection for catalog reads (products, review listings).
+
+    Reads use the catalog read preference, e.g. secondaryPreferred
+    within the max staleness, so browsing load stays off the primary.
+    Writes through it still go to the primary; auth, OTP and cart
+    collections keep the client default.
+    """
+    if mongo_settings is None:
+        return mongo.db[name]
+    return mongo.db.get_collection(name, read_preference=mongo_settings.catalog_read)
+
+
+def catalog_lag_seconds():
+    """
+    How far catalog reads may trail the primary: 0 when they use the
+    primary, otherwise the max staleness (90 s when it is not set).
+    """
+    if mongo_settings is None or mongo_settings.catalog_read_preference == "primary":
+        return 0
+    return mongo_settings.catalog_max_staleness_seconds or 90
+
+
+# ---------------------------------------------------------
+# READ YOUR OWN WRITES
+#
+# A secondary may not have a write yet when the visitor who made
+# it loads the next page (on any worker). For catalog_lag_seconds()
+# after their write, their catalog reads go to the primary.
+# ---------------------------------------------------------
+def note_own_write():
+    if has_request_context() and catalog_lag_seconds():
+        session[OWN_WRITE_KEY] = time.time()
+
+
+def reads_own_writes():
+    """
+    True if this visitor wrote catalog data recently enough that a
+    secondary may not have it yet.
+    """
+    if not has_request_context():
+        return False
+    written_at = session.get(OWN_WRITE_KEY)
+    return bool(written_at) and time.time() - written_at < catalog_lag_seconds()
@@ -0,0 +1,149 @@
+from pymongo.errors import PyMongoError
+from models.product_model import ProductModel
+from models.review_model import ReviewModel
+from models.user_model import UserModel
+from models.otp_model import OTP
+from utils.cart_store import MongoCartBackend
+from utils.rate_limit import MongoRateLimitBackend
+
+
+# -----------------------------------------------------------
+# Models whose INDEXES / EXPLAIN_QUERIES are managed here.
+# Add new models to this list when they declare indexes.
+# -----------------------------------------------------------
+MODELS = [ProductModel, ReviewModel, UserModel, OTP, MongoCartBackend, MongoRateLimitBackend]
+
+# Index options that matter when comparing a declared index
+# against the one that already exists in MongoDB.
+COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _normalize_key(field):
+    # Directions may come back as 1.0 from indexes built by other tools
+    name, direction = field
+    if isinstance(direction, float):
+        direction = int(direction)
+    return name, direction
+
+
+def _index_differences(declared, existing):
+    """
+    Return a list of human readable differences between a declared
+    index document (IndexModel.document) and index_information() output.
+    """
+    differences = []
+
+    declared_key = [_normalize_key(k) for k in declared["key"].items()]
+    existing_key = [_normalize_key(k) for k in existing["key"]]
+    if declared_key != existing_key:
+        differences.append(f"key {existing_key} != {declared_key}")
+
+    for option in COMPARED_OPTIONS:
+        if declared.get(option) != existing.get(option):
+            differences.append(f"{option} {existing.get(option)!r} != {declared.get(option)!r}")
+
+    return differences
+
+
+def ensure_indexes(db, models=MODELS):
+    """
+    Create every declared index that does not exist yet and report drift.
+
+    Index creation is idempotent, so this is safe to run on every worker
+    boot. Existing indexes are never dropped or rebuilt automatically;
+    differences are only reported so they can be fixed deliberately.
+
+    :return: dict with "created", "drift", "extra" and "errors" lists
+    """
+    report = {"created": [], "drift": [], "extra": [], "errors": []}
+
+    for model in models:
+        collection = db[model.COLLECTION]
+        existing = collection.index_information()
+        declared_names = {"_id_"}
+
+        for index in model.INDEXES:
+            declared = index.document
+            name = declared["name"]
+            declared_names.add(name)
+            label = f"{model.COLLECTION}.{name}"
+
+            if name not in existing:
+                try:
+                    collection.create_indexes([index])
+                    report["created"].append(label)
+                except PyMongoError as e:
+                    # e.g. duplicate emails block the unique users.email index
+                    report["errors"].append(f"{label}: {e}")
+                continue
+
+            differences = _index_differences(declared, existing[name])
+            if differences:
+                report["drift"].append(f"{label}: " + "; ".join(differences))
+
+        for name in existing:
+            if name not in declared_names:
+                report["extra"].append(f"{model.COLLECTION}.{name}")
+
+    return report
+
+
+def print_index_report(report):
+    """
+    Print an ensure_indexes() report in the same style as the startup logs.
+    """
+    for label in report["created"]:
+        print(f"✔ Created index {label}")
+    for line in report["drift"]:
+        print(f"⚠ Index drift {line}")
+    for label in report["extra"]:
+        print(f"⚠ Undeclared index {label}")
+    for line in report["errors"]:
+        print(f"❌ Index creation failed {line}")
+
+    if not any(report.values()):
+        print("✔ MongoDB indexes up to date")
+
+
+# -----------------------------------------------------------
+# EXPLAIN
+#
+# Runs every model's EXPLAIN_QUERIES through explain() and
+# summarises the winning plan, e.g.
+#     FETCH > IXSCAN(category_1__id_1)
+# A COLLSCAN in the output means the query has no usable index.
+# -----------------------------------------------------------
+def describe_plan(plan):
+    """
+    Flatten a winningPlan stage tree into a one-line summary.
+    """
+    # Slot-based execution engine wraps the classic plan in "queryPlan"
+    plan = plan.get("queryPlan", plan)
+
+    stage = plan.get("stage", "?")
+    if plan.get("indexName"):
+        stage += f"({plan['indexName']})"
+
+    children = []
+    if "inputStage" in plan:
+        children.append(plan["inputStage"])
+    children.extend(plan.get("inputStages", []))
+
+    if not children:
+        return stage
+    if len(children) == 1:
+        return f"{stage} > {describe_plan(children[0])}"
+    return f"{stage} > [" + ", ".join(describe_plan(c) for c in children) + "]"
+
+
+def explain_queries(db, models=MODELS):
+    """
+    Yield (collection, query label, winning plan summary) for every
+    query declared by the models.
+    """
+    for model in models:
+        collection = db[model.COLLECTION]
+        for label, query in model.EXPLAIN_QUERIES:
+            explained = collection.find(query).explain()
+            winning = explained["queryPlanner"]["winningPlan"]
+            yield model.COLLECTION, label, describe_plan(winning)
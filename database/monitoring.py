@@ -0,0 +1,215 @@
+import threading
+import time
+import bson
+from pymongo import monitoring
+from utils.metrics import metrics, DB_BUCKETS
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Connection pool statistics, per server address, for this process.
+
+    Registered with the MongoClient in database.connection.init_db().
+    snapshot() returns:
+        {
+            "host:27017": {
+                "max_size": 100,      # maxPoolSize (0 = unlimited)
+                "in_use": 3,          # connections checked out now
+                "peak_in_use": 41,    # highest in_use seen
+                "open": 12,           # connections open (idle + in use)
+                "checkouts": 5120,
+                "waited": 17,         # checkouts slower than wait_warn_ms
+                "failed": 0,          # checkouts that timed out / errored
+                "wait_ms_max": 230.4
+            }
+        }
+
+    A checkout that has to wait `wait_warn_ms` or longer for an existing
+    connection, or that takes the last free connection, means the pool
+    is saturated: it is counted in mongo_pool_saturated{reason} and
+    logged at most once per `warn_interval` seconds.
+    """
+
+    def __init__(self, wait_warn_ms=50, warn_interval=60):
+        self.wait_warn_ms = wait_warn_ms
+        self.warn_interval = warn_interval
+
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._warned_at = None
+
+    def _pool(self, address):
+        key = "%s:%s" % address
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = {
+                "max_size": 0, "in_use": 0, "peak_in_use": 0, "open": 0,
+                "checkouts": 0, "waited": 0, "failed": 0, "wait_ms_max": 0.0
+            }
+        return pool
+
+    def _saturated(self, address, reason, detail):
+        metrics.inc("mongo_pool_saturated", reason=reason)
+        now = time.monotonic()
+        if self._warned_at is None or now - self._warned_at >= self.warn_interval:
+            self._warned_at = now
+            print(f"⚠ WARNING: MongoDB pool for {address[0]}:{address[1]} saturated ({detail})")
+
+    def snapshot(self):
+        with self._lock:
+            return {address: dict(pool) for address, pool in self._pools.items()}
+
+    def gauges(self):
+        """
+        Pool sizes for utils.metrics (registered by AppFactory).
+        """
+        return [
+            (f"mongo_pool_{field}", {"address": address}, pool[field])
+            for address, pool in self.snapshot().items()
+            for field in ("in_use", "open", "max_size")
+        ]
+
+    # ---------------------------------------------------------
+    # POOL EVENTS
+    # ---------------------------------------------------------
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)["max_size"] = event.options.get("maxPoolSize", 0)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop("%s:%s" % event.address, None)
+
+    # ---------------------------------------------------------
+    # CONNECTION EVENTS
+    # ---------------------------------------------------------
+    def connection_created(self, event):
+        # A checkout that opens a new connection includes the TCP/TLS
+        # handshake, which is not time spent waiting for the pool
+        self._local.created = True
+        with self._lock:
+            self._pool(event.address)["open"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["open"] = max(0, pool["open"] - 1)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        self._local.created = False
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        wait_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checkouts"] += 1
+            pool["in_use"] += 1
+            pool["peak_in_use"] = max(pool["peak_in_use"], pool["in_use"])
+            pool["wait_ms_max"] = max(pool["wait_ms_max"], wait_ms)
+            slow = wait_ms >= self.wait_warn_ms and not getattr(self._local, "created", False)
+            if slow:
+                pool["waited"] += 1
+            full = pool["max_size"] and pool["in_use"] >= pool["max_size"]
+            in_use, max_size = pool["in_use"], pool["max_size"]
+
+        if slow:
+            self._saturated(event.address, "wait", f"waited {wait_ms:.0f} ms for a connection")
+        elif full:
+            self._saturated(event.address, "full", f"{in_use}/{max_size} connections in use")
+
+    def connection_check_out_failed(self, event):
+        metrics.inc("mongo_pool_checkout_failed", reason=str(event.reason))
+        with self._lock:
+            self._pool(event.address)["failed"] += 1
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+            self._saturated(event.address, "timeout", "timed out waiting for a connection")
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["in_use"] = max(0, pool["in_use"] - 1)
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Registered with the client in init_db(); read pool_monitor.snapshot().
+# -----------------------------------------------------------
+pool_monitor = PoolMonitor()
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    Per-collection, per-command MongoDB metrics for this process.
+
+    Registered with the MongoClient in database.connection.init_db().
+    Records into utils.metrics, labelled by collection and command:
+        mongo_commands{collection, command}                 (counter)
+        mongo_command_failures{collection, command}         (counter)
+        mongo_command_duration_seconds{collection, command} (histogram)
+        mongo_command_bytes_sent / _received{collection, command}
+
+    Byte counts re-encode the command and reply documents on the hot
+    path, so they are off unless `count_bytes=True` (MONGO_COMMAND_BYTES=1).
+    """
+
+    def __init__(self, count_bytes=False):
+        self.count_bytes = count_bytes
+        self._pending = {}
+
+    @staticmethod
+    def _collection(command_name, command):
+        if command_name == "getMore":
+            return command.get("collection", "-")
+        target = command.get(command_name)
+        return target if isinstance(target, str) else "-"
+
+    def started(self, event):
+        collection = self._collection(event.command_name, event.command)
+        if self.count_bytes:
+            metrics.inc(
+                "mongo_command_bytes_sent", len(bson.encode(event.command)),
+                collection=collection, command=event.command_name
+            )
+        self._pending[(event.connection_id, event.request_id)] = collection
+
+    def _finished(self, event, failed):
+        collection = self._pending.pop((event.connection_id, event.request_id), None) or \
+            self._collection(event.command_name, {})
+        labels = {"collection": collection, "command": event.command_name}
+
+        metrics.inc("mongo_commands", **labels)
+        if failed:
+            metrics.inc("mongo_command_failures", **labels)
+        metrics.observe("mongo_command_duration_seconds", event.duration_micros / 1e6, buckets=DB_BUCKETS, **labels)
+        return collection
+
+    def succeeded(self, event):
+        collection = self._finished(event, failed=False)
+        if self.count_bytes:
+            metrics.inc(
+                "mongo_command_bytes_received", len(bson.encode(event.reply)),
+                collection=collection, command=event.command_name
+            )
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Registered with the client in init_db().
+# -----------------------------------------------------------
+command_monitor = CommandMonitor()
@@ -0,0 +1,157 @@
+import warnings
+from dataclasses import dataclass, field, fields
+from typing import Optional, Tuple
+from pymongo import ReadPreference
+from pymongo.compression_support import validate_compressors
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+
+
+def _available_compressors(compressors):
+    """
+    The wire compressors the installed driver can use, in order.
+    zlib ships with Python; zstd and snappy need optional packages.
+    """
+    with warnings.catch_warnings():
+        # PyMongo warns about every compressor it has to drop
+        warnings.simplefilter("ignore")
+        return validate_compressors(None, list(compressors))
+
+
+def _read_preference(mode, max_staleness):
+    """
+    Build a pymongo read preference from a mode name
+    ("primary", "secondaryPreferred", …) and max staleness in seconds.
+    """
+    mode_id = read_pref_mode_from_name(mode)
+    if mode_id == ReadPreference.PRIMARY.mode:
+        # Max staleness is not allowed with "primary"
+        return ReadPreference.PRIMARY
+    return make_read_preference(mode_id, None, max_staleness if max_staleness else -1)
+
+
+@dataclass(frozen=True)
+class MongoSettings:
+    """
+    Typed MongoDB client settings, built from the Flask config
+    (see the MONGO_* values in config.py).
+
+    None leaves an option at the driver default.
+
+        pool             → max_pool_size, min_pool_size, max_idle_time_ms,
+                           wait_queue_timeout_ms (how long a request may wait
+                           for a free connection before failing)
+        timeouts         → connect / server selection / socket, in ms
+        compressors      → preferred first; ones that are not installed
+                           are dropped (the server picks from the rest)
+        read_preference  → default for every collection (auth, carts, …)
+        catalog_read_preference / catalog_max_staleness_seconds
+                         → used by catalog_collection() for product and
+                           review listing reads; MongoDB requires a max
+                           staleness of at least 90 seconds
+        write_concern_w / write_concern_journal / write_concern_timeout_ms
+                         → applied to every write
+    """
+
+    uri: str
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    max_idle_time_ms: Optional[int] = None
+    wait_queue_timeout_ms: Optional[int] = None
+    connect_timeout_ms: Optional[int] = 5000
+    server_selection_timeout_ms: Optional[int] = 10000
+    socket_timeout_ms: Optional[int] = None
+    compressors: Tuple[str, ...] = field(default=("zstd", "snappy", "zlib"))
+    zlib_level: Optional[int] = None
+    app_name: Optional[str] = "timeless-threads"
+    read_preference: str = "primary"
+    catalog_read_preference: str = "secondaryPreferred"
+    catalog_max_staleness_seconds: Optional[int] = 90
+    write_concern_w: Optional[str] = None
+    write_concern_journal: Optional[bool] = None
+    write_concern_timeout_ms: Optional[int] = None
+
+    # Config key for each field, e.g. max_pool_size → MONGO_MAX_POOL_SIZE
+    @staticmethod
+    def config_key(name):
+        return "MONGO_URI" if name == "uri" else f"MONGO_{name.upper()}"
+
+    @classmethod
+    def from_config(cls, config, uri):
+        """
+        Build settings from a Flask config (or any mapping).
+        Keys that are missing keep the defaults above.
+        """
+        values = {"uri": uri}
+        for f in fields(cls):
+            key = cls.config_key(f.name)
+            if f.name != "uri" and key in config:
+                values[f.name] = config[key]
+
+        if isinstance(values.get("compressors"), str):
+            values["compressors"] = tuple(c.strip() for c in values["compressors"].split(",") if c.strip())
+
+        settings = cls(**values)
+        settings.validate()
+        return settings
+
+    def validate(self):
+        if self.min_pool_size > self.max_pool_size > 0:
+            raise ValueError("MONGO_MIN_POOL_SIZE is larger than MONGO_MAX_POOL_SIZE")
+        if self.catalog_max_staleness_seconds and self.catalog_max_staleness_seconds < 90:
+            raise ValueError("MONGO_CATALOG_MAX_STALENESS_SECONDS must be at least 90")
+        for key, mode in (("MONGO_READ_PREFERENCE", self.read_preference),
+                          ("MONGO_CATALOG_READ_PREFERENCE", self.catalog_read_preference)):
+            try:
+                read_pref_mode_from_name(mode)
+            except ValueError:
+                raise ValueError(f"{key} {mode!r} is not a read preference mode") from None
+
+    # ---------------------------------------------------------
+    # DRIVER OPTIONS
+    # ---------------------------------------------------------
+    @property
+    def usable_compressors(self):
+        return _available_compressors(self.compressors)
+
+    @property
+    def catalog_read(self):
+        return _read_preference(self.catalog_read_preference, self.catalog_max_staleness_seconds)
+
+    def client_kwargs(self):
+        """
+        Keyword arguments for MongoClient (passed through PyMongo.init_app).
+        """
+        options = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "socketTimeoutMS": self.socket_timeout_ms,
+            "zlibCompressionLevel": self.zlib_level,
+            "appname": self.app_name,
+            "readPreference": self.read_preference,
+            # "majority", a tag set name, or a number of members
+            "w": int(self.write_concern_w) if str(self.write_concern_w).isdigit() else self.write_concern_w,
+            "journal": self.write_concern_journal,
+            "wTimeoutMS": self.write_concern_timeout_ms,
+        }
+        if self.usable_compressors:
+            options["compressors"] = ",".join(self.usable_compressors)
+
+        return {k: v for k, v in options.items() if v is not None}
+
+    def describe(self):
+        """
+        One-line summary for the startup log (no credentials).
+        """
+        catalog = self.catalog_read_preference
+        if catalog != "primary" and self.catalog_max_staleness_seconds:
+            catalog += f" (max staleness {self.catalog_max_staleness_seconds}s)"
+        return (
+            f"pool {self.min_pool_size}-{self.max_pool_size}, "
+            f"compressors {','.join(self.usable_compressors) or 'none'}, "
+            f"reads {self.read_preference}, catalog reads {catalog}, "
+            f"w={self.write_concern_w or 'default'}"
+        )
@@ -0,0 +1,100 @@
+"""
+Command line tools for Timeless Threads
+---------------------------------------
+Run:
+    python manage.py indexes     → create missing indexes, report drift
+    python manage.py explain     → print the winning plan of every model query
+    python manage.py rebuild-ratings → recompute product rating aggregates
+    python manage.py build-images    → resize product images into WebP/AVIF/JPEG derivatives
+    python manage.py build-static    → fingerprint + precompress static files into static/dist
+"""
+
+import argparse
+from pymongo import MongoClient
+from database.connection import get_mongo_uri
+from database.indexes import ensure_indexes, print_index_report, explain_queries
+
+
+def get_db():
+    """
+    Connect straight to MongoDB (no Flask app needed).
+    """
+    client = MongoClient(get_mongo_uri())
+    return client.get_default_database(default="timeless_threads")
+
+
+def get_mongo():
+    """
+    Build the Flask app so models get the same `mongo` they use at runtime.
+    """
+    from app_factory import AppFactory
+    from database.connection import mongo
+
+    AppFactory().create_app()
+    return mongo
+
+
+# ---------------------------------------------------------
+# COMMANDS
+# ---------------------------------------------------------
+def cmd_indexes(args):
+    print_index_report(ensure_indexes(get_db()))
+
+
+def cmd_explain(args):
+    for collection, label, plan in explain_queries(get_db()):
+        print(f"{collection:<10} {label:<22} {plan}")
+
+
+def cmd_rebuild_ratings(args):
+    from models.review_model import ReviewModel
+
+    checked, fixed = ReviewModel(get_mongo()).rebuild_rating_aggregates()
+    print(f"✔ Checked {checked} products, fixed {fixed} with drifted rating aggregates")
+
+
+def cmd_build_images(args):
+    from utils.image_pipeline import build_all
+
+    result = build_all(jobs=args.jobs, force=args.force)
+    print(
+        f"✔ {result['images']} images, {result['written']} derivatives written "
+        f"({', '.join(result['formats'])})"
+    )
+
+
+def cmd_build_static(args):
+    from utils.static_assets import build_static, brotli
+
+    result = build_static()
+    print(
+        f"✔ {result['files']} static files fingerprinted, {result['compressed']} precompressed "
+        f"({'br + gzip' if brotli else 'gzip only, install brotli for .br'}), {result['written']} files written"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timeless Threads management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("indexes", help="create missing indexes and report drift") \
+        .set_defaults(func=cmd_indexes)
+    commands.add_parser("explain", help="print the winning plan for every model query") \
+        .set_defaults(func=cmd_explain)
+    commands.add_parser("rebuild-ratings", help="recompute product rating aggregates from reviews") \
+        .set_defaults(func=cmd_rebuild_ratings)
+
+    build_images = commands.add_parser("build-images", help="build responsive image derivatives + manifest")
+    build_images.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    build_images.add_argument("--force", action="store_true", help="re-encode derivatives that already exist")
+    build_images.set_defaults(func=cmd_build_images)
+
+    commands.add_parser("build-static", help="fingerprint and precompress static files") \
+        .set_defaults(func=cmd_build_static)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
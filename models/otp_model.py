@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta
 from bson.objectid import ObjectId
+from pymongo import IndexModel
+from pymongo.errors import DuplicateKeyError
 
 
 class OTP:
@@ -9,8 +11,33 @@ class OTP:
         - expire after a time limit
         - cannot be reused
         - are associated with a mobile number
+
+    store() / consume() make it an OTP backend for
+    utils.otp_generator.OTPService (one document per mobile/email,
+    shared by every worker).
     """
 
+    COLLECTION = "otps"
+
+    # Indexes created at startup by database.indexes.ensure_indexes()
+    # One document per mobile/email (store() upserts by it), and the
+    # TTL index lets MongoDB delete OTPs once `expires_at` has passed.
+    INDEXES = [
+        IndexModel([("mobile", 1)], name="mobile_1", unique=True),
+        IndexModel([("expires_at", 1)], name="expires_at_ttl", expireAfterSeconds=0),
+    ]
+
+    # Representative queries, used by `python manage.py explain`
+    EXPLAIN_QUERIES = [
+        ("verify", {"mobile": "someone@example.com", "otp": "123456", "used": False}),
+        ("consume", {
+            "mobile": "someone@example.com",
+            "otp": "123456",
+            "used": False,
+            "expires_at": {"$gt": datetime(2000, 1, 1)}
+        }),
+    ]
+
     def __init__(self, mongo):
         # Reference to the "otps" collection in MongoDB
         self.db = mongo.db.otps
@@ -26,26 +53,55 @@ class OTP:
     #   - used flag (initially False)
     #
     # ttl_minutes defines how long the OTP stays valid.
+    # A mobile has a single OTP document (unique index), so a new
+    # OTP replaces the previous one.
     # ---------------------------------------------------------
     def create(self, mobile, otp, ttl_minutes=5):
         """
         Create a new OTP record and store it in the database.
         """
-        # Compute expiration time based on TTL
-        expires_at = datetime.utcnow() + timedelta(minutes=ttl_minutes)
+        self.store(mobile, otp, ttl_seconds=ttl_minutes * 60)
+        return self.db.find_one({"mobile": mobile})
 
-        # Construct OTP document
-        doc = {
-            "mobile": mobile,
-            "otp": str(otp),  # Always stored as string for consistency
-            "created_at": datetime.utcnow(),
-            "expires_at": expires_at,
-            "used": False  # Ensures OTP can only be used once
-        }
-
-        # Insert into DB and return the inserted document
-        result = self.db.insert_one(doc)
-        return self.get_by_id(result.inserted_id)
+    # ---------------------------------------------------------
+    # OTP BACKEND (used by OTPService)
+    #
+    # store()   → one upsert: the latest OTP replaces earlier ones.
+    #             Two concurrent upserts for a new mobile may both
+    #             try to insert; the unique index rejects the second,
+    #             which then updates the document the first created.
+    # consume() → one find_one_and_update: matches only an unused,
+    #             unexpired OTP and marks it used in the same step,
+    #             so two concurrent verifies cannot both succeed.
+    # The TTL index on expires_at deletes the documents afterwards.
+    # ---------------------------------------------------------
+    def store(self, mobile, otp, ttl_seconds=300):
+        now = datetime.utcnow()
+        update = {"$set": {
+            "otp": str(otp),
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=ttl_seconds),
+            "used": False
+        }}
+
+        try:
+            self.db.update_one({"mobile": mobile}, update, upsert=True)
+        except DuplicateKeyError:
+            # Lost the insert race: the document exists now
+            self.db.update_one({"mobile": mobile}, update, upsert=True)
+
+    def consume(self, mobile, otp):
+        record = self.db.find_one_and_update(
+            {
+                "mobile": mobile,
+                "otp": str(otp),
+                "used": False,
+                "expires_at": {"$gt": datetime.utcnow()}
+            },
+            {"$set": {"used": True}},
+            projection={"_id": 1}
+        )
+        return record is not None
 
     # ---------------------------------------------------------
     # VERIFY OTP
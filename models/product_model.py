@@ -1,4 +1,55 @@
+import time
+from bisect import bisect_right
+from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo import IndexModel, ReadPreference, ReturnDocument
+from database.connection import catalog_collection, catalog_lag_seconds, note_own_write
+from utils.catalog_cache import catalog_cache, MISSING
+from utils.search_index import search_index
+from utils.suggest import suggestion_index
+from utils.pagination import decode_token, make_page
+
+
+# -----------------------------------------------------------
+# Fields used by the product grid templates (category, search,
+# homepage). Listing pages only fetch these.
+# -----------------------------------------------------------
+CARD_FIELDS = ("_id", "name", "category", "price", "discount", "image", "image2", "image3")
+CARD_PROJECTION = {field: 1 for field in CARD_FIELDS}
+
+# Fields read when building the search index (card + searchable text)
+SEARCH_PROJECTION = dict(CARD_PROJECTION, description=1, highlights=1, details=1)
+
+
+class ProductCard:
+    """
+    Compact, read-only view of a product for listing grids.
+
+    Uses __slots__ instead of a per-instance dict, so thousands of
+    cards held by the catalog cache and search index stay small.
+    Supports both attribute and item access, so templates can keep
+    using item.name and item['_id'].
+    """
+
+    __slots__ = CARD_FIELDS
+
+    def __init__(self, doc):
+        for field in CARD_FIELDS:
+            setattr(self, field, doc.get(field))
+
+    def __getitem__(self, field):
+        if field not in CARD_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field, default=None):
+        if field not in CARD_FIELDS:
+            return default
+        value = getattr(self, field)
+        return default if value is None else value
+
+    def __repr__(self):
+        return f"<ProductCard {self._id} {self.name!r}>"
 
 
 class ProductModel:
@@ -11,14 +62,182 @@ class ProductModel:
         - Insert new product documents
         - List products with limit
         - Perform keyword-based search
+        - Page through listings with keyset (cursor) pagination
+        - "Card" read mode for grids (projected fields → ProductCard)
+
+    Catalog reads go through the process-wide `catalog_cache`, so most
+    page views are served from memory. Every write bumps the catalog
+    version stamp, which makes all workers drop their cached entries.
+    Keyword search is answered by the in-memory `search_index`.
 
     This model acts as a clean abstraction layer so controllers
     don't directly interact with MongoDB queries.
     """
 
+    COLLECTION = "products"
+
+    # Indexes created at startup by database.indexes.ensure_indexes()
+    # (category + _id also backs ordered category listings)
+    INDEXES = [
+        IndexModel([("category", 1), ("_id", 1)], name="category_1__id_1"),
+    ]
+
+    # Representative queries, used by `python manage.py explain`
+    EXPLAIN_QUERIES = [
+        ("get_by_category", {"category": "ethnic"}),
+        ("get_category_page", {"category": "ethnic", "_id": {"$gt": ObjectId("0" * 24)}}),
+        ("get_by_id", {"_id": ObjectId()}),
+        ("get_many", {"_id": {"$in": [ObjectId(), ObjectId()]}}),
+        ("search_index_rebuild", {}),
+    ]
+
+    # Default number of products per listing page
+    PAGE_SIZE = 24
+
+    # Document in the `catalog_meta` collection holding the version stamp
+    VERSION_DOC_ID = "catalog_version"
+
+    # Until then (time.monotonic()) this worker reads the catalog from
+    # the primary: it has seen its own write, a secondary may not have.
+    # Shared by every ProductModel in the process.
+    _primary_until = 0.0
+
     def __init__(self, mongo):
         # Bind the model to the 'products' collection
-        self.db = mongo.db.products
+        # (reads may be served by a secondary, see catalog_collection)
+        self.db = catalog_collection(mongo, "products")
+
+        # Catalog version stamp (shared by all workers)
+        # Read with the same preference as the products: the version is
+        # bumped after the product write, and a secondary applies writes
+        # in order, so a version read there never runs ahead of its data.
+        self.meta = catalog_collection(mongo, "catalog_meta")
+
+        # Same collections on the primary, for reads right after a write
+        self.primary = self.db.with_options(read_preference=ReadPreference.PRIMARY)
+        self.meta_primary = self.meta.with_options(read_preference=ReadPreference.PRIMARY)
+
+        self.cache = catalog_cache
+
+    def _pinned(self):
+        return time.monotonic() < ProductModel._primary_until
+
+    def _reader(self):
+        """
+        Collection for catalog reads: the primary right after this
+        worker's own write, the catalog read preference otherwise.
+        """
+        return self.primary if self._pinned() else self.db
+
+    # ---------------------------------------------------------
+    # CATALOG VERSION STAMP
+    #
+    # _sync() is called before every cached read. The cache only
+    # asks MongoDB for the version once per check interval.
+    # ---------------------------------------------------------
+    def _read_version(self):
+        meta = self.meta_primary if self._pinned() else self.meta
+        doc = meta.find_one({"_id": self.VERSION_DOC_ID})
+        return doc["version"] if doc else 0
+
+    def _sync(self):
+        self.cache.sync_version(self._read_version)
+
+    def catalog_version(self):
+        """
+        Current catalog version, as last seen by this worker.
+        Used to key cached pages (see utils/page_cache.py).
+        """
+        self._sync()
+        return self.cache.version
+
+    def bump_version(self):
+        """
+        Increment the catalog version after a product write.
+        Drops this worker's cache immediately; other workers follow
+        on their next version check.
+        """
+        doc = self.meta.find_one_and_update(
+            {"_id": self.VERSION_DOC_ID},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        # The new version came from the primary: entries cached under
+        # it must come from there too until the secondaries catch up
+        ProductModel._primary_until = time.monotonic() + catalog_lag_seconds()
+        self.cache.invalidate(doc["version"])
+        return doc["version"]
+
+    # ---------------------------------------------------------
+    # AFTER A PRODUCT WRITE
+    #
+    # Bumps the version stamp, reloads the written products from
+    # the primary into the cache, and patches the search index in
+    # place when it was built from the version just before this
+    # write. Otherwise (another worker wrote in between) the index
+    # is left stale and gets rebuilt on the next search.
+    # ---------------------------------------------------------
+    def refresh_products(self, product_ids):
+        """
+        Propagate writes to the given products to caches and the search index.
+        """
+        version = self.bump_version()
+        note_own_write()
+
+        docs = {doc["_id"]: doc for doc in self.primary.find({"_id": {"$in": list(product_ids)}})}
+        for pid in product_ids:
+            self._cache_product(pid, docs.get(pid))
+
+        if search_index.version != version - 1:
+            return version
+
+        for pid in product_ids:
+            if pid in docs:
+                search_index.upsert(docs[pid])
+            else:
+                search_index.remove(pid)
+
+        search_index.version = version
+        return version
+
+    # ---------------------------------------------------------
+    # AFTER A REVIEW WRITE
+    #
+    # Reviews only change the product's rating aggregates and
+    # reviews_version, which no listing or search result shows, so
+    # the catalog version is left alone: only this product's cache
+    # entry is replaced (from the primary). Other workers pick the
+    # change up when their entry expires; the product page ETag
+    # follows the product's own reviews_version.
+    # ---------------------------------------------------------
+    def refresh_reviews(self, product_id):
+        """
+        Reload one product after a review write.
+        """
+        note_own_write()
+        product = self.primary.find_one({"_id": product_id})
+        self._cache_product(product_id, product)
+        return product
+
+    # ---------------------------------------------------------
+    # CARD READ MODE
+    #
+    # card=True fetches only CARD_FIELDS and returns ProductCard
+    # objects: less data over the wire, less BSON to decode and
+    # less memory per cached listing. Full documents are only
+    # needed on the product detail page and in the cart.
+    # ---------------------------------------------------------
+    def _find(self, query, card=False, sort=None, limit=0):
+        cursor = self._reader().find(query, CARD_PROJECTION if card else None)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        if card:
+            return [ProductCard(doc) for doc in cursor]
+        return list(cursor)
 
     # ---------------------------------------------------------
     # GET ALL PRODUCTS IN A CATEGORY
@@ -26,39 +245,244 @@ class ProductModel:
     # Example:
     #     model.get_by_category("shoes")
     # ---------------------------------------------------------
-    def get_by_category(self, category_name):
+    def get_by_category(self, category_name, card=False):
         """
         Fetch all products belonging to a given category.
-        Returns a list of documents.
+        Returns a list of documents (ProductCard objects if card=True).
         """
-        return list(self.db.find({"category": category_name}))
+        self._sync()
+        return self.cache.get_or_load(
+            ("category", category_name, card),
+            lambda: self._find({"category": category_name}, card)
+        )
 
     # ---------------------------------------------------------
     # GET A SINGLE PRODUCT BY ID
     #
     # Converts string ID to ObjectId safely.
     # Returns None if the ID is invalid.
+    # fresh=True reads the primary and refreshes the cached copy
+    # (a visitor reading back their own write).
     # ---------------------------------------------------------
-    def get_by_id(self, pid):
+    def get_by_id(self, pid, fresh=False):
         """
         Fetch a single product by its ObjectId.
         """
         try:
-            return self.db.find_one({"_id": ObjectId(pid)})
+            oid = ObjectId(pid)
         except Exception:
-            # If the ID is not a valid ObjectId or any error occurs
+            # If the ID is not a valid ObjectId
             return None
 
+        self._sync()
+        if fresh:
+            product = self.primary.find_one({"_id": oid})
+            self._cache_product(oid, product)
+            return product
+
+        def load():
+            product = self._reader().find_one({"_id": oid})
+            self._cache_product(oid, product)
+            return product
+
+        return self.cache.get_or_load(("id", oid), load)
+
+    def _cache_product(self, oid, product):
+        """
+        Cache a product document just read from MongoDB. Its stamps
+        count as checked for the next version_check_seconds (see
+        get_for_page).
+        """
+        self.cache.set(("id", oid), product)
+        self.cache.set(("checked", oid), True, ttl_seconds=self.cache.version_check_seconds)
+
+    # ---------------------------------------------------------
+    # PRODUCT FOR ITS DETAIL PAGE
+    #
+    # Review writes only refresh the writing worker's cache entry
+    # (see refresh_reviews), so the cached document is checked
+    # against its current version stamps, a small projected read on
+    # _id, and reloaded when they moved on. Like the catalog version,
+    # that check runs at most once per version_check_seconds per
+    # product; in between the page is served from memory. The page
+    # ETag is built from the same stamps (page_version).
+    # ---------------------------------------------------------
+    def get_for_page(self, pid, fresh=False):
+        """
+        Fetch a product with up-to-date version stamps.
+        """
+        product = self.get_by_id(pid, fresh=fresh)
+        if product is None or fresh:
+            return product
+
+        oid = product["_id"]
+        if self.cache.get(("checked", oid)) is not MISSING:
+            return product
+
+        reader = self._reader()
+        stamps = reader.find_one({"_id": oid}, {"version": 1, "reviews_version": 1})
+        if stamps is None:
+            product = None
+        elif self.page_version(stamps) != self.page_version(product):
+            product = reader.find_one({"_id": oid})
+
+        self._cache_product(oid, product)
+        return product
+
+    # ---------------------------------------------------------
+    # GET MANY PRODUCTS BY ID (batched hydration)
+    #
+    # Resolves a list of IDs with at most ONE query: IDs already
+    # in the catalog cache are served from memory, the rest are
+    # fetched together with {"_id": {"$in": [...]}} and cached.
+    # Invalid and unknown IDs are simply absent from the result.
+    # ---------------------------------------------------------
+    def get_many(self, pids):
+        """
+        Return {str(_id): product document} for the given IDs.
+        """
+        self._sync()
+
+        found = {}
+        missing = []
+        for pid in dict.fromkeys(str(p) for p in pids):
+            if not ObjectId.is_valid(pid):
+                continue
+            oid = ObjectId(pid)
+            product = self.cache.get(("id", oid))
+            if product is MISSING:
+                missing.append(oid)
+            elif product is not None:
+                found[pid] = product
+
+        if missing:
+            fetched = {doc["_id"]: doc for doc in self._reader().find({"_id": {"$in": missing}})}
+            for oid in missing:
+                product = fetched.get(oid)
+                self._cache_product(oid, product)
+                if product is not None:
+                    found[str(oid)] = product
+
+        return found
+
     # ---------------------------------------------------------
     # LIST ALL PRODUCTS WITH LIMIT
     #
     # Useful for homepage, admin listings, category previews, etc.
     # ---------------------------------------------------------
-    def list_all(self, limit=100):
+    def list_all(self, limit=100, card=False):
         """
         Return all products up to a limit.
         """
-        return list(self.db.find().limit(limit))
+        self._sync()
+        return self.cache.get_or_load(
+            ("all", limit, card),
+            lambda: self._find({}, card, limit=limit)
+        )
+
+    # ---------------------------------------------------------
+    # KEYSET (CURSOR) PAGINATION
+    #
+    # Listings are ordered by _id and each page continues from
+    # the last _id of the previous page ({"_id": {"$gt": last}}),
+    # so page 50 is as cheap as page 1 and stays on the
+    # category_1__id_1 index. Page tokens are opaque strings
+    # produced by utils.pagination.
+    #
+    # Pages are cached by the _id they continue after. Tokens that
+    # do not decode and unknown categories come straight from the
+    # query string, so their pages are loaded but never cached:
+    # random values must not evict real entries from the LRU.
+    # ---------------------------------------------------------
+    @staticmethod
+    def _after_id(after):
+        values = decode_token(after)
+        if values and isinstance(values[0], str) and ObjectId.is_valid(values[0]):
+            return ObjectId(values[0])
+        return None
+
+    def _id_page(self, query, after_id, limit, card):
+        if after_id is not None:
+            query = dict(query, _id={"$gt": after_id})
+        docs = self._find(query, card, sort=[("_id", 1)], limit=limit + 1)
+        return make_page(docs, limit, lambda doc: [str(doc["_id"])])
+
+    def categories(self):
+        """
+        Names of the categories that have products.
+        """
+        self._sync()
+        return self.cache.get_or_load(
+            ("categories",),
+            lambda: frozenset(self._reader().distinct("category"))
+        )
+
+    def get_category_page(self, category_name, after=None, limit=PAGE_SIZE, card=True):
+        """
+        Return a Page of products in a category, continuing after `after`.
+        Pages hold ProductCard objects unless card=False.
+        """
+        self._sync()
+        after_id = self._after_id(after)
+
+        def load():
+            return self._id_page({"category": category_name}, after_id, limit, card)
+
+        if (after and after_id is None) or category_name not in self.categories():
+            return load()
+        return self.cache.get_or_load(("category_page", category_name, after_id, limit, card), load)
+
+    def list_page(self, after=None, limit=PAGE_SIZE, card=True):
+        """
+        Return a Page of all products, continuing after `after`.
+        """
+        self._sync()
+        after_id = self._after_id(after)
+
+        def load():
+            return self._id_page({}, after_id, limit, card)
+
+        if after and after_id is None:
+            return load()
+        return self.cache.get_or_load(("page", after_id, limit, card), load)
+
+    # ---------------------------------------------------------
+    # RATING SUMMARY
+    #
+    # Reads the aggregates maintained by ReviewModel (rating_count,
+    # rating_sum, rating_hist) straight from the product document.
+    # Returns None for products without aggregates yet.
+    # ---------------------------------------------------------
+    @staticmethod
+    def rating_summary(product):
+        """
+        Return {"avg", "count", "counts"} where counts[i] is the
+        number of (i + 1)-star reviews.
+        """
+        if "rating_count" not in product:
+            return None
+
+        count = product.get("rating_count", 0)
+        hist = product.get("rating_hist") or {}
+
+        return {
+            "avg": round(product.get("rating_sum", 0) / count, 1) if count else None,
+            "count": count,
+            "counts": [hist.get(str(star), 0) for star in range(1, 6)],
+        }
+
+    # ---------------------------------------------------------
+    # PAGE VERSION
+    #
+    # version         → bumped on writes to the product itself
+    # reviews_version → bumped by ReviewModel on every review write
+    # Together they change whenever the product page would change,
+    # so they make a cheap ETag. Products written before these
+    # fields existed count as 0.
+    # ---------------------------------------------------------
+    @staticmethod
+    def page_version(product):
+        return f"{product.get('version', 0)}.{product.get('reviews_version', 0)}"
 
     # ---------------------------------------------------------
     # INSERT PRODUCT DOCUMENT
@@ -73,26 +497,91 @@ class ProductModel:
         Insert a new product document.
         product_data is a dict with: name, price, image, category, discount, etc.
         """
+        # New products start with empty rating aggregates (see ReviewModel)
+        product_data.setdefault("rating_count", 0)
+        product_data.setdefault("rating_sum", 0)
+        product_data.setdefault("rating_hist", {str(star): 0 for star in range(1, 6)})
+
+        # Change stamps used for page validators (see page_version())
+        product_data.setdefault("version", 1)
+        product_data.setdefault("reviews_version", 0)
+        product_data.setdefault("updated_at", datetime.utcnow())
+
         result = self.db.insert_one(product_data)
+        self.refresh_products([result.inserted_id])
         return self.get_by_id(result.inserted_id)
 
     # ---------------------------------------------------------
-    # SEARCH PRODUCTS BY NAME
+    # SEARCH PRODUCTS
     #
-    # Case-insensitive search using MongoDB regex.
+    # Answered from the in-memory inverted index (BM25 ranking,
+    # prefix matching) instead of a $regex collection scan.
+    # Searches name, category, description, highlights & details.
     # Example:
-    #     model.search("shirt")
+    #     model.search("shi")
     #
     # Matches:
     #     "Blue Shirt"
     #     "shirt for men"
     # ---------------------------------------------------------
-    def search(self, keyword):
+    def get_search_index(self):
         """
-        Perform case-insensitive search on product name.
+        Return the search index, rebuilding it if the catalog changed.
         """
-        return list(
-            self.db.find({
-                "name": {"$regex": keyword, "$options": "i"}  # "i" → ignore case
-            })
-        )
+        self._sync()
+        version = self.cache.version
+
+        if search_index.version != version:
+            search_index.rebuild(self._reader().find({}, SEARCH_PROJECTION), version, view=ProductCard)
+
+        return search_index
+
+    def search(self, keyword, limit=None):
+        """
+        Return products matching every word in `keyword`, best match first.
+        """
+        return self.get_search_index().search(keyword, limit)
+
+    def search_page(self, keyword, after=None, limit=PAGE_SIZE):
+        """
+        Return a Page of search results, best match first.
+
+        Results are ordered by (score desc, _id), and the token holds
+        the score and _id of the last result on the previous page.
+        """
+        ranked = self.get_search_index().search_scored(keyword)
+
+        start = 0
+        values = decode_token(after)
+        if values and len(values) == 2 and isinstance(values[0], (int, float)):
+            # Ranked list is sorted by this key, so bisect finds the resume point
+            last = (-values[0], str(values[1]))
+            start = bisect_right(ranked, last, key=lambda item: (-item[0], str(item[1]["_id"])))
+
+        window = ranked[start:start + limit + 1]
+        page = make_page(window, limit, lambda item: [item[0], str(item[1]["_id"])])
+        return page._replace(items=[doc for _, doc in page.items])
+
+    # ---------------------------------------------------------
+    # SEARCH SUGGESTIONS (search-as-you-type)
+    #
+    # Built from the documents already held by the search index,
+    # so suggestions never query MongoDB themselves.
+    # ---------------------------------------------------------
+    def suggest(self, prefix, k=8):
+        """
+        Return up to k completions for `prefix` (products, categories,
+        popular queries).
+        """
+        index = self.get_search_index()
+
+        if suggestion_index.version != index.version:
+            suggestion_index.rebuild(index.documents(), index.version)
+
+        return suggestion_index.suggest(prefix, k)
+
+    def record_search(self, query):
+        """
+        Remember a search that returned results as a popular query.
+        """
+        suggestion_index.record_query(query)
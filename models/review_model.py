@@ -1,4 +1,7 @@
 from bson import ObjectId
+from pymongo import IndexModel, ReturnDocument, UpdateOne
+from database.connection import catalog_collection
+from models.product_model import ProductModel
 import datetime
 
 
@@ -14,12 +17,93 @@ class ReviewModel:
 
     Supports both ObjectId and string-based product_id formats
     for backward compatibility.
+
+    Every write also keeps the product's rating aggregates in step:
+        rating_count → number of reviews
+        rating_sum   → sum of all ratings
+        rating_hist  → {"1": n, …, "5": n} star histogram
+    so product pages never have to scan reviews for the summary,
+    and bumps the product's reviews_version / updated_at so cached
+    product pages (ETags) are revalidated. Review writes never bump
+    the catalog version: only the product's cache entry is refreshed.
     """
 
+    COLLECTION = "reviews"
+
+    # Indexes created at startup by database.indexes.ensure_indexes()
+    # product_id + user serves both "all reviews of a product" and
+    # "this user's review of a product".
+    INDEXES = [
+        IndexModel([("product_id", 1), ("user", 1)], name="product_id_1_user_1"),
+    ]
+
+    # Representative queries, used by `python manage.py explain`
+    EXPLAIN_QUERIES = [
+        ("get_product_reviews", {"$or": [{"product_id": ObjectId()}, {"product_id": "0" * 24}]}),
+        ("find_user_review", {
+            "$or": [{"product_id": ObjectId()}, {"product_id": "0" * 24}],
+            "user": "someone"
+        }),
+    ]
+
     def __init__(self, mongo):
         # Bind to the 'reviews' collection in MongoDB
         self.collection = mongo.db.reviews
 
+        # Review listings on product pages may be served by a secondary;
+        # the duplicate check and writes go through self.collection (primary)
+        self.listing = catalog_collection(mongo, "reviews")
+
+        # Product aggregates are updated through ProductModel so the
+        # product's cache entry follows every review write
+        self.products = ProductModel(mongo)
+
+    # ---------------------------------------------------------
+    # RATING AGGREGATES + REVIEWS VERSION
+    #
+    # Applies a review write to the product with a single update:
+    # the rating change ($inc) and the reviews_version stamp.
+    # Products that have never been through rebuild_rating_aggregates()
+    # (no rating_count yet) only get the stamp, so they are not left
+    # with partial counts; the product page falls back to counting
+    # reviews.
+    # ---------------------------------------------------------
+    def _apply_rating_change(self, product_id, added=None, removed=None):
+        inc = {}
+
+        for rating, step in ((added, 1), (removed, -1)):
+            if rating is None:
+                continue
+            rating = int(rating)
+            inc["rating_count"] = inc.get("rating_count", 0) + step
+            inc["rating_sum"] = inc.get("rating_sum", 0) + step * rating
+            key = f"rating_hist.{rating}"
+            inc[key] = inc.get(key, 0) + step
+
+        # Drop no-op counters (e.g. an update that kept the same rating)
+        inc = {k: v for k, v in inc.items() if v}
+        if not ObjectId.is_valid(product_id):
+            return
+
+        product_oid = ObjectId(product_id)
+        stamp = {"$set": {"updated_at": datetime.datetime.utcnow()}}
+
+        result = None
+        if inc:
+            result = self.products.db.update_one(
+                {"_id": product_oid, "rating_count": {"$exists": True}},
+                {"$inc": {**inc, "reviews_version": 1}, **stamp}
+            )
+
+        if not result or not result.matched_count:
+            result = self.products.db.update_one(
+                {"_id": product_oid},
+                {"$inc": {"reviews_version": 1}, **stamp}
+            )
+
+        if result.modified_count:
+            self.products.refresh_reviews(product_oid)
+
     # ---------------------------------------------------------
     # FIND USER’S EXISTING REVIEW FOR A PRODUCT
     #
@@ -50,7 +134,7 @@ class ReviewModel:
     #   - created timestamp
     # ---------------------------------------------------------
     def insert_review(self, product_oid, username, rating, review_text):
-        return self.collection.insert_one({
+        result = self.collection.insert_one({
             "product_id": product_oid,
             "user": username,
             "rating": rating,
@@ -58,43 +142,128 @@ class ReviewModel:
             "created_at": datetime.datetime.utcnow()
         })
 
+        self._apply_rating_change(product_oid, added=rating)
+        return result
+
     # ---------------------------------------------------------
     # UPDATE EXISTING REVIEW
     #
     # Updates rating and review text while also recording the
     # update timestamp. Does not modify the username.
+    #
+    # Returns the review as it was BEFORE the update (None if it
+    # no longer exists); the old rating is needed for aggregates.
     # ---------------------------------------------------------
     def update_review(self, review_id, product_oid, rating, review_text):
-        return self.collection.update_one(
+        previous = self.collection.find_one_and_update(
             {"_id": review_id},
             {"$set": {
                 "product_id": product_oid,
                 "rating": rating,
                 "review": review_text,
                 "updated_at": datetime.datetime.utcnow()
-            }}
+            }},
+            projection={"rating": 1},
+            return_document=ReturnDocument.BEFORE
         )
 
+        if previous:
+            self._apply_rating_change(product_oid, added=rating, removed=previous.get("rating"))
+        return previous
+
     # ---------------------------------------------------------
     # DELETE REVIEW
     #
     # Removes a review document from the database using its ID.
+    # Returns the deleted review (None if it did not exist).
     # ---------------------------------------------------------
     def delete_review(self, review_id):
-        return self.collection.delete_one({"_id": review_id})
+        deleted = self.collection.find_one_and_delete(
+            {"_id": review_id},
+            projection={"product_id": 1, "rating": 1}
+        )
+
+        if deleted:
+            self._apply_rating_change(deleted.get("product_id"), removed=deleted.get("rating"))
+        return deleted
 
     # ---------------------------------------------------------
     # GET ALL REVIEWS FOR A PRODUCT
     #
     # Supports both ObjectId and string-based product IDs.
+    # fresh=True reads the primary (a visitor reading back their
+    # own review, which a secondary may not have yet).
     #
     # Returns:
     #   - A list of all matching reviews
     # ---------------------------------------------------------
-    def get_product_reviews(self, product_oid, product_str):
-        return list(self.collection.find({
+    def get_product_reviews(self, product_oid, product_str, fresh=False):
+        source = self.collection if fresh else self.listing
+        return list(source.find({
             "$or": [
                 {"product_id": product_oid},
                 {"product_id": product_str}
             ]
         }))
+
+    # ---------------------------------------------------------
+    # REBUILD RATING AGGREGATES (maintenance job)
+    #
+    # Recomputes rating_count / rating_sum / rating_hist for every
+    # product from the reviews collection. Run it once after
+    # deploying aggregates, and whenever drift is suspected:
+    #     python manage.py rebuild-ratings
+    #
+    # Returns (products checked, products that had drifted).
+    # ---------------------------------------------------------
+    def rebuild_rating_aggregates(self):
+        pipeline = [
+            {"$project": {
+                # product_id may be an ObjectId or its string form
+                "product_id": {"$convert": {"input": "$product_id", "to": "objectId", "onError": None}},
+                "rating": {"$convert": {"input": "$rating", "to": "int", "onError": None}},
+            }},
+            {"$match": {"product_id": {"$ne": None}, "rating": {"$gte": 1, "$lte": 5}}},
+            {"$group": {
+                "_id": {"product_id": "$product_id", "rating": "$rating"},
+                "count": {"$sum": 1},
+            }},
+        ]
+
+        aggregates = {}
+        for row in self.collection.aggregate(pipeline):
+            pid = row["_id"]["product_id"]
+            rating = row["_id"]["rating"]
+            agg = aggregates.setdefault(pid, {
+                "rating_count": 0,
+                "rating_sum": 0,
+                "rating_hist": {str(star): 0 for star in range(1, 6)},
+            })
+            agg["rating_count"] += row["count"]
+            agg["rating_sum"] += rating * row["count"]
+            agg["rating_hist"][str(rating)] += row["count"]
+
+        empty = {
+            "rating_count": 0,
+            "rating_sum": 0,
+            "rating_hist": {str(star): 0 for star in range(1, 6)},
+        }
+
+        checked = 0
+        updates = []
+        fields = ("rating_count", "rating_sum", "rating_hist")
+        for product in self.products.primary.find({}, {k: 1 for k in fields}):
+            checked += 1
+            expected = aggregates.get(product["_id"], empty)
+            current = {k: product.get(k) for k in fields}
+            if current != expected:
+                updates.append(UpdateOne(
+                    {"_id": product["_id"]},
+                    {"$set": expected, "$inc": {"reviews_version": 1}}
+                ))
+
+        if updates:
+            self.products.db.bulk_write(updates, ordered=False)
+            self.products.bump_version()
+
+        return checked, len(updates)
@@ -1,4 +1,5 @@
 from bson.objectid import ObjectId
+from pymongo import IndexModel
 
 
 class UserModel:
@@ -13,6 +14,20 @@ class UserModel:
     This model abstracts MongoDB logic away from controllers.
     """
 
+    COLLECTION = "users"
+
+    # Indexes created at startup by database.indexes.ensure_indexes()
+    # Email is the login identifier, so it must be unique.
+    INDEXES = [
+        IndexModel([("email", 1)], name="email_1", unique=True),
+    ]
+
+    # Representative queries, used by `python manage.py explain`
+    EXPLAIN_QUERIES = [
+        ("find_by_email", {"email": "someone@example.com"}),
+        ("get_by_id", {"_id": ObjectId()}),
+    ]
+
     def __init__(self, mongo):
         # Connect to the users collection
         self.db = mongo.db.users
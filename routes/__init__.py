@@ -5,22 +5,26 @@ from .product_routes import product_bp
 from .auth_routes import auth_bp
 from .review_routes import review_bp
 from .category_routes import category_bp
+from .image_routes import image_bp
+from .metrics_routes import metrics_bp
 
 
 # ------------------------------------------------------------
-# BLUEPRINT REGISTRATION (Version 1)
+# BLUEPRINT REGISTRATION
 #
 # This function attaches all the app’s blueprints to the Flask
 # application instance. Blueprints modularize the application
 # making routes clean, organized, and maintainable.
 #
 # Some blueprints use url_prefix to group routes under a path.
+# (An older, shadowed definition without category_bp and with
+# unprefixed review routes used to precede this one.)
 # ------------------------------------------------------------
 def register_blueprints(app):
-    # Main pages (home, search, static pages)
+    # Main blueprint (home, search)
     app.register_blueprint(main_bp)
 
-    # Authentication routes → /auth/*
+    # Auth routes → /auth/*
     app.register_blueprint(auth_bp, url_prefix="/auth")
 
     # Category browsing routes → /category/*
@@ -29,34 +33,12 @@ def register_blueprints(app):
     # Product routes → /product/*
     app.register_blueprint(product_bp, url_prefix="/product")
 
-    # Review routes without prefix (global endpoints)
-    app.register_blueprint(review_bp)
-
-
-
-# The duplicate import is preserved exactly as you had it.
-# The goal is to improve readability **without altering behavior**.
-from .review_routes import review_bp
-
-
-# ------------------------------------------------------------
-# BLUEPRINT REGISTRATION (Version 2)
-#
-# This appears to be an alternate or overwritten definition.
-# Flask will use whichever definition is imported at runtime.
-#
-# This version attaches a URL prefix for review routes.
-# ------------------------------------------------------------
-def register_blueprints(app):
-    # Main blueprint (home, search)
-    app.register_blueprint(main_bp)
-
-    # Auth routes → /auth/*
-    app.register_blueprint(auth_bp, url_prefix="/auth")
-
-    # Product routes → /product/*
-    app.register_blueprint(product_bp, url_prefix="/product")
-
     # Review routes → /review/*
     # This groups all review-related actions under a dedicated prefix.
     app.register_blueprint(review_bp, url_prefix="/review")
+
+    # On-demand resized product images → /img/<width>/<name>
+    app.register_blueprint(image_bp)
+
+    # Prometheus scrape endpoint → /metrics
+    app.register_blueprint(metrics_bp)
@@ -1,12 +1,17 @@
 from flask import Blueprint, request
 from database.connection import mongo
 from controllers.auth_controller import AuthController
+from utils.rate_limit import rate_limiter, by_form, by_session
 
 # ---------------------------------------------------------
 # AUTH BLUEPRINT
+#
+# Every POST is rate limited per IP; the routes that send or
+# check an OTP also have their own limits (see RATE_LIMITS).
 # ---------------------------------------------------------
 auth_bp = Blueprint("auth", __name__)
 controller = AuthController(mongo)
+rate_limiter.limit_blueprint(auth_bp, "auth_ip")
 
 # ---------------------------------------------------------
 # LOGIN PAGE
@@ -19,6 +24,8 @@ def login():
 # SEND LOGIN OTP (EMAIL)
 # ---------------------------------------------------------
 @auth_bp.route("/send-login-email", methods=["POST"])
+@rate_limiter.limit("otp_send_ip")
+@rate_limiter.limit("otp_send_email", key=by_form("email"))
 def send_login_email():
     email = request.form.get("email")
     return controller.send_login_email(email)
@@ -27,6 +34,7 @@ def send_login_email():
 # VERIFY LOGIN OTP
 # ---------------------------------------------------------
 @auth_bp.route("/verify-login-otp", methods=["POST"])
+@rate_limiter.limit("otp_verify_email", key=by_form("email"))
 def verify_login_otp():
     email = request.form.get("email")
     otp = request.form.get("otp")
@@ -58,6 +66,8 @@ def signup_name():
 # SIGNUP STEP 2 SUBMIT — Save Name + Send OTP
 # ---------------------------------------------------------
 @auth_bp.route("/signup-submit-name", methods=["POST"])
+@rate_limiter.limit("otp_send_ip")
+@rate_limiter.limit("otp_send_email", key=by_session("pending_email"))
 def signup_submit_name():
     name = request.form.get("name")
     return controller.submit_signup_name(name)
@@ -66,6 +76,7 @@ def signup_submit_name():
 # VERIFY SIGNUP OTP
 # ---------------------------------------------------------
 @auth_bp.route("/verify-signup-otp", methods=["POST"])
+@rate_limiter.limit("otp_verify_email", key=by_form("email"))
 def verify_signup_otp():
     email = request.form.get("email")
     otp = request.form.get("otp")
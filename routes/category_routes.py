@@ -1,6 +1,7 @@
-from flask import Blueprint
+from flask import Blueprint, request
 from database.connection import mongo
 from controllers.category_controller import CategoryController
+from utils.page_cache import page_cache
 
 # ---------------------------------------------------------
 # CATEGORY BLUEPRINT
@@ -23,12 +24,16 @@ controller = CategoryController(mongo)
 # CATEGORY PAGE ROUTE
 #
 # Dynamic route that accepts a category name from the URL.
-# Calls the CategoryController to fetch and render all products
-# in that category.
+# Calls the CategoryController to fetch and render one page of
+# products in that category.
 #
 # Example:
 #     GET /category/electronics
+#     GET /category/electronics?after=<page token>
+#
+# Anonymous visits are served from the page cache.
 # ---------------------------------------------------------
 @category_bp.route("/<name>")
+@page_cache.cached(version=controller.products.catalog_version, query=("after",))
 def show_category(name):
-    return controller.show_category(name)
+    return controller.show_category(name, request.args.get("after"))
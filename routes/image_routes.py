@@ -0,0 +1,28 @@
+from flask import Blueprint
+from controllers.image_controller import ImageController
+
+# ---------------------------------------------------------
+# IMAGE BLUEPRINT
+#
+# Resizes product images on demand, for images that
+# `python manage.py build-images` has not processed yet.
+#
+# Example:
+#     /img/320/anarkali.jpg  → anarkali.jpg, 320px wide
+#
+# Resized files are kept in a bounded disk cache
+# (see utils/image_cache.py).
+# ---------------------------------------------------------
+image_bp = Blueprint("image", __name__)
+controller = ImageController()
+
+
+# ---------------------------------------------------------
+# RESIZED PRODUCT IMAGE
+#
+# URL: GET /img/<width>/<name>
+# Only the widths in IMAGE_RESIZE_WIDTHS are served.
+# ---------------------------------------------------------
+@image_bp.route("/img/<int:width>/<path:name>")
+def resize(width, name):
+    return controller.resize(width, name)
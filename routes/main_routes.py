@@ -1,6 +1,8 @@
 from flask import Blueprint, request
 from database.connection import mongo
 from controllers.main_controller import MainController
+from utils.page_cache import page_cache
+from utils.rate_limit import rate_limiter
 
 # ---------------------------------------------------------
 # MAIN BLUEPRINT
@@ -8,6 +10,7 @@ from controllers.main_controller import MainController
 # Handles general site pages:
 #   - Homepage
 #   - Search
+#   - Search suggestions (JSON)
 #   - FAQ
 #   - Contact
 #   - Policies
@@ -24,11 +27,14 @@ controller = MainController(mongo)
 # HOMEPAGE
 #
 # Loads featured products (limit handled in controller).
-# URL: GET /
+# URL: GET /            → first page
+#      GET /?after=…    → next page (opaque page token)
+# Anonymous visits are served from the page cache.
 # ---------------------------------------------------------
 @main_bp.route("/")
+@page_cache.cached(version=controller.products.catalog_version, query=("after",))
 def home():
-    return controller.home()
+    return controller.home(request.args.get("after"))
 
 
 # ---------------------------------------------------------
@@ -39,11 +45,30 @@ def home():
 #
 # Strips whitespace and forwards it to the controller.
 # If query is empty, controller returns empty results.
+# `after` is the opaque token of the next results page.
+# Rate limited per IP (each search scans the catalog).
 # ---------------------------------------------------------
 @main_bp.route("/search")
+@rate_limiter.limit("search_ip")
 def search():
     query = request.args.get("q", "").strip()
-    return controller.search(query)
+    return controller.search(query, request.args.get("after"))
+
+
+# ---------------------------------------------------------
+# SEARCH SUGGESTIONS (JSON)
+#
+# Called by main.js on every keystroke in the navbar search:
+#     /search/suggest?q=sil&k=8
+#
+# Answered from memory (product names, categories and popular
+# queries); never queries MongoDB directly.
+# ---------------------------------------------------------
+@main_bp.route("/search/suggest")
+def search_suggest():
+    query = request.args.get("q", "").strip()
+    limit = min(request.args.get("k", 8, type=int), 20)
+    return controller.suggest(query, limit)
 
 
 # ---------------------------------------------------------
@@ -53,6 +78,7 @@ def search():
 # URL: GET /faq
 # ---------------------------------------------------------
 @main_bp.route("/faq")
+@page_cache.cached()
 def faq():
     return controller.faq()
 
@@ -64,6 +90,7 @@ def faq():
 # URL: GET /contact
 # ---------------------------------------------------------
 @main_bp.route("/contact")
+@page_cache.cached()
 def contact():
     return controller.contact()
 
@@ -75,5 +102,6 @@ def contact():
 # URL: GET /policies
 # ---------------------------------------------------------
 @main_bp.route("/policies")
+@page_cache.cached()
 def policies():
     return controller.policies()
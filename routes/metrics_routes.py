@@ -0,0 +1,25 @@
+from flask import Blueprint
+from controllers.metrics_controller import MetricsController
+
+# ---------------------------------------------------------
+# METRICS BLUEPRINT
+#
+# Prometheus scrape endpoint. Adds up the counters and
+# histograms of every gunicorn worker (see utils/metrics.py):
+#   - request latency per route
+#   - MongoDB commands per collection / command
+#   - pool, email, cache and compression counters
+# ---------------------------------------------------------
+metrics_bp = Blueprint("metrics", __name__)
+controller = MetricsController()
+
+
+# ---------------------------------------------------------
+# METRICS
+#
+# URL: GET /metrics
+# Protected by METRICS_TOKEN (or local requests only).
+# ---------------------------------------------------------
+@metrics_bp.route("/metrics")
+def metrics():
+    return controller.metrics()
@@ -2,6 +2,7 @@ from flask import Blueprint, request
 from database.connection import mongo
 from controllers.product_controller import ProductController
 from controllers.cart_controller import CartController
+from utils.page_cache import page_cache
 
 # ---------------------------------------------------------
 # PRODUCT BLUEPRINT
@@ -40,14 +41,17 @@ def product_detail(product_id):
 # ---------------------------------------------------------
 # CATEGORY VIEW
 #
-# URL: /product/category/<category_name>
-# Shows all products inside a given category.
+# URL: /product/category/<category_name>?after=<page token>
+# Shows one page of products inside a given category.
+# Anonymous visits are served from the page cache.
 # ---------------------------------------------------------
 @product_bp.route("/category/<category_name>")
+@page_cache.cached(version=product_controller.products.catalog_version, query=("after",))
 def category_view(category_name):
     return product_controller.category_view(
         category_name,
-        cart_controller.normalize_cart
+        cart_controller.normalize_cart,
+        request.args.get("after")
     )
 
 
@@ -8,26 +8,36 @@ Enhancements:
  - Supports new UI features
 
 Run:
-    python seed.py
+    python seed.py                      → the ~50 hand-written products below
+
+Generator mode (synthetic catalog at production scale, derived from
+the products below; the same --seed always gives the same data):
+    python seed.py --products 1000000 --reviews 5000000 --users 50000 --carts 20000
+    python seed.py --products 200000 --workers 8 --batch 2000 --seed 7
+
+Both modes replace the existing data in the target database, the
+local timeless_threads database unless --mongo-uri names another one.
+Generator mode also replaces users, reviews and carts, and refuses to
+delete existing ones without --yes.
 """
 
-from pymongo import MongoClient
+import argparse
 import datetime
+import hashlib
+import math
+import multiprocessing
 import os
+import random
+import struct
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from bson import ObjectId
+from pymongo import MongoClient
 
-# ---------------------------------------------------------
-# DB CONNECT
-# ---------------------------------------------------------
-client = MongoClient("mongodb://localhost:27017/")
-db = client["timeless_threads"]
 
-products_col = db["products"]
-categories_col = db["categories"]
+LOCAL_URI = "mongodb://localhost:27017/timeless_threads"
 
-print("\n⚠ Clearing existing collections...")
-products_col.delete_many({})
-categories_col.delete_many({})
-print("✔ Old data cleared.\n")
 
 # ---------------------------------------------------------
 # CATEGORY SEED
@@ -39,9 +49,6 @@ categories = [
     {"name": "cosmetics", "display_name": "Cosmetics", "image": "cosmetics.jpg"},
 ]
 
-categories_col.insert_many(categories)
-print("✔ Categories inserted.\n")
-
 
 # ---------------------------------------------------------
 # Helper: Add image2 & image3 based on image
@@ -1116,23 +1123,432 @@ products = [
 ]
 # (I did not rewrite your long product list here — keep as is.)
 
+
 # ---------------------------------------------------------
-# Enhance each product
+# Helpers shared by both modes
 # ---------------------------------------------------------
-enhanced_products = []
-for p in products:
-    p = add_multi_images(p)
-    p = add_missing_variants(p)
+def clear(db, names):
+    for name in names:
+        db[name].delete_many({})
 
-    p["created_at"] = datetime.datetime.utcnow()
 
-    enhanced_products.append(p)
+def bump_catalog_version(db):
+    # Same stamp as ProductModel.bump_version(): running workers drop
+    # their cached catalog on their next version check
+    db.catalog_meta.update_one({"_id": "catalog_version"}, {"$inc": {"version": 1}}, upsert=True)
+
 
 # ---------------------------------------------------------
-# INSERT INTO MONGO
+# TEMPLATE MODE: insert the products above as they are
 # ---------------------------------------------------------
-products_col.insert_many(enhanced_products)
+def seed_templates(db):
+    print("\n⚠ Clearing existing collections...")
+    clear(db, ("products", "categories"))
+    print("✔ Old data cleared.\n")
+
+    db.categories.insert_many([dict(c) for c in categories])
+    print("✔ Categories inserted.\n")
+
+    # Enhance each product
+    enhanced_products = []
+    for p in products:
+        p = add_multi_images(dict(p))
+        p = add_missing_variants(p)
+
+        p["created_at"] = datetime.datetime.utcnow()
+
+        enhanced_products.append(p)
+
+    db.products.insert_many(enhanced_products)
+    bump_catalog_version(db)
+
+    print("✔ All products inserted successfully!")
+    print("✔ Added image2, image3, sizes[], colors[] where missing.")
+    print("\n🎉 Seeding Completed!\n")
+
 
-print("✔ All products inserted successfully!")
-print("✔ Added image2, image3, sizes[], colors[] where missing.")
-print("\n🎉 Seeding Completed!\n")
+# ---------------------------------------------------------
+# GENERATOR MODE
+#
+# Every generated product is one of the products above with a
+# variant name, a jittered price and its own id. The data is
+# built in independent chunks of `batch` documents, each from its
+# own random stream (seed, kind, chunk), so the result is the same
+# for a seed whatever the number of worker processes.
+#
+# Popularity follows a Zipf law: the product at popularity rank r
+# gets reviews and cart adds in proportion to r^-1.1, so a few
+# products get most of them and the long tail almost none. Ranks
+# are spread over the catalog (see GeneratorSpec.index_at_rank),
+# so popular products are not all the oldest ones.
+# ---------------------------------------------------------
+ZIPF_EXPONENT = 1.1
+
+# Generated timestamps count from here (product i is created i seconds later)
+BASE_TIME = datetime.datetime(2024, 1, 1)
+BASE_EPOCH = int(BASE_TIME.replace(tzinfo=datetime.timezone.utc).timestamp())
+
+VARIANT_WORDS = [
+    "Classic", "Festive", "Pastel", "Royal", "Everyday", "Premium",
+    "Handloom", "Designer", "Summer", "Signature", "Heritage", "Modern",
+]
+DISCOUNTS = [0, 5, 10, 15, 20, 25, 30]
+
+# Collections that hold real customer data, never cleared without --yes
+CUSTOMER_COLLECTIONS = ("reviews", "users", "carts")
+
+# Ratings skew positive, as they do on real stores
+RATING_WEIGHTS = [1, 1, 2, 4, 6]
+REVIEW_TEXTS = [
+    "Loved it, exactly as shown.",
+    "Good quality for the price.",
+    "Colour was slightly different from the photos.",
+    "Fits well, very comfortable.",
+    "Fabric could be better.",
+    "Perfect for the festive season!",
+    "Delivery was quick and packing was neat.",
+    "Not worth the price.",
+]
+
+GENERATED_COLLECTIONS = ("categories", "products", "reviews", "users", "carts")
+
+
+def _object_id(seconds, *parts):
+    """
+    Deterministic ObjectId: the timestamp part is BASE_TIME + `seconds`
+    (so _id order follows creation order), the rest a hash of `parts`.
+    """
+    digest = hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=8).digest()
+    return ObjectId(struct.pack(">I", BASE_EPOCH + seconds) + digest)
+
+
+def _harmonic(n, s, exact=10000):
+    """
+    Generalized harmonic number H(n, s) = Σ r^-s for r = 1..n.
+    Exact for the first `exact` terms, the tail by its integral.
+    """
+    k = min(n, exact)
+    total = math.fsum(r ** -s for r in range(1, k + 1))
+    if n > k:
+        total += ((k + 0.5) ** (1 - s) - (n + 0.5) ** (1 - s)) / (s - 1)
+    return total
+
+
+def user_email(i):
+    return f"user{i}@example.com"
+
+
+def user_name(i):
+    return f"Shopper {i}"
+
+
+@dataclass(frozen=True)
+class GeneratorSpec:
+    """
+    What to generate. Picklable, so it can be sent to worker processes.
+    """
+
+    products: int
+    reviews: int
+    users: int
+    carts: int
+    seed: int = 42
+    batch: int = 1000
+
+    @property
+    def stride(self):
+        # Any step coprime with the catalog size visits every product once
+        stride = 2654435761 % self.products or 1
+        while math.gcd(stride, self.products) != 1:
+            stride += 1
+        return stride
+
+    def index_at_rank(self, rank):
+        """
+        Catalog index of the product at popularity `rank` (1 = most popular).
+        """
+        return (rank - 1) * self.stride % self.products
+
+    def product_id(self, index):
+        return _object_id(index, self.seed, "product", index)
+
+    @cached_property
+    def review_curve(self):
+        """
+        (head, scale) of the review counts: the `head` most popular
+        products get a review from every user, the product at rank
+        r > head gets scale * r^-s. What the capped head cannot take
+        goes down the tail, so the total stays spec.reviews (as long
+        as products * users reviews can exist).
+        """
+        total = min(self.reviews, self.products * self.users)
+        tail = _harmonic(self.products, ZIPF_EXPONENT)
+        head = 0
+        while head < self.products:
+            scale = (total - head * self.users) / tail
+            if scale * (head + 1) ** -ZIPF_EXPONENT <= self.users:
+                return head, scale
+            head += 1
+            tail -= head ** -ZIPF_EXPONENT
+        return head, 0.0
+
+    def chunks(self, count):
+        return range(math.ceil(count / self.batch))
+
+    def sample_rank(self, rng):
+        """
+        Popularity rank drawn from the Zipf law (inverse CDF of its
+        continuous approximation, so no table of weights is needed).
+        """
+        a = 1 - ZIPF_EXPONENT
+        u = rng.random()
+        rank = int((1 + u * ((self.products + 1) ** a - 1)) ** (1 / a))
+        return min(max(rank, 1), self.products)
+
+
+def make_product(spec, index, rng):
+    template = products[index % len(products)]
+
+    product = add_multi_images(dict(template))
+    product = add_missing_variants(product)
+    product.update({
+        "_id": spec.product_id(index),
+        "name": f"{rng.choice(VARIANT_WORDS)} {template['name']}",
+        "price": max(99, int(round(template["price"] * rng.uniform(0.7, 1.4), -1)) - 1),
+        "discount": rng.choice(DISCOUNTS),
+        "created_at": BASE_TIME + datetime.timedelta(seconds=index),
+        # Change stamps and rating aggregates, as ProductModel.insert()
+        # and ReviewModel keep them
+        "version": 1,
+        "reviews_version": 0,
+        "rating_count": 0,
+        "rating_sum": 0,
+        "rating_hist": {str(star): 0 for star in range(1, 6)},
+    })
+    return product
+
+
+def build_products(spec, chunk):
+    """
+    Products of one chunk, with their reviews.
+
+    A product's review count is its expected Zipf share of
+    spec.reviews (at most one review per user, see review_curve), so
+    the aggregates are known without a rebuild and chunks stay
+    independent.
+    """
+    rng = random.Random(f"{spec.seed}:products:{chunk}")
+    start = chunk * spec.batch
+    stop = min(start + spec.batch, spec.products)
+
+    inverse = pow(spec.stride, -1, spec.products)
+    head, scale = spec.review_curve
+
+    product_docs, review_docs = [], []
+    for index in range(start, stop):
+        product = make_product(spec, index, rng)
+        product_docs.append(product)
+
+        rank = index * inverse % spec.products + 1
+        expected = spec.users if rank <= head else scale * rank ** -ZIPF_EXPONENT
+        count = min(int(expected) + (rng.random() < expected % 1), spec.users)
+
+        for user in rng.sample(range(spec.users), count):
+            rating = rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0]
+            offset = index + rng.randrange(3600, 365 * 86400)
+            review_docs.append({
+                "_id": _object_id(offset, spec.seed, "review", index, user),
+                "product_id": product["_id"],
+                "user": user_name(user),
+                "rating": rating,
+                "review": rng.choice(REVIEW_TEXTS),
+                "created_at": BASE_TIME + datetime.timedelta(seconds=offset)
+            })
+            product["rating_count"] += 1
+            product["rating_sum"] += rating
+            product["rating_hist"][str(rating)] += 1
+
+    return product_docs, review_docs
+
+
+def build_users(spec, chunk):
+    start = chunk * spec.batch
+    return [
+        {"_id": _object_id(i, spec.seed, "user", i), "email": user_email(i), "name": user_name(i)}
+        for i in range(start, min(start + spec.batch, spec.users))
+    ]
+
+
+def build_carts(spec, chunk):
+    """
+    Server-side carts in the current schema (see utils/cart_store.py),
+    1-5 lines each, products drawn by popularity.
+    """
+    from utils.cart_store import CART_SCHEMA_VERSION, line_key
+
+    rng = random.Random(f"{spec.seed}:carts:{chunk}")
+    start = chunk * spec.batch
+    # Recent, so the carts' TTL index does not remove them right away
+    now = datetime.datetime.utcnow().replace(microsecond=0)
+
+    carts = []
+    for i in range(start, min(start + spec.batch, spec.carts)):
+        updated_at = now - datetime.timedelta(minutes=rng.randrange(7 * 24 * 60))
+        lines = {}
+        for _ in range(rng.randint(1, 5)):
+            index = spec.index_at_rank(spec.sample_rank(rng))
+            variants = add_missing_variants(dict(products[index % len(products)]))
+            product_id = str(spec.product_id(index))
+            size = rng.choice(variants["sizes"])
+            color = rng.choice(variants["colors"])
+
+            line = lines.setdefault(line_key(product_id, size, color), {
+                "product_id": product_id,
+                "size": size,
+                "color": color,
+                "quantity": 0,
+                "added_at": updated_at - datetime.timedelta(minutes=rng.randrange(24 * 60))
+            })
+            line["quantity"] += 1
+
+        carts.append({
+            "_id": hashlib.blake2b(f"{spec.seed}:cart:{i}".encode(), digest_size=16).hexdigest(),
+            "schema": CART_SCHEMA_VERSION,
+            "lines": lines,
+            "updated_at": updated_at
+        })
+    return carts
+
+
+def _insert(collection, docs, batch):
+    for start in range(0, len(docs), batch):
+        collection.insert_many(docs[start:start + batch], ordered=False)
+
+
+def write_chunk(db, spec, kind, chunk):
+    """
+    Build and insert one chunk. Returns {collection: documents inserted}.
+    """
+    if kind == "products":
+        product_docs, review_docs = build_products(spec, chunk)
+        _insert(db.products, product_docs, spec.batch)
+        _insert(db.reviews, review_docs, spec.batch)
+        return {"products": len(product_docs), "reviews": len(review_docs)}
+
+    if kind == "users":
+        docs = build_users(spec, chunk)
+        _insert(db.users, docs, spec.batch)
+        return {"users": len(docs)}
+
+    docs = build_carts(spec, chunk)
+    _insert(db.carts, docs, spec.batch)
+    return {"carts": len(docs)}
+
+
+# Worker processes each open their own client (clients are not fork-safe)
+_worker_db = None
+
+
+def _connect_worker(uri, db_name):
+    global _worker_db
+    _worker_db = MongoClient(uri)[db_name]
+
+
+def _run_chunk(task):
+    return write_chunk(_worker_db, *task)
+
+
+def generate(db, spec, workers=1, uri=None):
+    """
+    Replace the data in `db` with a generated catalog.
+
+    With workers > 1 the chunks are written by a process pool, each
+    process connected to `uri` (the server `db` lives on).
+
+    :return: {collection: documents inserted}
+    """
+    if workers > 1 and not uri:
+        raise ValueError("generate() needs the MongoDB URI to use worker processes")
+
+    if spec.reviews > spec.products * spec.users:
+        print(
+            f"⚠ WARNING: {spec.reviews} reviews requested, but {spec.products} products × "
+            f"{spec.users} users allow only {spec.products * spec.users} (one review per user)"
+        )
+
+    clear(db, GENERATED_COLLECTIONS)
+    db.categories.insert_many([dict(c) for c in categories])
+
+    tasks = (
+        [(spec, "products", chunk) for chunk in spec.chunks(spec.products)]
+        + [(spec, "users", chunk) for chunk in spec.chunks(spec.users)]
+        + [(spec, "carts", chunk) for chunk in spec.chunks(spec.carts)]
+    )
+    totals = {"products": 0, "reviews": 0, "users": 0, "carts": 0}
+    step = max(1, len(tasks) // 10)
+    started = time.monotonic()
+
+    def record(done, counts):
+        for name, count in counts.items():
+            totals[name] += count
+        if done % step == 0 or done == len(tasks):
+            print(f"  {done}/{len(tasks)} chunks, {totals} ({time.monotonic() - started:.1f}s)")
+
+    if workers > 1:
+        with multiprocessing.Pool(workers, initializer=_connect_worker, initargs=(uri, db.name)) as pool:
+            for done, counts in enumerate(pool.imap_unordered(_run_chunk, tasks), 1):
+                record(done, counts)
+    else:
+        for done, task in enumerate(tasks, 1):
+            record(done, write_chunk(db, *task))
+
+    bump_catalog_version(db)
+    return totals
+
+
+# ---------------------------------------------------------
+# ENTRY POINT
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Seed the Timeless Threads database")
+    parser.add_argument("--products", type=int, default=0, help="generate this many products (generator mode)")
+    parser.add_argument("--reviews", type=int, help="reviews to generate (default: 5 per product)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--carts", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch", type=int, default=1000, help="documents per insert_many")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="writer processes")
+    parser.add_argument("--mongo-uri", help="target server (default: the local timeless_threads database)")
+    parser.add_argument("--yes", action="store_true", help="allow deleting existing reviews, users and carts")
+    args = parser.parse_args()
+
+    # Never MONGO_URI: on a deployed box that is the production database
+    uri = args.mongo_uri or LOCAL_URI
+    db = MongoClient(uri).get_default_database(default="timeless_threads")
+
+    if not args.products:
+        seed_templates(db)
+        return
+
+    spec = GeneratorSpec(
+        products=args.products,
+        reviews=args.products * 5 if args.reviews is None else args.reviews,
+        users=max(args.users, 1),
+        carts=args.carts,
+        seed=args.seed,
+        batch=args.batch
+    )
+    existing = [name for name in CUSTOMER_COLLECTIONS if db[name].find_one({}, {"_id": 1})]
+    if existing and not args.yes:
+        raise SystemExit(
+            f"❌ '{db.name}' already has {', '.join(existing)}; generator mode deletes them. "
+            "Re-run with --yes to replace them."
+        )
+
+    print(f"\n⚠ Replacing {', '.join(GENERATED_COLLECTIONS)} in '{db.name}'...")
+    totals = generate(db, spec, workers=args.workers, uri=uri)
+    print(f"\n🎉 Generated {totals} (seed {spec.seed})\n")
+
+
+if __name__ == "__main__":
+    main()
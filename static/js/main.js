@@ -161,9 +161,14 @@ document.addEventListener("DOMContentLoaded", () => {
         let interval = null;
 
         // Smooth fade transition effect
+        // The first frame is a responsive <picture>; its srcset would
+        // win over img.src, so it is dropped before the first swap.
         function swapImage(src) {
             img.classList.add("fade-out");
             setTimeout(() => {
+                const picture = img.closest("picture");
+                if (picture) picture.querySelectorAll("source").forEach(s => s.remove());
+                img.removeAttribute("srcset");
                 img.src = src;
                 img.classList.remove("fade-out");
             }, 200);
@@ -217,6 +222,99 @@ document.addEventListener("DOMContentLoaded", () => {
         });
     });
 
+    // ======================================================
+    // 7. SEARCH-AS-YOU-TYPE SUGGESTIONS
+    //
+    // Fetches completions from /search/suggest while typing
+    // in the navbar search box and shows them in a dropdown.
+    //
+    // - Requests are debounced (120ms)
+    // - Out-of-order responses are ignored
+    // - Arrow keys + Enter pick a suggestion
+    // ======================================================
+    const searchInput = document.querySelector(".search-input[data-suggest-url]");
+    const suggestBox = document.querySelector(".search-suggestions");
+
+    if (searchInput && suggestBox) {
+        let timer = null;
+        let requestId = 0;
+        let activeIndex = -1;
+
+        function hideSuggestions() {
+            suggestBox.hidden = true;
+            suggestBox.innerHTML = "";
+            activeIndex = -1;
+        }
+
+        function renderSuggestions(items) {
+            suggestBox.innerHTML = "";
+            activeIndex = -1;
+
+            items.forEach(item => {
+                const li = document.createElement("li");
+                const link = document.createElement("a");
+                const text = document.createElement("span");
+                const kind = document.createElement("span");
+
+                link.href = item.url;
+                text.textContent = item.text;
+                kind.className = "kind";
+                kind.textContent = item.kind;
+
+                link.append(text, kind);
+                li.appendChild(link);
+                suggestBox.appendChild(li);
+            });
+
+            suggestBox.hidden = items.length === 0;
+        }
+
+        async function fetchSuggestions(query) {
+            const id = ++requestId;
+            try {
+                const url = `${searchInput.dataset.suggestUrl}?q=${encodeURIComponent(query)}`;
+                const res = await fetch(url);
+                const data = await res.json();
+                if (id === requestId) renderSuggestions(data.suggestions || []);
+            } catch (err) {
+                hideSuggestions();
+            }
+        }
+
+        searchInput.addEventListener("input", () => {
+            clearTimeout(timer);
+            const query = searchInput.value.trim();
+            if (!query) {
+                requestId++;
+                hideSuggestions();
+                return;
+            }
+            timer = setTimeout(() => fetchSuggestions(query), 120);
+        });
+
+        searchInput.addEventListener("keydown", e => {
+            const links = suggestBox.querySelectorAll("a");
+            if (suggestBox.hidden || !links.length) return;
+
+            if (e.key === "ArrowDown" || e.key === "ArrowUp") {
+                e.preventDefault();
+                const step = e.key === "ArrowDown" ? 1 : -1;
+                activeIndex = (activeIndex + step + links.length) % links.length;
+                links.forEach((l, i) => l.classList.toggle("active", i === activeIndex));
+            } else if (e.key === "Enter" && activeIndex >= 0) {
+                e.preventDefault();
+                window.location.href = links[activeIndex].href;
+            } else if (e.key === "Escape") {
+                hideSuggestions();
+            }
+        });
+
+        // Close dropdown when clicking anywhere else
+        document.addEventListener("click", e => {
+            if (!e.target.closest(".search-box")) hideSuggestions();
+        });
+    }
+
 }); // END first DOMContentLoaded
 
 
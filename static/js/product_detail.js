@@ -13,8 +13,8 @@ document.addEventListener("DOMContentLoaded", () => {
   const main = document.getElementById("mainImage");
   const thumbs = [...document.querySelectorAll(".thumb")];
 
-  // Extract image sources from thumb list
-  let images = thumbs.map(t => t.src);
+  // Extract image sources from thumb list (full-size derivative if present)
+  let images = thumbs.map(t => t.dataset.full || t.src);
   let idx = 0;
 
   // Smooth switch to selected image index
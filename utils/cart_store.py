@@ -0,0 +1,276 @@
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import quote
+from flask import session
+from pymongo import IndexModel, ReturnDocument
+
+
+# -----------------------------------------------------------
+# Cart schema versions
+#   0 → legacy list in the session cookie (session["cart"])
+#   1 → server-side cart without a schema stamp
+#   2 → server-side cart stamped with {"schema": 2}   (current)
+#
+# The version is stamped into the stored cart and mirrored in
+# session["cart_v"], so hot routes can tell a current cart from
+# the session alone, without touching the cart itself.
+# -----------------------------------------------------------
+CART_SCHEMA_VERSION = 2
+
+
+# -----------------------------------------------------------
+# Cart line key
+# A line is identified by (product_id, size, color). The key is
+# also used as a MongoDB field name, so "." and "$" (which are
+# not allowed there) are percent-encoded as well.
+# -----------------------------------------------------------
+def line_key(product_id, size, color):
+    parts = (product_id, size or "", color or "")
+    return "|".join(quote(str(part), safe="") for part in parts).replace(".", "%2E")
+
+
+def _sorted_lines(lines):
+    # Oldest line first, the order the cart page has always used
+    return sorted(lines.values(), key=lambda line: line.get("added_at") or datetime.min)
+
+
+class MemoryCartBackend:
+    """
+    In-process cart backend (development / single worker).
+
+    Carts are kept in an OrderedDict bounded to `max_carts`; the least
+    recently used cart is dropped when it is full:
+        {
+            "<cart token>": {
+                "schema": 2,
+                "lines": {
+                    "<line key>": {product_id, size, color, quantity, added_at}
+                }
+            }
+        }
+    """
+
+    def __init__(self, max_carts=10000):
+        self.max_carts = max_carts
+        self._carts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cart(self, token):
+        cart = self._carts.get(token)
+        if cart is None:
+            cart = self._carts[token] = {"schema": CART_SCHEMA_VERSION, "lines": {}}
+            while len(self._carts) > self.max_carts:
+                self._carts.popitem(last=False)
+        self._carts.move_to_end(token)
+        return cart
+
+    def get_lines(self, token):
+        with self._lock:
+            cart = self._carts.get(token)
+            return [dict(line) for line in _sorted_lines(cart["lines"])] if cart else []
+
+    def stamp_schema(self, token):
+        with self._lock:
+            if token in self._carts:
+                self._carts[token]["schema"] = CART_SCHEMA_VERSION
+
+    def add_line(self, token, product_id, size, color, quantity):
+        """
+        Add `quantity` to the line, creating it if needed.
+        Returns True if the line already existed.
+        """
+        key = line_key(product_id, size, color)
+        with self._lock:
+            lines = self._cart(token)["lines"]
+            line = lines.get(key)
+            if line:
+                line["quantity"] += quantity
+                return True
+
+            lines[key] = {
+                "product_id": product_id,
+                "size": size,
+                "color": color,
+                "quantity": quantity,
+                "added_at": datetime.utcnow()
+            }
+            return False
+
+    def remove_line(self, token, product_id, size, color):
+        """
+        Remove a line. Returns True if it existed.
+        """
+        key = line_key(product_id, size, color)
+        with self._lock:
+            cart = self._carts.get(token)
+            return bool(cart) and cart["lines"].pop(key, None) is not None
+
+
+class MongoCartBackend:
+    """
+    MongoDB cart backend (shared by all gunicorn workers).
+
+    One document per cart in the `carts` collection:
+        {
+            "_id": "<cart token>",
+            "schema": 2,
+            "lines": {
+                "<line key>": {product_id, size, color, quantity, added_at}
+            },
+            "updated_at": <datetime>
+        }
+
+    Every mutation is a single atomic update on that document, so
+    concurrent requests for the same cart never overwrite each other.
+    """
+
+    COLLECTION = "carts"
+
+    # Indexes created at startup by database.indexes.ensure_indexes()
+    # Abandoned carts are removed 30 days after their last change.
+    INDEXES = [
+        IndexModel([("updated_at", 1)], name="updated_at_ttl", expireAfterSeconds=30 * 24 * 3600),
+    ]
+
+    # Representative queries, used by `python manage.py explain`
+    EXPLAIN_QUERIES = [
+        ("get_lines", {"_id": "0" * 32}),
+    ]
+
+    def __init__(self, mongo):
+        self.collection = mongo.db[self.COLLECTION]
+
+    def get_lines(self, token):
+        doc = self.collection.find_one({"_id": token}, {"lines": 1})
+        return _sorted_lines(doc.get("lines") or {}) if doc else []
+
+    def stamp_schema(self, token):
+        self.collection.update_one({"_id": token}, {"$set": {"schema": CART_SCHEMA_VERSION}})
+
+    def add_line(self, token, product_id, size, color, quantity):
+        """
+        Add `quantity` to the line, creating it (and the cart) if needed.
+        Returns True if the line already existed.
+        """
+        key = line_key(product_id, size, color)
+        now = datetime.utcnow()
+
+        previous = self.collection.find_one_and_update(
+            {"_id": token},
+            {
+                "$inc": {f"lines.{key}.quantity": quantity},
+                "$set": {
+                    f"lines.{key}.product_id": product_id,
+                    f"lines.{key}.size": size,
+                    f"lines.{key}.color": color,
+                    "schema": CART_SCHEMA_VERSION,
+                    "updated_at": now
+                },
+                # Only set on the first add of this line
+                "$min": {f"lines.{key}.added_at": now}
+            },
+            projection={f"lines.{key}.quantity": 1},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+
+        return bool(previous and key in (previous.get("lines") or {}))
+
+    def remove_line(self, token, product_id, size, color):
+        """
+        Remove a line. Returns True if it existed.
+        """
+        key = line_key(product_id, size, color)
+
+        result = self.collection.update_one(
+            {"_id": token, f"lines.{key}": {"$exists": True}},
+            {
+                "$unset": {f"lines.{key}": ""},
+                "$set": {"updated_at": datetime.utcnow()}
+            }
+        )
+        return result.modified_count == 1
+
+
+class CartStore:
+    """
+    Server-side shopping cart keyed by a cart token.
+
+    The browser session only carries the token (session["cart_id"]);
+    the cart lines live in the configured backend:
+        CART_STORE = "mongo"  → MongoCartBackend (default, multi-worker safe)
+        CART_STORE = "memory" → MemoryCartBackend (single process only)
+
+    Like PyMongo, the singleton is created at import time and bound to
+    the app later with init_app().
+    """
+
+    def __init__(self):
+        self.backend = None
+
+    def init_app(self, app, mongo):
+        if app.config.get("CART_STORE", "mongo") == "memory":
+            self.backend = MemoryCartBackend(app.config.get("CART_MEMORY_MAX_CARTS", 10000))
+        else:
+            self.backend = MongoCartBackend(mongo)
+
+    # ---------------------------------------------------------
+    # CART TOKEN
+    # A token is only created when something is added, so
+    # browsing without a cart never sets a session cookie.
+    # ---------------------------------------------------------
+    def token(self, create=False):
+        token = session.get("cart_id")
+        if token is None and create:
+            token = session["cart_id"] = uuid.uuid4().hex
+            session["cart_v"] = CART_SCHEMA_VERSION
+        return token
+
+    # ---------------------------------------------------------
+    # CART SCHEMA VERSION
+    # Read from the session only (no backend round trip).
+    # None means this session has no cart at all.
+    # ---------------------------------------------------------
+    def schema_version(self):
+        if "cart_v" in session:
+            return session["cart_v"]
+        if "cart" in session:
+            return 0
+        if "cart_id" in session:
+            return 1
+        return None
+
+    def is_current(self):
+        return self.schema_version() in (None, CART_SCHEMA_VERSION)
+
+    def mark_current(self):
+        """
+        Stamp the stored cart and the session with the current schema.
+        """
+        token = self.token()
+        if token:
+            self.backend.stamp_schema(token)
+            session["cart_v"] = CART_SCHEMA_VERSION
+
+    # ---------------------------------------------------------
+    # CART OPERATIONS (current session's cart)
+    # ---------------------------------------------------------
+    def lines(self):
+        token = self.token()
+        return self.backend.get_lines(token) if token else []
+
+    def add(self, product_id, size, color, quantity):
+        return self.backend.add_line(self.token(create=True), product_id, size, color, quantity)
+
+    def remove(self, product_id, size, color):
+        token = self.token()
+        return self.backend.remove_line(token, product_id, size, color) if token else False
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Bound to the app (and backend chosen) in AppFactory.init_extensions().
+# -----------------------------------------------------------
+cart_store = CartStore()
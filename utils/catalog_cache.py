@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# -----------------------------------------------------------
+# Sentinel used to tell "not cached" apart from a cached None
+# (e.g. a product ID that does not exist).
+# -----------------------------------------------------------
+MISSING = object()
+
+
+class LRUCache:
+    """
+    A small thread-safe LRU cache with per-entry TTLs.
+
+    Entries are stored in an OrderedDict:
+        {
+            <key>: (<expires_at unix timestamp>, <value>)
+        }
+
+    The most recently used entry is moved to the end, so when the
+    cache grows past `max_entries` the oldest entries are evicted
+    from the front.
+
+    NOTE:
+    - Values are shared between callers, treat them as read-only.
+    - This is per-process memory; every gunicorn worker has its own.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Simple counters, handy when tuning max_entries / ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Return the cached value for `key`, or MISSING if it is absent
+        or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return MISSING
+
+            expires_at, value = entry
+
+            # Expired → drop it and report a miss
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl_seconds=None):
+        """
+        Store `value` under `key`, evicting least recently used entries
+        when the cache is full.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader, ttl_seconds=None):
+        """
+        Read-through helper: return the cached value or call `loader()`,
+        cache its result and return it.
+        """
+        value = self.get(key)
+        if value is MISSING:
+            value = loader()
+            self.set(key, value, ttl_seconds)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return a snapshot of the cache counters.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class CatalogCache(LRUCache):
+    """
+    LRU cache for product catalog reads, tied to a catalog version stamp.
+
+    The version stamp lives in MongoDB and is bumped on every product
+    write. Each worker re-reads it at most once every
+    `version_check_seconds`; when it changed, every cached entry is
+    dropped. Writes made by this worker invalidate the cache straight
+    away, so they are visible on the very next request.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=300, version_check_seconds=2):
+        super().__init__(max_entries, ttl_seconds)
+        self.version_check_seconds = version_check_seconds
+
+        # Last catalog version this worker has seen (None = not loaded yet)
+        self.version = None
+        self._version_checked_at = 0.0
+
+    def configure(self, max_entries=None, ttl_seconds=None, version_check_seconds=None):
+        """
+        Apply settings from the Flask config (called by AppFactory).
+        """
+        if max_entries is not None:
+            self.max_entries = max_entries
+        if ttl_seconds is not None:
+            self.ttl_seconds = ttl_seconds
+        if version_check_seconds is not None:
+            self.version_check_seconds = version_check_seconds
+        self.clear()
+
+    def sync_version(self, fetch_version):
+        """
+        Make sure cached entries belong to the current catalog version.
+
+        :param fetch_version: callable returning the version stored in MongoDB.
+                              Only called once the check interval has passed.
+        """
+        now = time.monotonic()
+        if self.version is not None and now - self._version_checked_at < self.version_check_seconds:
+            return
+
+        version = fetch_version()
+        self._version_checked_at = now
+
+        if version != self.version:
+            self.invalidate(version)
+
+    def invalidate(self, version=None):
+        """
+        Drop every cached entry and remember the new catalog version.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.version = version
+            self._version_checked_at = time.monotonic()
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Shared by every ProductModel in this process, configured from
+# the Flask config in AppFactory.init_caches().
+# -----------------------------------------------------------
+catalog_cache = CatalogCache()
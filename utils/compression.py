@@ -0,0 +1,153 @@
+import gzip
+from itertools import chain
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+from werkzeug.wsgi import ClosingIterator
+from utils.metrics import metrics
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # brotli is optional, gzip is always available
+        brotli = None
+
+
+# -----------------------------------------------------------
+# Content types worth compressing. Images, fonts and archives
+# are already compressed and are always passed through.
+# -----------------------------------------------------------
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/rss+xml",
+    "image/svg+xml",
+)
+
+
+class CompressionMiddleware:
+    """
+    WSGI middleware that gzip- or brotli-compresses dynamic responses.
+
+    A response is compressed when:
+      - the client accepts br or gzip (br preferred when brotli is installed)
+      - its Content-Type is in COMPRESSIBLE_TYPES
+      - it is not already encoded (e.g. precompressed static files)
+      - it has a body of at least `min_size` bytes
+
+    Every compressible response gets `Vary: Accept-Encoding`, whether it
+    was compressed or not, so shared caches keep the variants apart.
+    Streamed responses (no Content-Length) are passed through untouched.
+
+    Bytes in / out are counted in utils.metrics:
+        compression_bytes_in{encoding} / compression_bytes_out{encoding}
+    so the compression ratio is bytes_out / bytes_in.
+    """
+
+    def __init__(self, app, min_size=1024, gzip_level=6, brotli_quality=5):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    # ---------------------------------------------------------
+    # ENCODING NEGOTIATION
+    # ---------------------------------------------------------
+    def _negotiate(self, environ):
+        if environ.get("REQUEST_METHOD") == "HEAD":
+            return None
+
+        accept = parse_accept_header(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is not None and accept["br"]:
+            return "br"
+        if accept["gzip"]:
+            return "gzip"
+        return None
+
+    def _compress(self, data, encoding):
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level)
+
+    @staticmethod
+    def _compressible(status, headers):
+        code = int(status.split(" ", 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        if "Content-Encoding" in headers or "Content-Range" in headers:
+            return False
+        if "no-transform" in headers.get("Cache-Control", ""):
+            return False
+        content_type = headers.get("Content-Type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _add_vary(headers):
+        vary = [v.strip() for v in headers.get("Vary", "").split(",") if v.strip()]
+        if "*" in vary or "accept-encoding" in (v.lower() for v in vary):
+            return
+        headers["Vary"] = ", ".join(vary + ["Accept-Encoding"])
+
+    # ---------------------------------------------------------
+    # WSGI ENTRY POINT
+    # ---------------------------------------------------------
+    def __call__(self, environ, start_response):
+        encoding = self._negotiate(environ)
+        captured = {}
+        written = []
+
+        def capture(status, headers, exc_info=None):
+            captured["start"] = (status, Headers(headers), exc_info)
+            return written.append
+
+        body = self.app(environ, capture)
+
+        # start_response may be deferred until the body is iterated
+        if "start" not in captured:
+            body = [self._drain(body)]
+
+        status, headers, exc_info = captured["start"]
+        if written:
+            # Lazily, and keeping the app's close() (teardown, file handles)
+            body = ClosingIterator(chain([b"".join(written)], body), getattr(body, "close", None))
+
+        if not self._compressible(status, headers):
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return body
+
+        self._add_vary(headers)
+
+        length = headers.get("Content-Length", type=int)
+        if encoding is None or length is None or length < self.min_size:
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return body
+
+        data = self._drain(body)
+        compressed = self._compress(data, encoding)
+
+        metrics.inc("compression_responses", encoding=encoding)
+        metrics.inc("compression_bytes_in", len(data), encoding=encoding)
+        metrics.inc("compression_bytes_out", len(compressed), encoding=encoding)
+
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+
+        # The encoded body is a different byte sequence, so a strong
+        # ETag of the original would be wrong for it
+        etag = headers.get("ETag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+        start_response(status, headers.to_wsgi_list(), exc_info)
+        return [compressed]
+
+    @staticmethod
+    def _drain(body):
+        try:
+            return b"".join(body)
+        finally:
+            if hasattr(body, "close"):
+                body.close()
@@ -0,0 +1,238 @@
+import contextvars
+import hashlib
+import json
+from collections import Counter
+import bson
+from flask import current_app, request
+from pymongo import monitoring
+from utils.metrics import metrics
+
+
+# Commands whose filter is stored under another field
+FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "countDocuments": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "aggregate": "pipeline",
+}
+
+# Read commands checked for identical repeats, and the fields
+# besides the filter that change what they return. Writes are never
+# compared: their bodies (whole documents) can be large and sending
+# one twice is not a wasted read.
+READ_COMMANDS = ("find", "count", "countDocuments", "distinct", "aggregate")
+RESULT_FIELDS = ("key", "projection", "sort", "skip", "limit")
+
+
+def _shape(value):
+    """
+    Replace every value in a filter with "?" and keep the structure,
+    so {"_id": ObjectId(…)} and {"_id": ObjectId(…)} have one shape.
+    """
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        shapes = [_shape(item) for item in value]
+        # Lists of plain values ($in, …) have one shape whatever their length
+        return shapes if any(isinstance(item, (dict, list)) for item in value) else "?"
+    return "?"
+
+
+def query_shape(command_name, collection, command):
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or []
+        target = [_shape(statement.get("q")) for statement in statements]
+    else:
+        target = _shape(command.get(FILTER_FIELDS.get(command_name, ""), {}))
+    return f"{command_name} {collection} {json.dumps(target, sort_keys=True)}"
+
+
+def identical_key(command_name, shape, command):
+    """
+    Key of a read command's exact query: its shape plus a digest of
+    the filter values and result options (encoded as BSON, never
+    the whole command as JSON).
+    """
+    fields = {field: command[field] for field in RESULT_FIELDS if field in command}
+    fields["filter"] = command.get(FILTER_FIELDS[command_name])
+    digest = hashlib.blake2b(bson.encode(fields), digest_size=16).hexdigest()
+    return f"{shape} {digest}"
+
+
+class RequestStats:
+    """
+    Database round trips made while handling one request.
+    """
+
+    __slots__ = ("queries", "micros", "shapes", "identical", "pending")
+
+    def __init__(self):
+        self.queries = 0
+        self.micros = 0
+        self.shapes = Counter()
+        self.identical = Counter()
+        self.pending = {}
+
+    @property
+    def ms(self):
+        return self.micros / 1000
+
+    @property
+    def repeated(self):
+        """
+        (shape, times) of the most repeated query shape.
+        """
+        return self.shapes.most_common(1)[0] if self.shapes else (None, 0)
+
+    @property
+    def duplicates(self):
+        """
+        Round trips that repeated an earlier identical command.
+        """
+        return sum(times - 1 for times in self.identical.values())
+
+
+_current = contextvars.ContextVar("db_request_stats", default=None)
+
+
+class DBTracker(monitoring.CommandListener):
+    """
+    Counts MongoDB round trips per request.
+
+    Registered with the MongoClient in database.connection.init_db()
+    and bound to the app in AppFactory.init_telemetry(). While a
+    request is handled, every command it runs is counted in a
+    request-scoped RequestStats (a context variable, so threads and
+    requests never mix), by:
+        - round trips and total database time
+        - query shape: command + collection + filter with the values
+          removed (the N+1 pattern: one find per cart line)
+        - identical read (the same query sent twice)
+
+    Every response gets:
+        Server-Timing: db;dur=12.40;desc="4 queries"
+
+    A warning is logged (and counted in db_request_warnings{reason})
+    when a request runs more than `max_queries` round trips, spends
+    more than `max_ms` in the database, or repeats one query shape
+    `repeat_threshold` times or more.
+    """
+
+    def __init__(self, max_queries=10, max_ms=100, repeat_threshold=3):
+        self.max_queries = max_queries
+        self.max_ms = max_ms
+        self.repeat_threshold = repeat_threshold
+        self.server_timing = True
+
+    def init_app(self, app):
+        self.max_queries = app.config.get("DB_TRACKER_MAX_QUERIES", self.max_queries)
+        self.max_ms = app.config.get("DB_TRACKER_MAX_MS", self.max_ms)
+        self.repeat_threshold = app.config.get("DB_TRACKER_REPEAT_THRESHOLD", self.repeat_threshold)
+        self.server_timing = app.config.get("DB_SERVER_TIMING", True)
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._stop)
+
+    # ---------------------------------------------------------
+    # COMMAND EVENTS (run in the thread that sent the command)
+    # ---------------------------------------------------------
+    def started(self, event):
+        stats = _current.get()
+        if stats is None:
+            return
+
+        command = event.command
+        name = event.command_name
+        if name == "getMore":
+            # Next batch of a cursor: a round trip, but not a new query
+            stats.pending[event.request_id] = None
+            return
+
+        target = command.get(name)
+        collection = target if isinstance(target, str) else "-"
+        shape = query_shape(name, collection, command)
+        stats.pending[event.request_id] = shape
+
+        if name in READ_COMMANDS:
+            stats.identical[identical_key(name, shape, command)] += 1
+
+    def _finished(self, event):
+        stats = _current.get()
+        if stats is None or event.request_id not in stats.pending:
+            return
+
+        shape = stats.pending.pop(event.request_id)
+        stats.queries += 1
+        stats.micros += event.duration_micros
+        if shape:
+            stats.shapes[shape] += 1
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+    # ---------------------------------------------------------
+    # REQUEST HOOKS
+    # ---------------------------------------------------------
+    @staticmethod
+    def _start():
+        request.environ["db_tracker.token"] = _current.set(RequestStats())
+
+    def _finish(self, response):
+        stats = _current.get()
+        if stats is not None and self.server_timing:
+            desc = f"{stats.queries} {'query' if stats.queries == 1 else 'queries'}"
+            response.headers.add("Server-Timing", f'db;dur={stats.ms:.2f};desc="{desc}"')
+        return response
+
+    def _stop(self, exc):
+        token = request.environ.pop("db_tracker.token", None)
+        stats = _current.get()
+        if token is None or stats is None:
+            return
+
+        _current.reset(token)
+        self._check(stats)
+
+    def _check(self, stats):
+        problems = []
+        if stats.queries > self.max_queries:
+            problems.append(("queries", f"{stats.queries} round trips"))
+        if stats.ms > self.max_ms:
+            problems.append(("time", f"{stats.ms:.1f} ms in MongoDB"))
+
+        shape, times = stats.repeated
+        if times >= self.repeat_threshold:
+            problems.append(("repeated", f"{times}× {shape}"))
+        if stats.duplicates:
+            noun = "query" if stats.duplicates == 1 else "queries"
+            problems.append(("identical", f"{stats.duplicates} identical {noun} sent again"))
+
+        if not problems:
+            return
+
+        for reason, _ in problems:
+            metrics.inc("db_request_warnings", reason=reason)
+        route = request.url_rule.rule if request.url_rule else request.path
+        details = "; ".join(detail for _, detail in problems)
+        current_app.logger.warning("DB usage on %s %s → %s", request.method, route, details)
+
+    @staticmethod
+    def current():
+        """
+        RequestStats of the request being handled, or None.
+        """
+        return _current.get()
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Registered with the client in init_db(), bound to the app in
+# AppFactory.init_telemetry().
+# -----------------------------------------------------------
+db_tracker = DBTracker()
@@ -0,0 +1,356 @@
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from utils.metrics import metrics
+
+
+class TransientEmailError(Exception):
+    """Delivery failed but may succeed later (timeout, 5xx, 429)."""
+
+
+class PermanentEmailError(Exception):
+    """Delivery can never succeed as sent (bad config, 4xx)."""
+
+
+# -----------------------------------------------------------
+# TRANSPORTS
+# A transport delivers one message or raises one of the errors
+# above. It is called from the dispatcher's worker threads.
+# -----------------------------------------------------------
+class ResendTransport:
+    """
+    Sends through the Resend HTTP API over a shared keep-alive session.
+    """
+
+    URL = "https://api.resend.com/emails"
+
+    def __init__(self, api_key, sender, timeout=(3.05, 10), pool_size=2):
+        self.api_key = api_key
+        self.sender = sender
+        self.timeout = timeout
+
+        # One session for all workers → TCP/TLS connections are reused
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+    def config_error(self):
+        """
+        Why no email can be sent with this configuration, or None.
+        """
+        if not self.api_key:
+            return "RESEND_API_KEY missing in environment"
+        if not self.sender:
+            return "EMAIL_FROM missing"
+        return None
+
+    def send(self, message):
+        error = self.config_error()
+        if error:
+            raise PermanentEmailError(error)
+
+        payload = {
+            "from": self.sender,
+            "to": message["to"],
+            "subject": message["subject"],
+            "html": message["html"]
+        }
+
+        try:
+            response = self.session.post(self.URL, json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise TransientEmailError(str(e)) from e
+
+        if response.status_code in (200, 201):
+            return
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientEmailError(f"RESEND {response.status_code}: {response.text[:200]}")
+        raise PermanentEmailError(f"RESEND {response.status_code}: {response.text[:200]}")
+
+
+class LocalTransport:
+    """
+    Stand-in transport for development, tests and benchmarks: nothing
+    leaves the machine.
+
+    Sent messages are kept in memory (the last `keep` of them) and,
+    when `outbox` is set, appended as JSON lines to that file so other
+    processes can read them too.
+    """
+
+    def __init__(self, outbox=None, keep=1000):
+        self.outbox = outbox
+        self.sent = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def config_error(self):
+        return None
+
+    def send(self, message):
+        record = dict(message, sent_at=datetime.utcnow().isoformat())
+        with self._lock:
+            self.sent.append(record)
+            if self.outbox:
+                with open(self.outbox, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+        print(f"✔ [local email] {message['subject']} → {message['to']}")
+
+    def latest(self, to):
+        """
+        Most recent message sent to `to`, or None.
+        """
+        with self._lock:
+            for record in reversed(self.sent):
+                if record["to"] == to:
+                    return record
+        return None
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing provider for a while.
+
+        closed    → calls go through; `threshold` failures in a row open it
+        open      → calls are refused for `reset_seconds`
+        half-open → one trial call; success closes it, failure re-opens it
+    """
+
+    def __init__(self, threshold=5, reset_seconds=30):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial:
+                return False
+            # Half-open: let exactly one trial call through
+            self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def release_trial(self):
+        """
+        End a trial call that said nothing about the provider's health
+        (a permanent error), so the next call can be the trial.
+        """
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+
+class EmailDispatcher:
+    """
+    Sends emails in the background so requests never wait on the provider.
+
+    send() puts the message on a bounded queue and returns at once;
+    worker threads deliver it through the configured transport:
+        EMAIL_TRANSPORT = "resend" → ResendTransport (default)
+        EMAIL_TRANSPORT = "local"  → LocalTransport (no network)
+
+    Transient failures are retried with exponential backoff and jitter.
+    A circuit breaker stops hammering a provider that keeps failing;
+    messages refused while it is open are dropped and counted.
+
+    Counters (utils.metrics): email_queued, email_sent, email_retries,
+    email_failed{reason}, email_dropped{reason}.
+
+    Like PyMongo, the singleton is created at import time and bound to
+    the app later with init_app(). Workers start on the first send(),
+    so gunicorn workers forked after app creation get their own.
+    """
+
+    def __init__(self):
+        self.transport = None
+        self.queue = None
+        self.workers = 2
+        self.max_retries = 3
+        self.backoff_seconds = 0.5
+        self.breaker = CircuitBreaker()
+
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        self.workers = config.get("EMAIL_WORKERS", 2)
+        self.max_retries = config.get("EMAIL_MAX_RETRIES", 3)
+        self.backoff_seconds = config.get("EMAIL_BACKOFF_SECONDS", 0.5)
+        self.breaker = CircuitBreaker(
+            config.get("EMAIL_BREAKER_THRESHOLD", 5),
+            config.get("EMAIL_BREAKER_RESET", 30)
+        )
+        self.queue = queue.Queue(maxsize=config.get("EMAIL_QUEUE_SIZE", 1000))
+
+        if config.get("EMAIL_TRANSPORT", "resend") == "local":
+            outbox = config.get("EMAIL_OUTBOX")
+            self.transport = LocalTransport(outbox)
+        else:
+            self.transport = ResendTransport(
+                os.getenv("RESEND_API_KEY"),
+                os.getenv("EMAIL_FROM"),
+                timeout=(config.get("EMAIL_CONNECT_TIMEOUT", 3.05), config.get("EMAIL_READ_TIMEOUT", 10)),
+                pool_size=self.workers
+            )
+
+        error = self.transport.config_error()
+        if error:
+            print(f"❌ ERROR: {error}! OTP emails cannot be sent.")
+
+        self._threads = []
+        self._pid = None
+
+    # ---------------------------------------------------------
+    # ENQUEUE
+    # ---------------------------------------------------------
+    def send(self, to, subject, html):
+        """
+        Queue an email. Returns False if it could not be queued
+        (transport not configured, queue full).
+        """
+        error = self.transport.config_error()
+        if error:
+            metrics.inc("email_failed", reason="config")
+            print(f"❌ ERROR: {error}!")
+            return False
+
+        self._ensure_workers()
+
+        try:
+            self.queue.put_nowait({"to": to, "subject": subject, "html": html})
+        except queue.Full:
+            metrics.inc("email_dropped", reason="queue_full")
+            print(f"❌ Email queue full, dropped email to {to}")
+            return False
+
+        metrics.inc("email_queued")
+        return True
+
+    def _ensure_workers(self):
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._threads = [
+                threading.Thread(target=self._run, name=f"email-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._pid = os.getpid()
+
+    # ---------------------------------------------------------
+    # WORKER LOOP
+    # ---------------------------------------------------------
+    def _run(self):
+        while True:
+            message = self.queue.get()
+            try:
+                self._deliver(message)
+            except Exception as e:
+                metrics.inc("email_failed", reason="error")
+                print(f"❌ Email worker error: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _deliver(self, message):
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                metrics.inc("email_dropped", reason="circuit_open")
+                print(f"⚠ Email provider circuit open, dropped email to {message['to']}")
+                return
+
+            try:
+                self.transport.send(message)
+            except PermanentEmailError as e:
+                # Not the provider's health: the breaker's state is left
+                # alone, but a half-open trial slot must be given back
+                self.breaker.release_trial()
+                metrics.inc("email_failed", reason="permanent")
+                print(f"❌ Email to {message['to']} failed: {e}")
+                return
+            except TransientEmailError as e:
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    metrics.inc("email_failed", reason="retries_exhausted")
+                    print(f"❌ Email to {message['to']} failed after {attempt + 1} attempts: {e}")
+                    return
+                metrics.inc("email_retries")
+                delay = self.backoff_seconds * 2 ** attempt
+                time.sleep(delay + random.uniform(0, delay))
+            else:
+                self.breaker.record_success()
+                metrics.inc("email_sent")
+                return
+
+    def gauges(self):
+        """
+        Queue depth for utils.metrics (registered by AppFactory).
+        """
+        return [("email_queue_depth", {}, self.queue.qsize() if self.queue else 0)]
+
+    # ---------------------------------------------------------
+    # SHUTDOWN
+    # Give queued emails (OTPs) a short chance to go out when the
+    # process exits; worker threads are daemons.
+    # ---------------------------------------------------------
+    def flush(self, timeout=5.0):
+        """
+        Wait until the queue is empty, at most `timeout` seconds.
+        Returns True if everything was delivered (or gave up).
+        """
+        if self.queue is None or self._pid != os.getpid():
+            return True
+
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Bound to the app (transport, queue size, retries) in
+# AppFactory.init_extensions().
+# -----------------------------------------------------------
+email_dispatcher = EmailDispatcher()
+atexit.register(email_dispatcher.flush)
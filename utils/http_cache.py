@@ -0,0 +1,60 @@
+import hashlib
+from flask import make_response, request, session
+
+
+# -----------------------------------------------------------
+# HTTP VALIDATORS (ETag / If-None-Match) FOR HTML PAGES
+#
+# Usage in a controller:
+#     etag = page_etag("p", product["_id"], product["version"])
+#     if is_fresh(etag):
+#         return not_modified(etag)      # before the expensive work
+#     …
+#     return with_etag(render_template(…), etag)
+#
+# ETags are weak: the page is the same content, not necessarily the
+# same bytes (the compression middleware re-encodes bodies).
+# -----------------------------------------------------------
+def page_etag(*parts):
+    """
+    Validator for a page built from `parts`, varied by visitor, since
+    base.html (and review forms) render the logged-in user.
+
+    Returns None when flash messages are pending: they are rendered
+    once, so that response must not be validated or reused.
+    """
+    if session.get("_flashes"):
+        return None
+
+    user = session.get("user")
+    visitor = hashlib.sha1(user.encode()).hexdigest()[:12] if user else "anon"
+    return "-".join(str(part) for part in parts + (visitor,))
+
+
+def is_fresh(etag):
+    """
+    True when the browser already holds this version of the page.
+    """
+    return etag is not None and request.if_none_match.contains_weak(etag)
+
+
+def with_etag(response, etag):
+    """
+    Attach the validator. Browsers must revalidate on every visit
+    (no-cache), which now costs a 304 instead of a full page.
+    """
+    response = make_response(response)
+    if etag is None:
+        return response
+
+    response.set_etag(etag, weak=True)
+    response.cache_control.no_cache = True
+    if session.get("user"):
+        response.cache_control.private = True
+    else:
+        response.cache_control.public = True
+    return response
+
+
+def not_modified(etag):
+    return with_etag(make_response("", 304), etag)
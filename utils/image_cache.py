@@ -0,0 +1,248 @@
+import hashlib
+import os
+import threading
+import time
+from PIL import Image, ImageOps
+from utils.image_pipeline import FORMATS, IMAGES_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process coalescing
+    fcntl = None
+
+
+class ResizeCache:
+    """
+    On-demand resized product images, stored in a bounded disk cache.
+
+    Serves images that `manage.py build-images` has not processed yet
+    (see routes/image_routes.py). Files live under `cache_dir`:
+        <cache_dir>/<key[:2]>/<key>.<ext>
+
+    The key hashes the source name, size and mtime together with the
+    width and format, so a replaced source image never serves a stale
+    variant.
+
+    Eviction is least-recently-used: a cache hit refreshes the file's
+    mtime (at most once per TOUCH_SECONDS), and when the cache grows
+    past `max_bytes` the oldest files are removed until it is back
+    under LOW_WATER of the limit.
+
+    Concurrent first requests for the same variant are coalesced: a
+    per-key thread lock covers the threads of this worker and an
+    fcntl lock file covers the other gunicorn workers, so only one of
+    them runs the resize and the rest serve its output.
+    """
+
+    # Only re-touch a hit file's mtime if it is older than this
+    TOUCH_SECONDS = 3600
+
+    # After eviction the cache is trimmed down to this share of max_bytes
+    LOW_WATER = 0.9
+
+    def __init__(self):
+        self.cache_dir = None
+        self.widths = (160, 320, 640, 1024)
+        self.max_bytes = 256 * 1024 * 1024
+
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._size = None
+
+    def init_app(self, app):
+        self.cache_dir = app.config.get("IMAGE_CACHE_DIR") or os.path.join(app.instance_path, "image_cache")
+        self.widths = tuple(sorted(app.config.get("IMAGE_RESIZE_WIDTHS", self.widths)))
+        self.max_bytes = int(app.config.get("IMAGE_CACHE_MAX_MB", 256)) * 1024 * 1024
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ---------------------------------------------------------
+    # SOURCE LOOKUP
+    # Only plain file names inside static/images/products are
+    # accepted, so the URL can never reach other files.
+    # ---------------------------------------------------------
+    def source_path(self, name):
+        if not name or os.path.basename(name) != name or name.startswith("."):
+            return None
+        path = os.path.join(IMAGES_DIR, "products", name)
+        return path if os.path.isfile(path) else None
+
+    def closest_width(self, width):
+        """
+        Smallest allowed width that is at least `width`.
+        """
+        return next((w for w in self.widths if w >= width), self.widths[-1])
+
+    # ---------------------------------------------------------
+    # GET (or build) A VARIANT
+    # ---------------------------------------------------------
+    def variant(self, source, width, fmt):
+        """
+        Return (key, path) of a variant without building it. The key
+        doubles as the strong ETag of the response.
+        """
+        stat = os.stat(source)
+        raw = f"{os.path.basename(source)}:{stat.st_size}:{stat.st_mtime_ns}:{width}:{fmt}"
+        key = hashlib.sha256(raw.encode()).hexdigest()[:32]
+        return key, os.path.join(self.cache_dir, key[:2], f"{key}.{FORMATS[fmt][0]}")
+
+    def get(self, source, width, fmt):
+        """
+        Return (key, path) of the cached variant, resizing it first
+        when it is not cached yet.
+        """
+        key, path = self.variant(source, width, fmt)
+        if self._hit(path):
+            return key, path
+
+        with self._key_lock(key):
+            try:
+                with self._file_lock(key):
+                    # Another thread / worker may have built it meanwhile
+                    if not self._hit(path):
+                        self._resize(source, path, width, fmt)
+            finally:
+                self._release_key(key)
+
+        return key, path
+
+    def _hit(self, path):
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return False
+
+        now = time.time()
+        if now - mtime > self.TOUCH_SECONDS:
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        return True
+
+    def _resize(self, source, path, width, fmt):
+        _, options = FORMATS[fmt]
+
+        with Image.open(source) as opened:
+            image = ImageOps.exif_transpose(opened).convert("RGB")
+
+        # Never upscale past the original width
+        if width < image.width:
+            height = round(image.height * width / image.width)
+            image = image.resize((width, height), Image.LANCZOS)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        image.save(tmp, fmt.upper(), **options)
+        os.replace(tmp, path)
+
+        self._grow(path)
+
+    # ---------------------------------------------------------
+    # REQUEST COALESCING
+    # ---------------------------------------------------------
+    def _key_lock(self, key):
+        with self._locks_guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _release_key(self, key):
+        with self._locks_guard:
+            entry = self._locks.get(key)
+            if entry:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._locks[key]
+
+    def _file_lock(self, key):
+        # One lock file per cache sub-directory keeps the number of
+        # lock files bounded (256) while rarely serializing two keys
+        return _FileLock(os.path.join(self.cache_dir, key[:2], ".lock"))
+
+    # ---------------------------------------------------------
+    # LRU EVICTION
+    # The total size is measured once per process and then kept
+    # up to date as files are added.
+    # ---------------------------------------------------------
+    def _files(self):
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith((".lock", ".tmp")):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def _grow(self, added_path):
+        with self._evict_lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._files())
+            else:
+                self._size += os.path.getsize(added_path)
+
+            if self._size > self.max_bytes:
+                self._evict(keep=added_path)
+
+    def _evict(self, keep=None):
+        files = sorted(self._files())
+        self._size = sum(size for _, size, _ in files)
+        target = self.max_bytes * self.LOW_WATER
+
+        for _, size, path in files:
+            if self._size <= target:
+                break
+            # Never evict the file that is about to be served
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._evict_lock:
+            for _, _, path in list(self._files()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+
+
+class _FileLock:
+    """
+    Exclusive fcntl lock on a side file, shared across processes.
+    A no-op where fcntl is unavailable.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Bound to the app (cache dir, widths, size limit) in
+# AppFactory.init_caches().
+# -----------------------------------------------------------
+resize_cache = ResizeCache()
@@ -0,0 +1,322 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app, url_for
+from markupsafe import Markup, escape
+from PIL import Image, ImageOps
+
+
+# -----------------------------------------------------------
+# Paths (relative to the project root)
+#   static/images/<SOURCE_DIRS>/… → originals, served as fallback
+#   static/images/derived/…       → generated derivatives (not in git)
+# -----------------------------------------------------------
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+IMAGES_DIR = os.path.join(STATIC_DIR, "images")
+DERIVED_DIR = os.path.join(IMAGES_DIR, "derived")
+MANIFEST_PATH = os.path.join(DERIVED_DIR, "manifest.json")
+
+SOURCE_DIRS = ("products", "categories")
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+# Target widths in px (never upscaled past the original width)
+WIDTHS = (320, 640, 1024)
+
+# Output format → (file extension, Pillow save options)
+# Listed best first; that is also the order of <source> tags.
+FORMATS = {
+    "avif": ("avif", {"quality": 55}),
+    "webp": ("webp", {"quality": 78, "method": 4}),
+    "jpeg": ("jpg", {"quality": 80, "optimize": True, "progressive": True}),
+}
+
+# Bump when resize / encode settings change, so every derivative
+# gets a new content address instead of overwriting cached files.
+PIPELINE_VERSION = 1
+
+
+def supported_formats():
+    """
+    Output formats this Pillow build can write. AVIF needs Pillow >= 11.2
+    (or the pillow-avif-plugin), so it is skipped when unavailable.
+    """
+    Image.init()
+    return [fmt for fmt in FORMATS if fmt.upper() in Image.SAVE]
+
+
+def find_sources():
+    """
+    Return every source image as a path relative to static/images,
+    e.g. "products/anarkali.jpg".
+    """
+    sources = []
+    for folder in SOURCE_DIRS:
+        root = os.path.join(IMAGES_DIR, folder)
+        if not os.path.isdir(root):
+            continue
+        for name in sorted(os.listdir(root)):
+            if name.lower().endswith(SOURCE_EXTENSIONS):
+                sources.append(f"{folder}/{name}")
+    return sources
+
+
+def _target_widths(original_width):
+    widths = [w for w in WIDTHS if w < original_width]
+    widths.append(min(original_width, WIDTHS[-1]))
+    return sorted(set(widths))
+
+
+# -----------------------------------------------------------
+# WORKER (runs in a pool process, so it must stay picklable)
+# -----------------------------------------------------------
+def build_derivatives(source, formats, force=False):
+    """
+    Write every width × format derivative of one source image.
+
+    Output files are named after a hash of the source bytes and the
+    pipeline settings, so an unchanged image is never re-encoded and a
+    changed one never reuses a stale URL.
+
+    Returns (source, manifest entry, number of files written).
+    """
+    path = os.path.join(IMAGES_DIR, source)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    digest = hashlib.sha256(f"{PIPELINE_VERSION}:".encode() + data).hexdigest()[:20]
+    folder = os.path.join(DERIVED_DIR, digest[:2])
+
+    with Image.open(path) as opened:
+        # Respect camera orientation, then drop EXIF/ICC metadata
+        image = ImageOps.exif_transpose(opened).convert("RGB")
+
+    entry = {"hash": digest, "width": image.width, "height": image.height, "variants": {}}
+    written = 0
+
+    for width in _target_widths(image.width):
+        resized = None
+        for fmt in formats:
+            ext, options = FORMATS[fmt]
+            relative = f"{digest[:2]}/{digest}-{width}.{ext}"
+            entry["variants"].setdefault(fmt, {})[str(width)] = relative
+
+            target = os.path.join(DERIVED_DIR, relative)
+            if os.path.exists(target) and not force:
+                continue
+
+            if resized is None:
+                height = round(image.height * width / image.width)
+                resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+
+            os.makedirs(folder, exist_ok=True)
+            tmp = f"{target}.{os.getpid()}.tmp"
+            resized.save(tmp, fmt.upper(), **options)
+            os.replace(tmp, target)
+            written += 1
+
+    return source, entry, written
+
+
+# -----------------------------------------------------------
+# BUILD (python manage.py build-images)
+# -----------------------------------------------------------
+def build_all(jobs=None, force=False):
+    """
+    Build derivatives for every source image on a process pool and
+    write static/images/derived/manifest.json.
+
+    Returns {"images": n, "written": n, "formats": [...]}.
+    """
+    formats = supported_formats()
+    sources = find_sources()
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+
+    images = {}
+    written = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(build_derivatives, source, formats, force) for source in sources]
+        for future in futures:
+            source, entry, count = future.result()
+            images[source] = entry
+            written += count
+
+    manifest = {"version": PIPELINE_VERSION, "formats": formats, "images": images}
+    tmp = f"{MANIFEST_PATH}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, MANIFEST_PATH)
+
+    return {"images": len(images), "written": written, "formats": formats}
+
+
+class ImageManifest:
+    """
+    Read side of the pipeline: maps a source image to its derivatives.
+
+    The manifest is loaded lazily and re-read when the file changes
+    (checked at most every `check_seconds`), so running build-images
+    on a live server needs no restart. Without a manifest every helper
+    falls back to the original image.
+    """
+
+    def __init__(self, path=MANIFEST_PATH, check_seconds=5):
+        self.path = path
+        self.check_seconds = check_seconds
+
+        self._lock = threading.Lock()
+        self._images = {}
+        self._formats = []
+        self._mtime = None
+        self._checked_at = None
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+            return
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                self._images, self._formats, self._mtime = {}, [], None
+                return
+
+            if mtime == self._mtime:
+                return
+
+            try:
+                with open(self.path) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ WARNING: Image manifest unreadable: {e}")
+                return
+
+            self._images = manifest.get("images", {})
+            self._formats = manifest.get("formats", [])
+            self._mtime = mtime
+
+    def get(self, source):
+        """
+        Return (formats, entry) for a source path, entry is None when
+        the image has no derivatives.
+        """
+        self._refresh()
+        return self._formats, self._images.get(source)
+
+
+# -----------------------------------------------------------
+# JINJA HELPERS (registered in AppFactory.init_jinja)
+# -----------------------------------------------------------
+image_manifest = ImageManifest()
+
+# Default `sizes` for the 1 / 2 / 4 column product grids
+GRID_SIZES = "(min-width: 992px) 25vw, (min-width: 576px) 50vw, 100vw"
+
+
+def _static_image(relative):
+    return url_for("static", filename=f"images/{relative}")
+
+
+def _resize_widths(source):
+    """
+    Widths served by /img/<width>/<name> for a product image that has
+    no derivatives yet, or () for other images.
+    """
+    if not source.startswith("products/") or "image" not in current_app.blueprints:
+        return ()
+    return tuple(sorted(current_app.config.get("IMAGE_RESIZE_WIDTHS") or ()))
+
+
+def source_version(path):
+    """
+    Short hash of a source image's size and mtime; it changes when the
+    file is replaced under the same name.
+    """
+    stat = os.stat(path)
+    return hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+
+
+def _resized_image(source, width):
+    # ?v= makes the URL change with the source file, so the response
+    # can be cached as immutable (see ImageController)
+    try:
+        version = source_version(os.path.join(IMAGES_DIR, source))
+    except OSError:
+        version = None
+    return url_for("image.resize", width=width, name=source.split("/", 1)[1], v=version)
+
+
+def _srcset(variants):
+    return ", ".join(
+        f"{_static_image('derived/' + path)} {width}w"
+        for width, path in sorted(variants.items(), key=lambda item: int(item[0]))
+    )
+
+
+def image_url(source, width=640, fmt="webp"):
+    """
+    URL of the derivative closest to `width` (at least that wide when
+    available). Product images without derivatives are resized on
+    demand; anything else falls back to the original image.
+    """
+    formats, entry = image_manifest.get(source)
+    variants = entry and entry["variants"].get(fmt)
+    if not variants:
+        widths = _resize_widths(source)
+        if widths:
+            return _resized_image(source, next((w for w in widths if w >= width), widths[-1]))
+        return _static_image(source)
+
+    widths = sorted(int(w) for w in variants)
+    chosen = next((w for w in widths if w >= width), widths[-1])
+    return _static_image("derived/" + variants[str(chosen)])
+
+
+def responsive_image(source, sizes=GRID_SIZES, alt="", **attrs):
+    """
+    Render a <picture> for `source` ("products/anarkali.jpg"):
+    one <source> per modern format plus a JPEG <img> fallback, all with
+    width-based srcset + sizes. Extra keyword arguments become <img>
+    attributes (use class_ for "class").
+    """
+    img_attrs = {"alt": alt}
+    img_attrs.update({key.rstrip("_").replace("_", "-"): value for key, value in attrs.items()})
+
+    formats, entry = image_manifest.get(source)
+    if not entry:
+        # Not built yet: srcset over the on-demand resize endpoint
+        # (which picks WebP or JPEG from the Accept header)
+        widths = _resize_widths(source)
+        img_attrs["src"] = image_url(source, 640)
+        if widths:
+            img_attrs["srcset"] = ", ".join(f"{_resized_image(source, w)} {w}w" for w in widths)
+            img_attrs["sizes"] = sizes
+        return Markup(f"<img{_attributes(img_attrs)}>")
+
+    variants = entry["variants"]
+    sources = "".join(
+        f'<source type="image/{fmt}" srcset="{escape(_srcset(variants[fmt]))}" sizes="{escape(sizes)}">'
+        for fmt in formats
+        if fmt != "jpeg" and fmt in variants
+    )
+
+    if "jpeg" in variants:
+        img_attrs["src"] = image_url(source, 640, "jpeg")
+        img_attrs["srcset"] = _srcset(variants["jpeg"])
+        img_attrs["sizes"] = sizes
+    else:
+        img_attrs["src"] = _static_image(source)
+
+    return Markup(f"<picture>{sources}<img{_attributes(img_attrs)}></picture>")
+
+
+def _attributes(attrs):
+    return "".join(
+        f' {escape(key)}' if value is True else f' {escape(key)}="{escape(value)}"'
+        for key, value in attrs.items()
+        if value is not None and value is not False
+    )
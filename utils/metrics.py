@@ -0,0 +1,343 @@
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+
+# -----------------------------------------------------------
+# Histogram buckets (upper bounds, in seconds)
+# -----------------------------------------------------------
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Counters and histograms of workers that have exited, in METRICS_DIR
+RETIRED_FILE = "retired.json"
+
+
+class Metrics:
+    """
+    Minimal in-process counters, histograms and gauges for operational
+    telemetry.
+
+    Counters are keyed by name plus optional labels:
+        metrics.inc("cart_schema_upgrades", from_version="0")
+
+    Histograms count observations into fixed buckets:
+        metrics.observe("http_request_duration_seconds", 0.042,
+                        buckets=REQUEST_BUCKETS, route="/", method="GET")
+
+    Gauges are read when a snapshot is taken, from callbacks that
+    return (name, labels, value) tuples:
+        metrics.gauges(lambda: [("email_queue_depth", {}, queue.qsize())])
+
+    snapshot() returns the counters:
+        {
+            ("cart_schema_upgrades", (("from_version", "0"),)): 3
+        }
+
+    NOTE:
+    - Values are per worker process and reset on restart.
+    - With init_app(), every worker also writes its values to
+      METRICS_DIR/<pid>.json, so /metrics can add up all workers,
+      including the ones that have exited (see collect() and
+      render_prometheus()).
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._buckets = {}
+        self._gauge_callbacks = []
+        self._lock = threading.Lock()
+
+        self.directory = None
+        self.flush_seconds = 5
+        self._pid = None
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    # ---------------------------------------------------------
+    # RECORDING
+    # ---------------------------------------------------------
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=REQUEST_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                buckets = self._buckets.setdefault(name, tuple(buckets))
+                # One count per bucket plus +Inf, then sum and count
+                histogram = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            histogram[0][bisect_left(self._buckets[name], value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def gauges(self, callback):
+        """
+        Register a callback returning [(name, labels dict, value), …].
+        """
+        self._gauge_callbacks.append(callback)
+
+    def value(self, name, **labels):
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counters)
+
+    # ---------------------------------------------------------
+    # PER-WORKER SNAPSHOT FILES
+    # ---------------------------------------------------------
+    def init_app(self, app):
+        self.directory = app.config.get("METRICS_DIR") or os.path.join(app.instance_path, "metrics")
+        self.flush_seconds = app.config.get("METRICS_FLUSH_SECONDS", 5)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def export(self):
+        """
+        Plain-data copy of everything recorded by this process.
+        """
+        gauges = []
+        for callback in self._gauge_callbacks:
+            try:
+                gauges.extend([name, sorted(labels.items()), value] for name, labels, value in callback())
+            except Exception as e:
+                print(f"⚠ WARNING: Metrics gauge failed: {e}")
+
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                "histograms": [
+                    [name, list(labels), list(self._buckets[name]), list(counts), total, count]
+                    for (name, labels), (counts, total, count) in self._histograms.items()
+                ],
+                "gauges": gauges
+            }
+
+    def write(self):
+        if not self.directory:
+            return
+        _write_json(os.path.join(self.directory, f"{os.getpid()}.json"), self.export())
+
+    def ensure_writer(self):
+        """
+        Start this process's writer thread (once per pid, so gunicorn
+        workers forked after app creation each get their own).
+        """
+        if not self.directory or self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._write_loop, name="metrics-writer", daemon=True).start()
+
+    def _write_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.write()
+            except OSError as e:
+                print(f"⚠ WARNING: Metrics snapshot not written: {e}")
+
+    def collect(self):
+        """
+        Add up the snapshot files of every worker.
+
+        The files of workers that are gone are folded into RETIRED_FILE
+        (see _retire()), so a worker restart never makes a counter
+        go down: Prometheus would read that as a counter reset.
+        """
+        if not self.directory:
+            return merge_snapshots([self.export()])
+
+        self.write()
+        snapshots, dead = [], []
+
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            if os.path.basename(path) == RETIRED_FILE:
+                continue
+            snapshot = _read_json(path)
+            if snapshot is None:
+                continue
+            if _alive(snapshot.get("pid")):
+                snapshots.append(snapshot)
+            else:
+                dead.append(path)
+
+        if dead:
+            try:
+                self._retire(dead)
+            except OSError as e:
+                print(f"⚠ WARNING: Metrics of stopped workers not retired: {e}")
+
+        retired = _read_json(os.path.join(self.directory, RETIRED_FILE))
+        if retired is not None:
+            snapshots.append(retired)
+        return merge_snapshots(snapshots)
+
+    def _retire(self, paths):
+        """
+        Add the counters and histograms of exited workers to
+        RETIRED_FILE and remove their files. Their gauges describe
+        live state and are dropped.
+
+        Every worker can run collect(), so this holds a lock on the
+        directory and re-reads the files: each one is folded once.
+        """
+        retired_path = os.path.join(self.directory, RETIRED_FILE)
+
+        with open(os.path.join(self.directory, "retired.lock"), "a") as lock:
+            fcntl.lockf(lock, fcntl.LOCK_EX)
+            try:
+                snapshots = [_read_json(retired_path) or {"counters": [], "histograms": [], "gauges": []}]
+                folded = []
+                for path in paths:
+                    snapshot = _read_json(path)
+                    if snapshot is None or _alive(snapshot.get("pid")):
+                        continue
+                    snapshot["gauges"] = []
+                    snapshots.append(snapshot)
+                    folded.append(path)
+
+                if not folded:
+                    return
+
+                merged = merge_snapshots(snapshots)
+                _write_json(retired_path, {
+                    "counters": [[name, list(labels), value] for (name, labels), value in merged["counters"].items()],
+                    "histograms": [
+                        [name, list(labels), buckets, counts, total, count]
+                        for (name, labels), (buckets, counts, total, count) in merged["histograms"].items()
+                    ],
+                    "gauges": []
+                })
+                for path in folded:
+                    os.remove(path)
+            finally:
+                fcntl.lockf(lock, fcntl.LOCK_UN)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except (OSError, TypeError):
+        return False
+    return True
+
+
+def merge_snapshots(snapshots):
+    """
+    Sum counters, histograms and gauges across worker snapshots.
+    """
+    counters, histograms, gauges = {}, {}, {}
+
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+
+        for name, labels, buckets, counts, total, count in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [buckets, [0] * len(counts), 0.0, 0])
+            if merged[0] != buckets:
+                continue  # bucket layout changed between deploys
+            merged[1] = [a + b for a, b in zip(merged[1], counts)]
+            merged[2] += total
+            merged[3] += count
+
+        for name, labels, value in snapshot["gauges"]:
+            key = (name, tuple(map(tuple, labels)))
+            gauges[key] = gauges.get(key, 0) + value
+
+    return {"counters": counters, "histograms": histograms, "gauges": gauges}
+
+
+# -----------------------------------------------------------
+# PROMETHEUS TEXT FORMAT
+# -----------------------------------------------------------
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(merged, prefix="timeless_"):
+    """
+    Render merge_snapshots() output in the Prometheus text format.
+    Counters get the conventional `_total` suffix.
+    """
+    lines = []
+
+    def typed(kind, data, render):
+        seen = set()
+        for (name, labels) in sorted(data):
+            if name not in seen:
+                seen.add(name)
+                suffix = "_total" if kind == "counter" else ""
+                lines.append(f"# TYPE {prefix}{name}{suffix} {kind}")
+            render(name, labels, data[(name, labels)])
+
+    def counter(name, labels, value):
+        lines.append(f"{prefix}{name}_total{_labels(labels)} {_number(value)}")
+
+    def gauge(name, labels, value):
+        lines.append(f"{prefix}{name}{_labels(labels)} {_number(value)}")
+
+    def histogram(name, labels, data):
+        buckets, counts, total, count = data
+        cumulative = 0
+        for bound, bucket_count in zip(list(buckets) + ["+Inf"], counts):
+            cumulative += bucket_count
+            le = bound if bound == "+Inf" else _number(float(bound))
+            lines.append(f"{prefix}{name}_bucket{_labels(labels, [('le', le)])} {cumulative}")
+        lines.append(f"{prefix}{name}_sum{_labels(labels)} {_number(float(total))}")
+        lines.append(f"{prefix}{name}_count{_labels(labels)} {count}")
+
+    typed("counter", merged["counters"], counter)
+    typed("gauge", merged["gauges"], gauge)
+    typed("histogram", merged["histograms"], histogram)
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Use metrics.inc() / metrics.observe() anywhere in the app.
+# -----------------------------------------------------------
+metrics = Metrics()
@@ -1,86 +1,150 @@
+import math
 import random
+import threading
 import time
+from collections import OrderedDict
 
 
-class OTPService:
+class MemoryOTPBackend:
     """
-    A lightweight, in-memory OTP (One-Time Password) manager.
+    In-process OTP store (development / single worker only).
 
-    The OTPs are stored in a simple dictionary structure:
+    OTPs are kept in an OrderedDict bounded to `max_entries`:
         {
-            "<mobile_number>": {
-                "otp": "<6-digit string>",
-                "expiry": <unix timestamp when OTP expires>
-            }
+            "<mobile or email>": ("<6-digit string>", <unix expiry timestamp>)
         }
+    When it is full, the oldest OTP is dropped first.
+
+    Expired entries are swept with a timing wheel: every key is also
+    filed in the slot of the wheel its expiry falls into, and each call
+    first clears the slots whose time has passed. A sweep only looks
+    at the keys due in those slots, never at the whole store.
+    """
+
+    def __init__(self, max_entries=10000, slot_seconds=10, slots=64):
+        self.max_entries = max_entries
+        self.slot_seconds = slot_seconds
+
+        self._store = OrderedDict()
+        self._wheel = [set() for _ in range(slots)]
+        self._tick = math.floor(time.time() / slot_seconds)
+        self._lock = threading.Lock()
+
+    def _slot(self, expiry):
+        return self._wheel[math.floor(expiry / self.slot_seconds) % len(self._wheel)]
+
+    def _sweep(self, now):
+        """
+        Remove expired entries in every slot passed since the last sweep.
+        Keys with a TTL longer than one turn of the wheel stay filed
+        until their own turn comes round.
+        """
+        tick = math.floor(now / self.slot_seconds)
+        start = max(self._tick, tick - len(self._wheel) + 1)
+
+        for t in range(start, tick + 1):
+            slot = self._wheel[t % len(self._wheel)]
+            for key in list(slot):
+                record = self._store.get(key)
+                if record is None:
+                    slot.discard(key)
+                elif record[1] <= now:
+                    del self._store[key]
+                    slot.discard(key)
+        self._tick = tick
+
+    def store(self, key, otp, ttl_seconds):
+        now = time.time()
+        expiry = now + ttl_seconds
+
+        with self._lock:
+            self._sweep(now)
+
+            # Replacing an OTP: unfile the old expiry first
+            previous = self._store.pop(key, None)
+            if previous:
+                self._slot(previous[1]).discard(key)
+
+            self._store[key] = (otp, expiry)
+            self._slot(expiry).add(key)
+
+            while len(self._store) > self.max_entries:
+                stale, (_, stale_expiry) = self._store.popitem(last=False)
+                self._slot(stale_expiry).discard(stale)
+
+    def consume(self, key, otp):
+        now = time.time()
+
+        with self._lock:
+            self._sweep(now)
+
+            record = self._store.get(key)
+            if not record or record[1] <= now or record[0] != otp:
+                return False
+
+            # Single use
+            del self._store[key]
+            self._slot(record[1]).discard(key)
+            return True
+
+    def __len__(self):
+        return len(self._store)
+
+
+class OTPService:
+    """
+    One-Time Password manager with a pluggable store.
 
-    NOTE:
-    - This is NOT persistent storage; data resets when the server restarts.
-    - Ideal for demos, prototypes, or low-security local flows.
+    Backends (chosen by OTP_STORE in AppFactory.init_extensions()):
+        "mongo"  → models.otp_model.OTP: shared by every gunicorn worker,
+                   expired OTPs removed by a TTL index (default)
+        "memory" → MemoryOTPBackend: single process only
+
+    A backend provides:
+        store(key, otp, ttl_seconds)  → save / replace the key's OTP
+        consume(key, otp) → bool      → atomically check + invalidate
+
+    Like PyMongo, the singleton is created at import time and bound to
+    the app later with init_app(). Until then it uses a memory backend.
     """
 
     def __init__(self):
-        # Internal storage for OTP data
-        # Keys: mobile numbers (strings)
-        # Values: {"otp": str, "expiry": float}
-        self._store = {}
+        self.backend = MemoryOTPBackend()
+
+    def init_app(self, app, mongo):
+        if app.config.get("OTP_STORE", "mongo") == "memory":
+            self.backend = MemoryOTPBackend(app.config.get("OTP_MEMORY_MAX_ENTRIES", 10000))
+        else:
+            from models.otp_model import OTP
+            self.backend = OTP(mongo)
 
     def generate_otp(self, mobile: str, ttl_seconds: int = 300) -> str:
         """
         Generate a 6-digit OTP and store it with an expiry timestamp.
+        A new OTP replaces any earlier one for the same key.
 
-        :param mobile: Mobile number as a string
+        :param mobile: Mobile number (or email) as a string
         :param ttl_seconds: Time-to-live for OTP (default: 300s = 5 minutes)
         :return: The generated OTP as a string
         """
-
-        # Create a random 6-digit OTP.
-        otp = f"{random.randint(100000, 999999)}"
-
-        # Compute expiry time as current timestamp + TTL.
-        expiry = time.time() + ttl_seconds
-
-        # Save OTP record in memory.
-        self._store[mobile] = {
-            "otp": otp,
-            "expiry": expiry
-        }
-
+        otp = f"{random.SystemRandom().randint(100000, 999999)}"
+        self.backend.store(mobile, otp, ttl_seconds)
         return otp
 
     def verify_otp(self, mobile: str, otp: str) -> bool:
         """
         Validate the OTP submitted by the user.
 
-        Conditions for success:
-        - OTP exists for the given mobile number
-        - OTP is not expired
-        - OTP matches the stored one
+        Succeeds only if an unexpired OTP exists for the key and
+        matches; it is then used up (single use). One backend call.
 
-        :param mobile: Mobile number as string
+        :param mobile: Mobile number (or email) as string
         :param otp: OTP entered by the user
         :return: True if OTP is valid and used, False otherwise
         """
-
-        # Fetch OTP record for this mobile number.
-        record = self._store.get(mobile)
-
-        # If no OTP exists → invalid attempt.
-        if not record:
-            return False
-
-        # If current time has passed expiry → delete & reject.
-        if time.time() > record["expiry"]:
-            del self._store[mobile]  # cleanup expired code
+        if not mobile or not otp:
             return False
-
-        # If OTP matches → delete (single-use) and accept.
-        if record["otp"] == str(otp):
-            del self._store[mobile]
-            return True
-
-        # OTP did not match → invalid.
-        return False
+        return self.backend.consume(mobile, str(otp).strip())
 
 
 # -----------------------------------------------------------
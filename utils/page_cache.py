@@ -0,0 +1,113 @@
+from functools import wraps
+from flask import current_app, make_response, request, session
+from utils.catalog_cache import LRUCache, MISSING
+
+
+class PageCache(LRUCache):
+    """
+    Whole-page cache for anonymous visitors.
+
+    Cached entries are keyed by:
+        (endpoint, path, declared query args, catalog version, variant)
+    and store the rendered body, so a hit skips the view entirely:
+    no MongoDB query and no Jinja render.
+
+    Only the query args a view declares (`query=`) are part of the
+    key, so junk parameters (?x=1, ?x=2, …) share one entry instead of
+    evicting real pages.
+
+    The page cache is bypassed when the response depends on the
+    visitor: a logged-in user (session["user"]) or pending flash
+    messages, both of which base.html renders. Responses that flash,
+    change the session or are not 200 are never stored.
+
+    Pages built from the catalog pass `version=` (a callable returning
+    the current catalog version); after a product write the version
+    changes and the old pages simply stop being looked up.
+    """
+
+    # The only variant that is cached today. Kept in the key so other
+    # anonymous variants (e.g. a currency) can be added later.
+    ANONYMOUS = "anon"
+
+    # Response headers stored along with the body
+    KEEP_HEADERS = ("ETag", "Cache-Control")
+
+    def configure(self, max_entries=None, ttl_seconds=None):
+        """
+        Apply settings from the Flask config (called by AppFactory).
+        """
+        if max_entries is not None:
+            self.max_entries = max_entries
+        if ttl_seconds is not None:
+            self.ttl_seconds = ttl_seconds
+        self.clear()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def variant(self):
+        """
+        Cache variant for the current request, or None to bypass.
+        """
+        if request.method != "GET":
+            return None
+        if session.get("user") or session.get("_flashes"):
+            return None
+        return self.ANONYMOUS
+
+    def cached(self, version=None, query=()):
+        """
+        Route decorator:
+
+            @main_bp.route("/")
+            @page_cache.cached(version=controller.products.catalog_version, query=("after",))
+            def home(): ...
+
+        `query` must list every query arg the view reads.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                variant = self.variant() if self.enabled else None
+                if variant is None:
+                    return view(*args, **kwargs)
+
+                key = (
+                    request.endpoint,
+                    request.path,
+                    tuple(tuple(request.args.getlist(name)) for name in query),
+                    version() if version else None,
+                    variant
+                )
+
+                entry = self.get(key)
+                if entry is not MISSING:
+                    body, content_type, headers = entry
+                    response = current_app.response_class(body, content_type=content_type, headers=headers)
+                    response.headers["X-Page-Cache"] = "HIT"
+                    # Cached pages keep their ETag, so they can still answer 304
+                    return response.make_conditional(request)
+
+                response = make_response(view(*args, **kwargs))
+                if (
+                    response.status_code == 200
+                    and not response.direct_passthrough
+                    and not session.modified
+                    and not session.get("_flashes")
+                ):
+                    headers = [(h, response.headers[h]) for h in self.KEEP_HEADERS if h in response.headers]
+                    self.set(key, (response.get_data(), response.content_type, headers))
+                    response.headers["X-Page-Cache"] = "MISS"
+                return response
+
+            return wrapper
+        return decorator
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Configured from the Flask config in AppFactory.init_caches().
+# -----------------------------------------------------------
+page_cache = PageCache(max_entries=256, ttl_seconds=60)
@@ -0,0 +1,52 @@
+import base64
+import binascii
+import json
+from collections import namedtuple
+
+
+# -----------------------------------------------------------
+# A single page of results.
+#   items      → documents on this page
+#   next_token → opaque token for the following page (None on the last page)
+# -----------------------------------------------------------
+Page = namedtuple("Page", ["items", "next_token"])
+
+
+def encode_token(values):
+    """
+    Turn the keyset values of the last item on a page into an opaque,
+    URL-safe token, e.g. ["6561f0…"] → "WyI2NTYxZjDigKYiXQ".
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token):
+    """
+    Reverse encode_token(). Returns None for a missing or tampered token,
+    which callers treat as "start from the first page".
+    """
+    if not token:
+        return None
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, binascii.Error):
+        return None
+
+    return values if isinstance(values, list) else None
+
+
+def make_page(docs, limit, key):
+    """
+    Build a Page from a query that fetched `limit + 1` documents.
+
+    The extra document only tells us whether another page exists;
+    the token is built from the last document actually returned.
+
+    :param key: callable returning the keyset values of a document
+    """
+    items = docs[:limit]
+    next_token = encode_token(key(items[-1])) if len(docs) > limit else None
+    return Page(items, next_token)
@@ -0,0 +1,359 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, request, session
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import PyMongoError
+from werkzeug.exceptions import TooManyRequests
+from utils.metrics import metrics
+
+
+# -----------------------------------------------------------
+# Limit specs
+#   "20/minute"  → bucket of 20 tokens, refilled at 20 per minute
+#   "5/10minute" → bucket of 5 tokens, refilled at 5 per 10 minutes
+# A burst of `count` requests is allowed, then requests are let
+# through at the refill rate.
+# -----------------------------------------------------------
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+LIMIT_PATTERN = re.compile(r"^(\d+)/(\d*)(second|minute|hour|day)s?$")
+
+
+def parse_limit(spec):
+    """
+    Parse "count/[n]period" into (capacity, refill rate per second).
+    """
+    match = LIMIT_PATTERN.match(spec.replace(" ", "").lower())
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Invalid rate limit {spec!r}")
+
+    capacity = float(match.group(1))
+    seconds = int(match.group(2) or 1) * PERIODS[match.group(3)]
+    return capacity, capacity / seconds
+
+
+def _bucket_id(name, value):
+    # Emails and IPs are not stored as-is
+    return hashlib.blake2b(f"{name}:{value}".encode(), digest_size=16).hexdigest()
+
+
+# -----------------------------------------------------------
+# BACKENDS
+# take(bucket, capacity, rate, cost) → (allowed, retry_after_seconds)
+# is one atomic step: refill by the elapsed time, then spend `cost`
+# tokens if there are enough.
+# -----------------------------------------------------------
+class MongoRateLimitBackend:
+    """
+    MongoDB token buckets (shared by every worker on every machine).
+
+    One document per bucket in the `rate_limits` collection:
+        {
+            "_id": "<hashed limit + key>",
+            "tokens": <float>,
+            "ts": <unix time of the last take>,
+            "expires_at": <datetime the bucket is full again>
+        }
+
+    take() is a single find_one_and_update with an update pipeline,
+    so the refill and the spend happen atomically on the server.
+    Buckets are deleted by the TTL index once they are full again.
+    """
+
+    COLLECTION = "rate_limits"
+
+    # Indexes created at startup by database.indexes.ensure_indexes()
+    INDEXES = [
+        IndexModel([("expires_at", 1)], name="expires_at_ttl", expireAfterSeconds=0),
+    ]
+
+    # Representative queries, used by `python manage.py explain`
+    EXPLAIN_QUERIES = [
+        ("take", {"_id": "0" * 32}),
+    ]
+
+    def __init__(self, mongo):
+        self.collection = mongo.db[self.COLLECTION]
+
+    def take(self, bucket, capacity, rate, cost=1):
+        now = time.time()
+        elapsed = {"$max": [0, {"$subtract": [now, {"$ifNull": ["$ts", now]}]}]}
+
+        doc = self.collection.find_one_and_update(
+            {"_id": bucket},
+            [
+                {"$set": {
+                    "tokens": {"$min": [capacity, {"$add": [
+                        {"$ifNull": ["$tokens", capacity]},
+                        {"$multiply": [elapsed, rate]}
+                    ]}]},
+                    "ts": now
+                }},
+                {"$set": {"allowed": {"$gte": ["$tokens", cost]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", cost]}, "$tokens"]},
+                    "expires_at": datetime.utcnow() + timedelta(seconds=capacity / rate)
+                }}
+            ],
+            projection={"tokens": 1, "allowed": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        if doc["allowed"]:
+            return True, 0.0
+        return False, (cost - doc["tokens"]) / rate
+
+
+class SharedMemoryRateLimitBackend:
+    """
+    Token buckets in a memory-mapped file (shared by the workers of
+    one machine, no network round trip).
+
+    The file is a fixed table of `slots` records:
+        struct "<Qddd" → key hash, tokens, last take, time the bucket is full
+
+    A bucket lives in the slot its hash points to or one of the next
+    PROBES slots. When all of those are taken by other live buckets,
+    the one closest to full is reused (it would be full again soon).
+
+    Every take() holds a POSIX lock on the file (between processes)
+    and a thread lock (between threads of one process). The file is
+    opened lazily per process, and the thread lock is replaced after
+    a fork, so gunicorn workers forked after app creation get their own.
+    """
+
+    RECORD = struct.Struct("<Qddd")
+    PROBES = 8
+
+    def __init__(self, path, slots=8192):
+        self.path = path
+        self.slots = slots
+        self.size = self.RECORD.size * slots
+
+        self._pid = None
+        self._fd = None
+        self._map = None
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._pid == os.getpid():
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size != self.size:
+            # New file, or the table size changed: start empty
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size != self.size:
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, self.size)
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+
+        self._fd = fd
+        self._map = mmap.mmap(fd, self.size)
+        self._pid = os.getpid()
+
+    def _find_slot(self, key, now):
+        home = key % self.slots
+        probes = []
+        for probe in range(self.PROBES):
+            slot = (home + probe) % self.slots
+            record = self.RECORD.unpack_from(self._map, slot * self.RECORD.size)
+            # The bucket may sit behind a slot that has emptied since,
+            # so every probe slot is checked before one is given away
+            if record[0] == key:
+                return slot, record
+            probes.append((slot, record))
+
+        reusable, reusable_full_at = None, None
+        for slot, record in probes:
+            full_at = record[3]
+            if record[0] == 0 or full_at <= now:
+                return slot, None
+            if reusable is None or full_at < reusable_full_at:
+                reusable, reusable_full_at = slot, full_at
+
+        return reusable, None
+
+    def take(self, bucket, capacity, rate, cost=1):
+        # 0 marks an empty slot, so keys are never 0
+        key = int(bucket[:16], 16) or 1
+        now = time.time()
+
+        with self._lock:
+            self._open()
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                slot, record = self._find_slot(key, now)
+                if record:
+                    tokens = min(capacity, record[1] + max(0.0, now - record[2]) * rate)
+                else:
+                    tokens = capacity
+
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+
+                full_at = now + (capacity - tokens) / rate
+                self.RECORD.pack_into(self._map, slot * self.RECORD.size, key, tokens, now, full_at)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+        if allowed:
+            return True, 0.0
+        return False, (cost - tokens) / rate
+
+
+# -----------------------------------------------------------
+# KEY FUNCTIONS
+# Return the value a bucket is keyed by for the current request,
+# or None to skip the limit (e.g. no email submitted).
+# -----------------------------------------------------------
+def by_ip():
+    hops = current_app.config.get("RATE_LIMIT_PROXY_HOPS", 0)
+    if hops:
+        # X-Forwarded-For as seen behind `hops` trusted proxies
+        route = request.access_route
+        return route[max(0, len(route) - hops)]
+    return request.remote_addr
+
+
+def by_form(field):
+    def key():
+        value = (request.form.get(field) or "").strip().lower()
+        return value or None
+    return key
+
+
+def by_session(field):
+    def key():
+        value = (session.get(field) or "").strip().lower()
+        return value or None
+    return key
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiting for routes.
+
+    Limits are declared on the routes by name; their rates come from
+    RATE_LIMITS in config.py:
+
+        @auth_bp.route("/send-login-email", methods=["POST"])
+        @rate_limiter.limit("otp_send_ip")
+        @rate_limiter.limit("otp_send_email", key=by_form("email"))
+        def send_login_email(): ...
+
+        rate_limiter.limit_blueprint(auth_bp, "auth_ip")   # every POST
+
+    A request over any of its limits gets 429 Too Many Requests with
+    a Retry-After header. Buckets are kept in the backend chosen by
+    RATE_LIMIT_STORE:
+        "local" → SharedMemoryRateLimitBackend (workers of one machine)
+        "mongo" → MongoRateLimitBackend (every machine)
+        "off"   → no limiting
+
+    If the backend fails, requests are let through (and counted in
+    rate_limit_errors) rather than taking the site down with it.
+    Refused requests are counted in rate_limited{limit}.
+
+    Like PyMongo, the singleton is created at import time and bound to
+    the app later with init_app().
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.limits = {}
+
+    def init_app(self, app, mongo):
+        self.limits = {
+            name: parse_limit(spec)
+            for name, spec in app.config.get("RATE_LIMITS", {}).items()
+        }
+
+        store = app.config.get("RATE_LIMIT_STORE", "local")
+        if store == "off":
+            self.backend = None
+        elif store == "mongo":
+            self.backend = MongoRateLimitBackend(mongo)
+        else:
+            path = app.config.get("RATE_LIMIT_FILE") or \
+                os.path.join(app.instance_path, "rate_limits.bin")
+            self.backend = SharedMemoryRateLimitBackend(path, app.config.get("RATE_LIMIT_SLOTS", 8192))
+
+    # ---------------------------------------------------------
+    # CHECK
+    # ---------------------------------------------------------
+    def hit(self, name, value, cost=1):
+        """
+        Spend `cost` tokens from the `name` bucket of `value`.
+        Returns seconds to wait when refused, otherwise None.
+        """
+        if self.backend is None or value is None:
+            return None
+
+        capacity, rate = self.limits[name]
+        try:
+            allowed, retry_after = self.backend.take(_bucket_id(name, value), capacity, rate, cost)
+        except (OSError, PyMongoError) as e:
+            metrics.inc("rate_limit_errors")
+            print(f"⚠ WARNING: Rate limit check skipped: {e}")
+            return None
+
+        if allowed:
+            return None
+
+        metrics.inc("rate_limited", limit=name)
+        return retry_after
+
+    def check(self, name, key=by_ip):
+        retry_after = self.hit(name, key())
+        if retry_after is not None:
+            raise TooManyRequests(retry_after=math.ceil(retry_after))
+
+    # ---------------------------------------------------------
+    # DECLARATIONS
+    # ---------------------------------------------------------
+    def limit(self, name, key=by_ip):
+        """
+        Route decorator: refuse the request when the `name` bucket
+        for key() is empty.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                self.check(name, key)
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def limit_blueprint(self, blueprint, name, key=by_ip, methods=("POST",)):
+        """
+        Apply the `name` limit to every request of `methods` on a blueprint.
+        """
+        @blueprint.before_request
+        def _rate_limit():
+            if request.method in methods:
+                self.check(name, key)
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Bound to the app (store, limits) in AppFactory.init_extensions().
+# -----------------------------------------------------------
+rate_limiter = RateLimiter()
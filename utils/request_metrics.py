@@ -0,0 +1,60 @@
+import time
+from flask import g, request
+from utils.metrics import metrics, REQUEST_BUCKETS
+
+
+class RequestMetrics:
+    """
+    Times every request, per route, into utils.metrics:
+
+        http_requests{route, method, status}               (counter)
+        http_request_duration_seconds{route, method}       (histogram)
+
+    `route` is the URL rule ("/product/<product_id>"), not the path, so
+    the number of label values stays bounded. Requests that match no
+    rule are recorded as "<unmatched>".
+
+    The time covers Flask's handling of the request (before_request
+    hooks, the view, after_request hooks), not the compression
+    middleware around it.
+    """
+
+    UNMATCHED = "<unmatched>"
+
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.after_request(self._status)
+        app.teardown_request(self._record)
+
+    @staticmethod
+    def _start():
+        g._request_started = time.perf_counter()
+        # Each worker writes its snapshot for /metrics
+        metrics.ensure_writer()
+
+    @staticmethod
+    def _status(response):
+        g._request_status = response.status_code
+        return response
+
+    def _record(self, exc):
+        started = g.pop("_request_started", None)
+        if started is None:
+            return
+
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else self.UNMATCHED
+        status = 500 if exc is not None else g.pop("_request_status", 500)
+
+        metrics.inc("http_requests", route=route, method=request.method, status=str(status))
+        metrics.observe(
+            "http_request_duration_seconds", elapsed,
+            buckets=REQUEST_BUCKETS, route=route, method=request.method
+        )
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Bound to the app in AppFactory.init_telemetry().
+# -----------------------------------------------------------
+request_metrics = RequestMetrics()
@@ -0,0 +1,244 @@
+import math
+import re
+import threading
+from bisect import bisect_left
+
+
+# -----------------------------------------------------------
+# Tokenizer
+# Lower-cases text and splits it into word characters, so
+# "Silk-Blend Banarasi" → ["silk", "blend", "banarasi"].
+# -----------------------------------------------------------
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text).lower())
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over the product catalog with BM25 ranking.
+
+    Structures:
+        _postings : { term: { doc_id: weighted term frequency } }
+        _doc_terms: { doc_id: { term: weighted term frequency } }  (for removal)
+        _doc_len  : { doc_id: weighted document length }
+        _docs     : { doc_id: product view returned in results }
+        _terms    : sorted vocabulary, used for prefix lookups with bisect
+
+    Every query word is treated as a prefix ("sil" matches "silk"), and a
+    product must match all query words. Matches on the full word score
+    higher than prefix-only matches.
+
+    `version` records the catalog version the index was built from, so
+    ProductModel can tell when it needs to be rebuilt.
+
+    `view` turns an indexed document into what search results return
+    (e.g. a compact ProductCard); the full text fields are only needed
+    while indexing.
+    """
+
+    # Field → weight applied to each token found in that field
+    FIELD_WEIGHTS = {
+        "name": 3.0,
+        "category": 2.0,
+        "highlights": 1.0,
+        "description": 1.0,
+        "details": 0.5,
+    }
+
+    # Score multiplier for words matched only through a prefix
+    PREFIX_PENALTY = 0.7
+
+    def __init__(self, k1=1.2, b=0.75):
+        # BM25 tuning parameters
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.RLock()
+        self._reset()
+        self.version = None
+        self.view = None
+
+    def _reset(self):
+        self._postings = {}
+        self._doc_terms = {}
+        self._doc_len = {}
+        self._docs = {}
+        self._terms = []
+        self._terms_dirty = False
+        self._total_len = 0.0
+
+    # ---------------------------------------------------------
+    # DOCUMENT → WEIGHTED TERMS
+    # ---------------------------------------------------------
+    def _field_text(self, value):
+        # highlights is a list, details a dict of "Fabric": "Silk", …
+        if isinstance(value, dict):
+            return " ".join(f"{k} {v}" for k, v in value.items())
+        if isinstance(value, (list, tuple)):
+            return " ".join(str(v) for v in value)
+        return str(value)
+
+    def _weighted_terms(self, doc):
+        terms = {}
+        for field, weight in self.FIELD_WEIGHTS.items():
+            value = doc.get(field)
+            if not value:
+                continue
+            for token in tokenize(self._field_text(value)):
+                terms[token] = terms.get(token, 0.0) + weight
+        return terms
+
+    # ---------------------------------------------------------
+    # BUILD / UPDATE
+    # ---------------------------------------------------------
+    def rebuild(self, docs, version=None, view=None):
+        """
+        Replace the whole index with `docs` (an iterable of products).
+        """
+        with self._lock:
+            self._reset()
+            self.view = view
+            for doc in docs:
+                self._add(doc)
+            self.version = version
+
+    def upsert(self, doc):
+        """
+        Add a product to the index, replacing any previous version of it.
+        """
+        with self._lock:
+            self._remove(doc["_id"])
+            self._add(doc)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _add(self, doc):
+        doc_id = doc["_id"]
+        terms = self._weighted_terms(doc)
+
+        self._docs[doc_id] = self.view(doc) if self.view else doc
+        self._doc_terms[doc_id] = terms
+        self._doc_len[doc_id] = sum(terms.values())
+        self._total_len += self._doc_len[doc_id]
+
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._terms_dirty = True
+            postings[doc_id] = tf
+
+    def _remove(self, doc_id):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+
+        self._docs.pop(doc_id, None)
+        self._total_len -= self._doc_len.pop(doc_id, 0.0)
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                self._terms_dirty = True
+
+    def _vocabulary(self):
+        if self._terms_dirty:
+            self._terms = sorted(self._postings)
+            self._terms_dirty = False
+        return self._terms
+
+    # ---------------------------------------------------------
+    # QUERY
+    # ---------------------------------------------------------
+    def _expand(self, word):
+        """
+        Return [(term, multiplier)] for every indexed term starting with `word`.
+        """
+        terms = self._vocabulary()
+        expansions = []
+
+        i = bisect_left(terms, word)
+        while i < len(terms) and terms[i].startswith(word):
+            term = terms[i]
+            expansions.append((term, 1.0 if term == word else self.PREFIX_PENALTY))
+            i += 1
+
+        return expansions
+
+    def search_scored(self, query):
+        """
+        Return [(score, doc)] for every matching product, best first.
+        Ties are broken by _id so the order is stable between calls.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            avg_len = self._total_len / n_docs or 1.0
+
+            scores = None
+            for word in dict.fromkeys(words):
+                word_scores = {}
+
+                for term, multiplier in self._expand(word):
+                    postings = self._postings[term]
+                    df = len(postings)
+                    idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+                    for doc_id, tf in postings.items():
+                        norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                        score = multiplier * idf * tf * (self.k1 + 1) / (tf + norm)
+                        # Keep the best matching expansion for this word
+                        if score > word_scores.get(doc_id, 0.0):
+                            word_scores[doc_id] = score
+
+                # Every word must match → intersect with previous words
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {
+                        doc_id: total + word_scores[doc_id]
+                        for doc_id, total in scores.items()
+                        if doc_id in word_scores
+                    }
+
+                if not scores:
+                    return []
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))
+            return [(score, self._docs[doc_id]) for doc_id, score in ranked]
+
+    def documents(self):
+        """
+        Return a snapshot list of every indexed product document.
+        """
+        with self._lock:
+            return list(self._docs.values())
+
+    def search(self, query, limit=None):
+        """
+        Return matching product documents, best first.
+        """
+        results = [doc for _, doc in self.search_scored(query)]
+        return results[:limit] if limit else results
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Built lazily by ProductModel.search() and kept in step with
+# the catalog version stamp.
+# -----------------------------------------------------------
+search_index = SearchIndex()
@@ -0,0 +1,262 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import threading
+import time
+from flask import request, send_from_directory
+from utils.image_pipeline import STATIC_DIR
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # brotli is optional, gzip is always built
+        brotli = None
+
+
+# -----------------------------------------------------------
+# Paths
+#   static/<file>        → source assets (in git)
+#   static/dist/<file>   → fingerprinted copies + .gz/.br (not in git)
+# -----------------------------------------------------------
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+
+# Already content-addressed or generated, never fingerprinted again
+SKIP_DIRS = ("dist", os.path.join("images", "derived"))
+
+# Text assets worth precompressing
+COMPRESS_EXTENSIONS = (".css", ".js", ".svg", ".json", ".txt", ".html", ".xml", ".map", ".ico")
+
+# Cache headers for URLs whose content can never change
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def _fingerprint(relative, data):
+    stem, ext = os.path.splitext(relative)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def _write_if_missing(path, data):
+    if os.path.exists(path):
+        return False
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+# -----------------------------------------------------------
+# BUILD (python manage.py build-static)
+# -----------------------------------------------------------
+def build_static():
+    """
+    Copy every file under static/ to static/dist/ under a content-hashed
+    name, write .gz (and .br when brotli is installed) next to text
+    assets, and write static/dist/manifest.json:
+        {
+            "files": {"css/style.css": "css/style.1a2b3c4d5e6f.css"},
+            "encodings": {"css/style.1a2b3c4d5e6f.css": ["br", "gzip"]}
+        }
+
+    Large binaries are hard-linked instead of copied where possible.
+    Old fingerprinted files are kept, so pages rendered before a
+    deploy can still load their assets.
+    """
+    files, encodings = {}, {}
+    written = 0
+
+    for root, dirs, names in os.walk(STATIC_DIR):
+        rel_root = os.path.relpath(root, STATIC_DIR)
+        dirs[:] = sorted(
+            d for d in dirs
+            if os.path.normpath(os.path.join(rel_root, d)) not in SKIP_DIRS
+        )
+
+        for name in sorted(names):
+            source = os.path.join(root, name)
+            relative = os.path.normpath(os.path.join(rel_root, name)).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                data = f.read()
+
+            hashed = _fingerprint(relative, data)
+            target = os.path.join(DIST_DIR, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+
+            if not os.path.exists(target):
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copyfile(source, target)
+                written += 1
+
+            files[relative] = hashed
+
+            if not name.lower().endswith(COMPRESS_EXTENSIONS):
+                continue
+
+            variants = []
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    written += _write_if_missing(f"{target}.br", compressed)
+                    variants.append("br")
+
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                written += _write_if_missing(f"{target}.gz", compressed)
+                variants.append("gzip")
+
+            if variants:
+                encodings[hashed] = variants
+
+    manifest = {"files": files, "encodings": encodings}
+    tmp = f"{MANIFEST_PATH}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, MANIFEST_PATH)
+
+    return {"files": len(files), "compressed": len(encodings), "written": written}
+
+
+class StaticAssets:
+    """
+    Serves the output of build_static().
+
+    init_app() does two things:
+      1. Wraps app.url_for, so url_for('static', filename='css/style.css')
+         returns /static/dist/css/style.<hash>.css when the manifest has it.
+      2. Replaces the "static" view: fingerprinted files (and the
+         content-addressed image derivatives) are sent with
+         `Cache-Control: public, max-age=31536000, immutable`, and the
+         precompressed .br / .gz variant is chosen from Accept-Encoding.
+
+    Without a manifest every URL and response stays as Flask makes it.
+
+    With STATIC_FINGERPRINT_DEV on, a source file edited after the build
+    is served unversioned, so stylesheet changes show up without
+    rebuilding.
+    """
+
+    # Preferred encoding first
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+    def __init__(self, path=MANIFEST_PATH, check_seconds=5):
+        self.path = path
+        self.check_seconds = check_seconds
+        self.app = None
+        self.dev_sources = False
+
+        self._lock = threading.Lock()
+        self._files = {}
+        self._encodings = {}
+        self._mtime = None
+        self._checked_at = None
+
+    def init_app(self, app):
+        self.app = app
+        self.dev_sources = app.config.get("STATIC_FINGERPRINT_DEV", False)
+        app_url_for = app.url_for
+
+        def url_for(endpoint, **values):
+            if endpoint == "static" and "filename" in values:
+                hashed = self.fingerprinted(values["filename"])
+                if hashed:
+                    values["filename"] = f"dist/{hashed}"
+            return app_url_for(endpoint, **values)
+
+        app.url_for = url_for
+        app.jinja_env.globals["url_for"] = url_for
+        app.view_functions["static"] = self.send_static
+
+    # ---------------------------------------------------------
+    # MANIFEST (re-read when the file changes)
+    # ---------------------------------------------------------
+    def _refresh(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+            return
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                self._files, self._encodings, self._mtime = {}, {}, None
+                return
+
+            if mtime == self._mtime:
+                return
+
+            try:
+                with open(self.path) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ WARNING: Static manifest unreadable: {e}")
+                return
+
+            self._files = manifest.get("files", {})
+            self._encodings = manifest.get("encodings", {})
+            self._mtime = mtime
+
+    def fingerprinted(self, filename):
+        """
+        Fingerprinted path for a static file, or None when it is not built
+        (or, with STATIC_FINGERPRINT_DEV, when the source changed after
+        the build).
+        """
+        self._refresh()
+        hashed = self._files.get(filename)
+        if hashed and self.dev_sources:
+            try:
+                if os.stat(os.path.join(STATIC_DIR, filename)).st_mtime > self._mtime:
+                    return None
+            except OSError:
+                return None
+        return hashed
+
+    # ---------------------------------------------------------
+    # STATIC VIEW
+    # ---------------------------------------------------------
+    def send_static(self, filename):
+        folder = self.app.static_folder
+
+        if filename.startswith("dist/"):
+            self._refresh()
+            available = self._encodings.get(filename[len("dist/"):], ())
+
+            for encoding, suffix in self.ENCODINGS:
+                if encoding in available and request.accept_encodings[encoding]:
+                    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+                    response = send_from_directory(folder, filename + suffix, mimetype=mimetype)
+                    response.content_encoding = encoding
+                    break
+            else:
+                response = send_from_directory(folder, filename)
+
+            response.vary.add("Accept-Encoding")
+            return self._immutable(response)
+
+        response = send_from_directory(folder, filename)
+        if filename.startswith("images/derived/") and not filename.endswith(".json"):
+            self._immutable(response)
+        return response
+
+    def _immutable(self, response):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        return response
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Bound to the app in AppFactory.init_jinja().
+# -----------------------------------------------------------
+static_assets = StaticAssets()
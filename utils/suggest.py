@@ -0,0 +1,145 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from utils.search_index import tokenize
+
+
+class SuggestionIndex:
+    """
+    Search-as-you-type completions over a sorted array.
+
+    Every suggestion is stored under one or more lower-cased keys in a
+    sorted list of tuples:
+        (<key>, <display text>, <kind>, <target>)
+
+    Product names are also stored under each word suffix, so typing
+    "sar" completes "Banarasi Silk Saree". A prefix lookup is a single
+    bisect followed by a scan of the matching range; the top-k entries
+    are picked by weight.
+
+    kind is one of:
+        "product"  → target is the product _id
+        "category" → target is the category name
+        "query"    → target is the popular search query
+    """
+
+    # Base weight per kind (popular queries add their hit count)
+    KIND_WEIGHTS = {"product": 3.0, "category": 5.0, "query": 1.0}
+
+    def __init__(self, max_queries=500):
+        # Max number of popular queries remembered
+        self.max_queries = max_queries
+
+        self._lock = threading.Lock()
+        self._entries = []
+        self._weights = {}
+        self._queries = Counter()
+        self.version = None
+
+    # ---------------------------------------------------------
+    # BUILD FROM CATALOG
+    # ---------------------------------------------------------
+    def rebuild(self, docs, version=None):
+        """
+        Rebuild product and category suggestions from product documents.
+        Popular queries survive the rebuild.
+        """
+        entries = []
+        weights = {}
+        category_counts = Counter()
+
+        for doc in docs:
+            name = doc.get("name")
+            if name:
+                words = tokenize(name)
+                for i in range(len(words)):
+                    entries.append((" ".join(words[i:]), name, "product", doc["_id"]))
+                weights[("product", doc["_id"])] = self.KIND_WEIGHTS["product"]
+
+            if doc.get("category"):
+                category_counts[doc["category"]] += 1
+
+        for category, count in category_counts.items():
+            entries.append((category.lower(), category, "category", category))
+            weights[("category", category)] = self.KIND_WEIGHTS["category"] + count
+
+        for query, hits in self._queries.items():
+            entries.append((query, query, "query", query))
+            weights[("query", query)] = self.KIND_WEIGHTS["query"] + hits
+
+        entries.sort()
+
+        with self._lock:
+            self._entries = entries
+            self._weights = weights
+            self.version = version
+
+    # ---------------------------------------------------------
+    # POPULAR QUERIES
+    #
+    # Called after a search that returned results. New queries are
+    # inserted into the sorted array in place (no rebuild needed).
+    # ---------------------------------------------------------
+    def record_query(self, query):
+        query = " ".join(tokenize(query))
+        if not query:
+            return
+
+        with self._lock:
+            if query not in self._queries and len(self._queries) >= self.max_queries:
+                # Forget the least popular query to stay bounded
+                (stale, _), = self._queries.most_common()[-1:]
+                del self._queries[stale]
+                self._weights.pop(("query", stale), None)
+                i = bisect_left(self._entries, (stale, stale, "query", stale))
+                if i < len(self._entries) and self._entries[i] == (stale, stale, "query", stale):
+                    del self._entries[i]
+
+            if query not in self._queries:
+                insort(self._entries, (query, query, "query", query))
+
+            self._queries[query] += 1
+            self._weights[("query", query)] = self.KIND_WEIGHTS["query"] + self._queries[query]
+
+    # ---------------------------------------------------------
+    # LOOKUP
+    # ---------------------------------------------------------
+    def suggest(self, prefix, k=8):
+        """
+        Return up to k suggestions as dicts: {"text", "kind", "target"}.
+        """
+        prefix = " ".join(tokenize(prefix))
+        if not prefix:
+            return []
+
+        with self._lock:
+            entries = self._entries
+            weights = self._weights
+
+            start = bisect_left(entries, (prefix,))
+            best = {}
+            for i in range(start, len(entries)):
+                key, text, kind, target = entries[i]
+                if not key.startswith(prefix):
+                    break
+                # Same product may match through several word suffixes
+                best[(kind, target)] = text
+
+        top = heapq.nlargest(
+            k,
+            best.items(),
+            key=lambda item: (weights.get(item[0], 0.0), -len(item[1]))
+        )
+        return [
+            {"text": text, "kind": kind, "target": target}
+            for (kind, target), text in top
+        ]
+
+
+# -----------------------------------------------------------
+# Singleton instance
+# Built from the search index by ProductModel.suggest(), so
+# suggestions never touch MongoDB.
+# -----------------------------------------------------------
+suggestion_index = SuggestionIndex()